@@ -0,0 +1,103 @@
+"""
+Compares the per-call cost of classifying block arguments through reflection, as the executor did for every block
+execution, with looking them up in the block signatures computed by Executor.load_blocks.
+
+    python -m benchmarks.argument_resolution
+"""
+import builtins
+import timeit
+from typing import Any, get_origin
+
+from engine.blocks.block import PyBlockSettings, PyBlockDefinition
+from engine.blocks.default import default_blocks
+from engine.blocks.fields import Variable
+from engine.blocks.signature import BlockSignature
+from engine.executor.value import Value
+from engine.executor.variable_reference import VariableRef
+
+
+def legacy_remove_reserved_words_from_param_name(name: str):
+    if name in globals() or name in dir(builtins):
+        return f"param_{name}"
+    return name
+
+
+def legacy_is_variable_ref_type(block_settings: PyBlockSettings, name: str):
+    if "definition" in block_settings and block_settings["definition"] is not None:
+        definition: PyBlockDefinition = block_settings["definition"]
+        for arg in definition.arguments:
+            if arg.name == name:
+                return type(arg) == Variable
+    func: Any = block_settings["func"]
+    type_hints = func.__annotations__
+    sanitised_name = legacy_remove_reserved_words_from_param_name(name)
+    return type_hints is not None and sanitised_name in type_hints and type_hints[sanitised_name] == VariableRef
+
+
+def legacy_is_value_immediate(block_settings: PyBlockSettings, name: str):
+    func: Any = block_settings["func"]
+    type_hints = func.__annotations__
+    sanitised_name = legacy_remove_reserved_words_from_param_name(name)
+    if type_hints is not None and sanitised_name in type_hints:
+        type_hint = type_hints[sanitised_name]
+        type_origin = get_origin(type_hint)
+        if type_origin is not None:
+            type_hint = type_origin
+        if issubclass(type_hint, Value):
+            return False
+    return True
+
+
+def load_plugin_blocks() -> list[PyBlockSettings]:
+    blocks = []
+    for module_name, attribute in [("strings", "strings_blocks"), ("numbers", "numbers_blocks"), ("io", "io_blocks"),
+                                   ("json", "json_blocks"), ("keyboard", "keyboard_blocks"), ("gui", "gui_blocks")]:
+        try:
+            module = __import__(f"engine.plugins.{module_name}", fromlist=[attribute])
+            blocks.extend(getattr(module, attribute))
+        except Exception as e:
+            print(f"Skipping plugin '{module_name}': {type(e).__name__}: {e}")
+    return blocks
+
+
+def get_argument_names(block_settings: PyBlockSettings) -> list[str]:
+    # Argument names as they appear in a program: lower case and without the reserved word prefix
+    names = [name.removeprefix("param_") for name in block_settings["func"].__annotations__ if name != "return"]
+    return [name for name in names if name != "context"]
+
+
+def benchmark(blocks: list[PyBlockSettings], number: int = 2_000):
+    signatures = {block["type"]: BlockSignature.from_settings(block) for block in blocks}
+    total_legacy = 0.0
+    total_signature = 0.0
+    print(f"{'block':<32}{'args':>5}{'reflection (us)':>18}{'signature (us)':>18}")
+    for block in blocks:
+        names = get_argument_names(block)
+        signature = signatures[block["type"]]
+        for name in names:
+            parameter = signature.get_parameter(name)
+            assert parameter.is_reference == legacy_is_variable_ref_type(block, name), (block["type"], name)
+            assert parameter.is_immediate == legacy_is_value_immediate(block, name), (block["type"], name)
+
+        def legacy():
+            for n in names:
+                legacy_is_variable_ref_type(block, n)
+                legacy_is_value_immediate(block, n)
+
+        def lookup():
+            for n in names:
+                parameter = signature.get_parameter(n)
+                parameter.is_reference
+                parameter.is_immediate
+
+        legacy_time = timeit.timeit(legacy, number=number) / number * 1e6
+        signature_time = timeit.timeit(lookup, number=number) / number * 1e6
+        total_legacy += legacy_time
+        total_signature += signature_time
+        print(f"{block['type']:<32}{len(names):>5}{legacy_time:>18.3f}{signature_time:>18.3f}")
+    print(f"{'total':<37}{total_legacy:>18.3f}{total_signature:>18.3f}")
+    print(f"Speedup: {total_legacy / total_signature:.1f}x")
+
+
+if __name__ == '__main__':
+    benchmark([*default_blocks, *load_plugin_blocks()])
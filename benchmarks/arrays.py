@@ -0,0 +1,74 @@
+"""
+Compares the array blocks with the equivalent loops of list blocks. Each program fills an array and a list with the
+same numbers first, and is timed less the time taken to fill them. Needs NumPy.
+
+    python -m benchmarks.arrays --size 1000000
+"""
+import argparse
+
+from benchmarks.generator import ProgramGenerator, ProgramShape
+from benchmarks.lists import run_time
+from engine.blocks.default import default_blocks
+from engine.blocks.registry import BlockRegistry
+from engine.executor.executor import Executor
+from engine.plugins.arrays import ArrayVariableHandler, arrays_blocks
+
+block_registry = BlockRegistry([*default_blocks, *arrays_blocks])
+
+
+def create_executor() -> Executor:
+    executor = Executor(block_registry=block_registry)
+    executor.add_variable_handler(ArrayVariableHandler())
+    return executor
+
+
+def create_program(size: int, program: str | None) -> str:
+    generator = ProgramGenerator(ProgramShape())
+    array = generator.field("ARRAY", "array", "numbers")
+    items = generator.field("LIST", "list", "items")
+    index = generator.field("VARIABLE", "", "index")
+    statements = [
+        generator.block("array_range", array, generator.value("START", generator.number(0)),
+                        generator.value("STOP", generator.number(size))),
+        generator.block("array_tolist", items, array)
+    ]
+    item = generator.block("data_itemoflist", items, generator.value("INDEX", generator.block("data_variable", index)))
+    next_index = generator.block("data_changevariableby", index, generator.value("VALUE", generator.number(1)))
+    if program == "sum loop":
+        statements.append(generator.repeat(size, generator.chain([
+            generator.block("data_changevariableby", generator.field("VARIABLE", "", "total"),
+                            generator.value("VALUE", item)),
+            next_index
+        ])))
+    if program == "sum":
+        statements.append(generator.block("data_setvariableto", generator.field("VARIABLE", "", "total"),
+                                          generator.value("VALUE", generator.block(
+                                              "array_statistic", '<field name="STATISTIC">sum</field>',
+                                              generator.value("ARRAY", generator.block("array_contents", array))))))
+    if program == "scale loop":
+        statements.append(generator.repeat(size, generator.chain([
+            generator.block("data_replaceitemoflist", items, generator.value(
+                "INDEX", generator.block("data_variable", index)), generator.value("ITEM", generator.block(
+                    "operator_multiply", generator.value("NUM1", item), generator.value("NUM2", generator.number(2))))),
+            next_index
+        ])))
+    if program == "scale":
+        statements.append(generator.block(
+            "array_arithmetic", array, generator.value("LEFT", generator.block("array_contents", array)),
+            '<field name="OPERATOR">*</field>', generator.value("RIGHT", generator.number(2))))
+    variables = "".join([generator.variable("array", "numbers"), generator.variable("list", "items"),
+                         generator.variable("", "index"), generator.variable("", "total")])
+    script = generator.block("event_whenflagclicked", next_block=generator.chain(statements))
+    return f"<xml><variables>{variables}</variables>{script}</xml>"
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--size", type=int, default=1_000_000)
+    parser.add_argument("--repeats", type=int, default=3)
+    args = parser.parse_args()
+
+    fill_time = run_time(create_program(args.size, None), args.repeats, create_executor())
+    for program_name in ["sum loop", "sum", "scale loop", "scale"]:
+        program_time = run_time(create_program(args.size, program_name), args.repeats, create_executor()) - fill_time
+        print(f"{program_name:<10} {args.size} items {program_time * 1000:10.1f} ms")
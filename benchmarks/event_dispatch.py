@@ -0,0 +1,63 @@
+"""
+Measures the cost of a broadcast as the number of "when I receive" hats in a program grows, comparing the previous
+dispatch (every listener called for every event, each comparing the topic and message) with indexed dispatch.
+
+    python -m benchmarks.event_dispatch
+"""
+import timeit
+
+from engine.executor.executor import Executor
+from engine.util import anoop
+
+repeats = 10_000
+
+
+def create_hat_program(hat_count: int) -> str:
+    variables = "".join(f'<variable type="broadcast_msg" id="message-{i}">message-{i}</variable>'
+                        for i in range(hat_count))
+    hats = "".join(f"""
+    <block type="event_whenbroadcastreceived" id="hat-{i}">
+        <field name="BROADCAST_OPTION" id="message-{i}" variabletype="broadcast_msg">message-{i}</field>
+    </block>""" for i in range(hat_count))
+    return f"<xml><variables>{variables}</variables>{hats}</xml>"
+
+
+def create_legacy_listeners(hat_count: int) -> list:
+    def create_listener(broadcast_value: str):
+        def listener(topic, received_message):
+            if topic == "broadcast" and received_message == broadcast_value:
+                return anoop()
+
+        return listener
+
+    return [create_listener(f"message-{i}") for i in range(hat_count)]
+
+
+def legacy_broadcast(global_event_listeners: list, event_listeners: list, topic: str, message: str):
+    for event_listener in global_event_listeners + event_listeners:
+        response = event_listener(topic, message)
+        if response is not None:
+            response.close()
+
+
+def measure(hat_count: int) -> tuple[float, float]:
+    executor = Executor()
+    executor.add_global_broadcast_listener(lambda topic, message: None)
+    executor.load_program(create_hat_program(hat_count))
+    executor.start(is_eager=True)
+    assert len(executor.event_listeners) == hat_count
+    legacy_listeners = create_legacy_listeners(hat_count)
+    global_listeners = [lambda topic, message: None]
+    # A variable change is broadcast on every assignment and matches no hat
+    legacy = timeit.timeit(lambda: legacy_broadcast(global_listeners, legacy_listeners, "variable", "change"),
+                           number=repeats)
+    indexed = timeit.timeit(lambda: executor.broadcast("variable", "change"), number=repeats)
+    executor.stop()
+    return legacy / repeats, indexed / repeats
+
+
+if __name__ == '__main__':
+    print(f"{'hats':>6}{'legacy (us)':>14}{'indexed (us)':>14}")
+    for hat_count in [1, 10, 17, 100, 1000]:
+        legacy, indexed = measure(hat_count)
+        print(f"{hat_count:>6}{legacy * 1e6:>14.2f}{indexed * 1e6:>14.2f}")
@@ -0,0 +1,100 @@
+"""
+Measures how many lines per second the file blocks read, and their peak memory, on a generated file. Reading the whole
+file and splitting it into a list is measured for comparison.
+
+    python -m benchmarks.files --lines 200000
+"""
+import argparse
+import os
+import tempfile
+import time
+
+from benchmarks.generator import ProgramGenerator, ProgramShape
+from benchmarks.suite import measure_peak_memory
+from engine.blocks.default import default_blocks
+from engine.blocks.registry import BlockRegistry
+from engine.executor.executor import Executor
+from engine.executor.variable_reference import VariableRef
+from engine.plugins.io import FilePluginContext, io_blocks
+from engine.plugins.strings import strings_blocks
+
+block_registry = BlockRegistry([*default_blocks, *io_blocks, *strings_blocks])
+
+
+def text(value: str) -> str:
+    return f'<shadow type="text"><field name="TEXT">{value}</field></shadow>'
+
+
+def create_program(path: str, program: str) -> str:
+    generator = ProgramGenerator(ProgramShape())
+    count = generator.field("VARIABLE", "", "count")
+    line = generator.field("VARIABLE", "", "line")
+    path_value = generator.value("PATH", text(path))
+    increment = generator.block("data_changevariableby", count, generator.value("VALUE", generator.number(1)))
+    if program == "for each line":
+        statements = [generator.block("io_foreachline", line, path_value,
+                                      f'<statement name="SUBSTACK">{increment}</statement>')]
+    elif program == "read next line":
+        # The repeat until block runs while its condition is true
+        not_at_end = generator.block("operator_not", generator.value("OPERAND", generator.block(
+            "io_endoffile", path_value)))
+        read_line = generator.block("data_setvariableto", line, generator.value("VALUE", generator.block(
+            "io_readline", path_value)))
+        statements = [
+            generator.block("io_openfile", path_value),
+            generator.block("control_repeat_until", generator.value("CONDITION", not_at_end),
+                            f'<statement name="SUBSTACK">{generator.chain([read_line, increment])}</statement>'),
+            generator.block("io_closefile", path_value)
+        ]
+    elif program == "line count":
+        statements = [generator.block("data_setvariableto", count, generator.value("VALUE", generator.block(
+            "io_linecount", path_value)))]
+    else:
+        items = generator.field("VARIABLE", "list", "lines")
+        statements = [
+            generator.block("data_setvariableto", line, generator.value("VALUE", generator.block(
+                "io_readfile", path_value))),
+            generator.block("string_splitvarnewline", generator.value("STRING", generator.block(
+                "data_variable", line)), items),
+            generator.block("data_setvariableto", count, generator.value("VALUE", generator.block(
+                "data_lengthoflist", generator.field("LIST", "list", "lines"))))
+        ]
+    variables = "".join([generator.variable("", "count"), generator.variable("", "line"),
+                         generator.variable("list", "lines")])
+    script = generator.block("event_whenflagclicked", next_block=generator.chain(statements))
+    return f"<xml><variables>{variables}</variables>{script}</xml>"
+
+
+def run_program(xml_string: str) -> Executor:
+    executor = Executor(block_registry=block_registry)
+    executor.add_plugin_context(FilePluginContext)
+    executor.load_program(xml_string)
+    executor.start(is_eager=True)
+    executor.task_stack.wait_until_complete()
+    executor.close()
+    return executor
+
+
+def write_file(path: str, lines: int):
+    with open(path, "w") as file:
+        for line in range(lines):
+            file.write(f"{line:010d},2023-08-01T12:00:00,INFO,request handled in {line % 997} ms\n")
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--lines", type=int, default=200_000)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        file_path = os.path.join(directory, "lines.csv")
+        write_file(file_path, args.lines)
+        for program_name in ["for each line", "read next line", "line count", "read file"]:
+            program_xml = create_program(file_path, program_name)
+            start = time.perf_counter()
+            executor = run_program(program_xml)
+            duration = time.perf_counter() - start
+            peak_memory = measure_peak_memory(lambda: run_program(program_xml))
+            lines_read = executor.get_variable(VariableRef("", "count"))
+            print(f"{program_name:<15} {lines_read / duration:12.0f} lines/s   "
+                  f"peak memory {peak_memory / 1024:10.0f} KB")
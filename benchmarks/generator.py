@@ -0,0 +1,149 @@
+"""
+Generates Scratch blocks programs of a configurable size that only use the default blocks.
+
+Every script starts on the green flag, fills its list, runs its chain of blocks inside nested loops and then
+broadcasts a message that one of the broadcast hats receives.
+
+    python -m benchmarks.generator --scripts 4 --chain-length 20 --loop-depth 2 > program.xml
+"""
+import argparse
+from dataclasses import dataclass
+from xml.sax.saxutils import escape
+
+
+@dataclass(frozen=True)
+class ProgramShape:
+    scripts: int = 1
+    chain_length: int = 10
+    loop_depth: int = 1
+    loop_iterations: int = 10
+    list_size: int = 0
+    broadcast_hats: int = 0
+
+
+class ProgramGenerator:
+    shape: ProgramShape
+    block_count: int
+
+    def __init__(self, shape: ProgramShape):
+        self.shape = shape
+        self.block_count = 0
+
+    def generate(self) -> str:
+        shape = self.shape
+        variables = []
+        for script in range(shape.scripts):
+            variables.append(self.variable("", f"counter-{script}"))
+            variables.append(self.variable("", f"total-{script}"))
+            variables.append(self.variable("list", f"list-{script}"))
+        for hat in range(shape.broadcast_hats):
+            variables.append(self.variable("broadcast_msg", f"message-{hat}"))
+            variables.append(self.variable("", f"received-{hat}"))
+        scripts = [self.script(script) for script in range(shape.scripts)]
+        scripts.extend(self.broadcast_hat(hat) for hat in range(shape.broadcast_hats))
+        return f"<xml><variables>{''.join(variables)}</variables>{''.join(scripts)}</xml>"
+
+    def script(self, script: int) -> str:
+        shape = self.shape
+        statements = []
+        if shape.list_size > 0:
+            statements.append(self.repeat(shape.list_size, self.chain([
+                self.block("data_addtolist", self.field("LIST", "list", f"list-{script}"),
+                           self.value("ITEM", self.number(1)))
+            ])))
+        body = [self.statement(script, i) for i in range(shape.chain_length)]
+        for _ in range(shape.loop_depth):
+            body = [self.repeat(shape.loop_iterations, self.chain(body))]
+        statements.extend(body)
+        if shape.broadcast_hats > 0:
+            message = f"message-{script % shape.broadcast_hats}"
+            statements.append(self.block("event_broadcast", self.value(
+                "BROADCAST_INPUT",
+                self.shadow("event_broadcast_menu", self.field("BROADCAST_OPTION", "broadcast_msg", message)))
+            ))
+        return self.block("event_whenflagclicked", next_block=self.chain(statements))
+
+    def statement(self, script: int, index: int) -> str:
+        if index % 2 == 0:
+            return self.block("data_changevariableby", self.field("VARIABLE", "", f"counter-{script}"),
+                              self.value("VALUE", self.number(1)))
+        if self.shape.list_size > 0:
+            operand = self.block("data_itemoflist", self.field("LIST", "list", f"list-{script}"),
+                                 self.value("INDEX", self.number(0)))
+        else:
+            operand = self.block("data_variable", self.field("VARIABLE", "", f"counter-{script}"))
+        return self.block("data_setvariableto", self.field("VARIABLE", "", f"total-{script}"), self.value(
+            "VALUE",
+            self.block("operator_add", self.value("NUM1", self.block(
+                "data_variable", self.field("VARIABLE", "", f"total-{script}"))), self.value("NUM2", operand))
+        ))
+
+    def broadcast_hat(self, hat: int) -> str:
+        return self.block(
+            "event_whenbroadcastreceived",
+            self.field("BROADCAST_OPTION", "broadcast_msg", f"message-{hat}"),
+            next_block=self.block("data_changevariableby", self.field("VARIABLE", "", f"received-{hat}"),
+                                  self.value("VALUE", self.number(1)))
+        )
+
+    def repeat(self, times: int, substack: str) -> str:
+        times_value = self.value("TIMES", self.shadow("math_whole_number", f'<field name="NUM">{times}</field>'))
+        return self.block("control_repeat", times_value, f'<statement name="SUBSTACK">{substack}</statement>')
+
+    def block(self, block_type: str, *children: str, next_block: str = "") -> str:
+        self.block_count += 1
+        next_element = f"<next>{next_block}</next>" if next_block else ""
+        return f'<block type="{block_type}" id="block-{self.block_count}">{"".join(children)}{next_element}</block>'
+
+    @staticmethod
+    def chain(blocks: list[str]) -> str:
+        # Each block becomes the next block of the one before it, so none of them can have a next block yet
+        chain = ""
+        for block in reversed(blocks):
+            if chain:
+                block = block[:-len("</block>")] + f"<next>{chain}</next></block>"
+            chain = block
+        return chain
+
+    @staticmethod
+    def variable(variable_type: str, name: str) -> str:
+        return f'<variable type="{variable_type}" id="{escape(name)}">{escape(name)}</variable>'
+
+    @staticmethod
+    def field(name: str, variable_type: str, variable: str) -> str:
+        return f'<field name="{name}" id="{escape(variable)}" variabletype="{variable_type}">{escape(variable)}</field>'
+
+    @staticmethod
+    def value(name: str, content: str) -> str:
+        return f'<value name="{name}">{content}</value>'
+
+    @staticmethod
+    def shadow(shadow_type: str, field: str) -> str:
+        return f'<shadow type="{shadow_type}">{field}</shadow>'
+
+    @classmethod
+    def number(cls, value: float) -> str:
+        return cls.shadow("math_number", f'<field name="NUM">{value}</field>')
+
+
+def generate_program(shape: ProgramShape) -> str:
+    return ProgramGenerator(shape).generate()
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--scripts", type=int, default=ProgramShape.scripts)
+    parser.add_argument("--chain-length", type=int, default=ProgramShape.chain_length)
+    parser.add_argument("--loop-depth", type=int, default=ProgramShape.loop_depth)
+    parser.add_argument("--loop-iterations", type=int, default=ProgramShape.loop_iterations)
+    parser.add_argument("--list-size", type=int, default=ProgramShape.list_size)
+    parser.add_argument("--broadcast-hats", type=int, default=ProgramShape.broadcast_hats)
+    args = parser.parse_args()
+    print(generate_program(ProgramShape(
+        scripts=args.scripts,
+        chain_length=args.chain_length,
+        loop_depth=args.loop_depth,
+        loop_iterations=args.loop_iterations,
+        list_size=args.list_size,
+        broadcast_hats=args.broadcast_hats
+    )))
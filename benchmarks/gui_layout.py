@@ -0,0 +1,195 @@
+"""
+Measures how long the GUI plugin takes to build a layout the size of the waybill program's (10 panels, 27 buttons and
+22 textfields), and how many variable updates typing into its textfields causes. Tk needs a display, so on a headless
+machine run it under Xvfb:
+
+    xvfb-run python -m benchmarks.gui_layout
+
+It also measures how long a queued command waits for the Tk thread, and the CPU time the process uses while the GUI
+is idle. With --tcl, the command queue is measured on a Tcl event loop without Tk, which needs no display, and
+compared with the earlier queues that the Tk thread polled.
+"""
+import argparse
+import queue
+import statistics
+import threading
+import time
+import tkinter
+
+from engine.executor.executor import Executor
+from engine.plugins.gui import GuiPluginContext
+
+panels = 10
+buttons = 27
+textfields = 22
+# Entering and leaving every panel, and adding every button and textfield
+layout_commands = 2 * panels + buttons + textfields
+
+
+def wait_for_gui(gui_context: GuiPluginContext):
+    done = threading.Event()
+    gui_context.post(done.set)
+    done.wait()
+
+
+def build_layout(gui_context: GuiPluginContext, setter):
+    for panel in range(panels):
+        gui_context.add_inner_panel("left" if panel % 2 else "top")
+        for button in range(panel, buttons, panels):
+            gui_context.add_button(f"Button {button}", lambda: None)
+        for textfield in range(panel, textfields, panels):
+            gui_context.add_textfield(f"Textfield {textfield}", setter)
+        gui_context.leave_current_panel()
+
+
+def find_entries(widget) -> list:
+    entries = []
+    for child in widget.winfo_children():
+        if child.winfo_class() == "Entry":
+            entries.append(child)
+        entries.extend(find_entries(child))
+    return entries
+
+
+def layout_build_time(gui_context: GuiPluginContext, repeats: int) -> list[float]:
+    durations = []
+    for _ in range(repeats):
+        gui_context.reset()
+        wait_for_gui(gui_context)
+        start = time.perf_counter()
+        build_layout(gui_context, lambda value: None)
+        wait_for_gui(gui_context)
+        durations.append(time.perf_counter() - start)
+    return durations
+
+
+def typing_updates(gui_context: GuiPluginContext, keystrokes: int) -> tuple[int, int]:
+    updates = []
+    gui_context.reset()
+    build_layout(gui_context, updates.append)
+    wait_for_gui(gui_context)
+
+    def type_text():
+        for entry in find_entries(gui_context.root):
+            for _ in range(keystrokes):
+                entry.insert("end", "a")
+
+    gui_context.post(type_text)
+    wait_for_gui(gui_context)
+    time.sleep(gui_context.variable_update_delay_ms / 1000 * 2)
+    wait_for_gui(gui_context)
+    return textfields * keystrokes, len(updates)
+
+
+def command_latencies(gui_context: GuiPluginContext, samples: int) -> list[float]:
+    latencies = []
+    for _ in range(samples):
+        start = time.perf_counter()
+        wait_for_gui(gui_context)
+        latencies.append(time.perf_counter() - start)
+        # Queued at a different point of a poll every time
+        time.sleep(0.037)
+    return latencies
+
+
+def idle_cpu(idle_seconds: float) -> float:
+    start = time.process_time()
+    time.sleep(idle_seconds)
+    return (time.process_time() - start) / idle_seconds
+
+
+class PollEveryTick(GuiPluginContext):
+    """
+    The previous queue, which the Tk thread polled every 20 ms
+    """
+    message_check_interval_ms = 20
+
+    def open_wake(self):
+        self.root.after(self.message_check_interval_ms, self.poll)
+
+    def close_wake(self):
+        pass
+
+    def wake(self):
+        pass
+
+    def poll(self):
+        self.drain_queue()
+        self.root.after(self.message_check_interval_ms, self.poll)
+
+
+class OneCommandPerTick(PollEveryTick):
+    """
+    The queue before that, which ran a single command every 200 ms
+    """
+    message_check_interval_ms = 200
+
+    def poll(self):
+        try:
+            self.in_queue.get(block=False)()
+        except queue.Empty:
+            pass
+        self.root.after(self.message_check_interval_ms, self.poll)
+
+
+def measure_tcl(context_type: type[GuiPluginContext], samples: int, idle_seconds: float) -> dict:
+    gui_context = context_type(Executor())
+    gui_context.in_queue = queue.Queue()
+    started = threading.Event()
+    stopped = threading.Event()
+
+    def run_tcl():
+        gui_context.root = tkinter.Tcl()
+        gui_context.open_wake()
+        started.set()
+        while not stopped.is_set():
+            gui_context.root.tk.dooneevent()
+        gui_context.close_wake()
+        # Tcl must delete the interpreter on the thread that created it
+        gui_context.root = None
+
+    thread = threading.Thread(target=run_tcl)
+    thread.start()
+    started.wait()
+    try:
+        latencies = command_latencies(gui_context, samples)
+        start = time.perf_counter()
+        for _ in range(layout_commands - 1):
+            gui_context.post(lambda: None)
+        wait_for_gui(gui_context)
+        layout_time = time.perf_counter() - start
+        idle = idle_cpu(idle_seconds)
+    finally:
+        gui_context.post(stopped.set)
+        thread.join()
+    return {"latencies": latencies, "layoutTime": layout_time, "idleCpu": idle}
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--tcl", action="store_true", help="Measures the command queue without Tk")
+    args = parser.parse_args()
+
+    if args.tcl:
+        for name, queue_type in [("one per 200 ms", OneCommandPerTick), ("poll per 20 ms", PollEveryTick),
+                                 ("wake on queue", GuiPluginContext)]:
+            results = measure_tcl(queue_type, 20, 5)
+            latencies_ms = [latency * 1000 for latency in results["latencies"]]
+            print(f"{name:<16} command latency mean {statistics.mean(latencies_ms):7.2f} ms   "
+                  f"max {max(latencies_ms):7.2f} ms   {layout_commands} commands "
+                  f"{results['layoutTime'] * 1000:8.2f} ms   idle CPU {results['idleCpu'] * 100:6.3f}%")
+    else:
+        context = GuiPluginContext(Executor())
+        context.__enter__()
+        try:
+            build_times_ms = [duration * 1000 for duration in layout_build_time(context, 10)]
+            print(f"layout build          mean {statistics.mean(build_times_ms):8.3f} ms   "
+                  f"max {max(build_times_ms):8.3f} ms")
+            keystroke_count, update_count = typing_updates(context, 20)
+            print(f"typing                {keystroke_count} keystrokes -> {update_count} variable updates")
+            latencies_ms = [latency * 1000 for latency in command_latencies(context, 20)]
+            print(f"command latency       mean {statistics.mean(latencies_ms):8.3f} ms   "
+                  f"max {max(latencies_ms):8.3f} ms")
+            print(f"idle CPU              {idle_cpu(5) * 100:8.3f}%")
+        finally:
+            context.__exit__(None, None, None)
@@ -0,0 +1,81 @@
+"""
+Measures how long it takes to read fields out of a large JSON document held in a variable, with and without the parsed
+document cache, using both the "Get" and the "Get path" blocks.
+
+    python -m benchmarks.json_fields --size 5000000 --fields 20
+"""
+import argparse
+import json
+import time
+from xml.sax.saxutils import escape
+
+from benchmarks.generator import ProgramGenerator, ProgramShape
+from engine.blocks.default import default_blocks
+from engine.blocks.registry import BlockRegistry
+from engine.executor.executor import Executor
+from engine.plugins import json as json_plugin
+
+block_registry = BlockRegistry([*default_blocks, *json_plugin.json_blocks])
+
+
+def text(value: str) -> str:
+    return f'<shadow type="text"><field name="TEXT">{value}</field></shadow>'
+
+
+def create_document(size: int) -> str:
+    records = []
+    length = 0
+    while length < size:
+        record = {"id": len(records), "name": f"record {len(records)}", "tags": ["a", "b", "c"],
+                  "details": {"score": len(records) % 100, "active": len(records) % 2 == 0}}
+        records.append(record)
+        length += len(json.dumps(record)) + 2
+    return json.dumps({"count": len(records), "records": records})
+
+
+def create_program(document: str, fields: int, block_type: str) -> str:
+    generator = ProgramGenerator(ProgramShape())
+    statements = [generator.block("data_setvariableto", generator.field("VARIABLE", "", "document"),
+                                  generator.value("VALUE", text(escape(document))))]
+    for field in range(fields):
+        document_value = generator.value("OBJ", generator.block("data_variable",
+                                                                generator.field("VARIABLE", "", "document")))
+        if block_type == "json_path":
+            reporter = generator.block("json_path", generator.value("PATH", text(f"records[{field}].details.score")),
+                                       document_value)
+        else:
+            reporter = generator.block("json_value", generator.value("KEY", text("count")),
+                                       document_value)
+        statements.append(generator.block("data_setvariableto", generator.field("VARIABLE", "", f"field-{field}"),
+                                          generator.value("VALUE", reporter)))
+    variables = "".join([generator.variable("", "document")] +
+                        [generator.variable("", f"field-{field}") for field in range(fields)])
+    script = generator.block("event_whenflagclicked", next_block=generator.chain(statements))
+    return f"<xml><variables>{variables}</variables>{script}</xml>"
+
+
+def run_time(xml_string: str) -> float:
+    executor = Executor(block_registry=block_registry)
+    executor.load_program(xml_string)
+    start = time.perf_counter()
+    executor.start(is_eager=True)
+    executor.task_stack.wait_until_complete()
+    duration = time.perf_counter() - start
+    executor.stop()
+    return duration
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--size", type=int, default=5_000_000)
+    parser.add_argument("--fields", type=int, default=20)
+    args = parser.parse_args()
+
+    json_document = create_document(args.size)
+    for block_name in ["json_value", "json_path"]:
+        for is_cached in [False, True]:
+            json_plugin.document_cache = json_plugin.DocumentCache(max_documents=16 if is_cached else 0)
+            duration = run_time(create_program(json_document, args.fields, block_name))
+            cache = json_plugin.document_cache
+            print(f"{block_name:<10} {'cached' if is_cached else 'uncached':<8} {args.fields} fields "
+                  f"{duration * 1000:10.1f} ms   hits {cache.hits} misses {cache.misses} hit rate {cache.hit_rate:.2f}")
@@ -0,0 +1,93 @@
+"""
+Measures the items per second and peak RSS of iterating a large JSON array file with the "For each item of JSON array in
+file" block, against reading the file and assigning the array to a list. Every program runs in its own process, as the
+peak RSS of a process never goes down.
+
+    python -m benchmarks.json_items --items 200000
+"""
+import argparse
+import json
+import os
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+
+from benchmarks.generator import ProgramGenerator, ProgramShape
+from engine.blocks.default import default_blocks
+from engine.blocks.registry import BlockRegistry
+from engine.executor.executor import Executor
+from engine.executor.variable_reference import VariableRef
+from engine.plugins.io import io_blocks
+from engine.plugins.json import json_blocks
+
+block_registry = BlockRegistry([*default_blocks, *io_blocks, *json_blocks])
+programs = ["none", "for each item", "assign to list"]
+
+
+def create_program(path: str, program: str) -> str:
+    generator = ProgramGenerator(ProgramShape())
+    count = generator.field("VARIABLE", "", "count")
+    path_value = generator.value("PATH", f'<shadow type="text"><field name="TEXT">{path}</field></shadow>')
+    statements = []
+    if program == "for each item":
+        increment = generator.block("data_changevariableby", count, generator.value("VALUE", generator.number(1)))
+        statements.append(generator.block("json_foreachfileitem", generator.field("VARIABLE", "", "item"), path_value,
+                                          f'<statement name="SUBSTACK">{increment}</statement>'))
+    if program == "assign to list":
+        statements.append(generator.block("json_array_to_list", generator.value("VALUE", generator.block(
+            "io_readfile", path_value)), generator.field("VARIABLE_LIST", "list", "items")))
+        statements.append(generator.block("data_setvariableto", count, generator.value("VALUE", generator.block(
+            "data_lengthoflist", generator.field("LIST", "list", "items")))))
+    variables = "".join([generator.variable("", "count"), generator.variable("", "item"),
+                         generator.variable("list", "items")])
+    script = generator.block("event_whenflagclicked", next_block=generator.chain(statements))
+    return f"<xml><variables>{variables}</variables>{script}</xml>"
+
+
+def run_program(path: str, program: str) -> dict:
+    executor = Executor(block_registry=block_registry)
+    executor.load_program(create_program(path, program))
+    start = time.perf_counter()
+    executor.start(is_eager=True)
+    executor.task_stack.wait_until_complete()
+    duration = time.perf_counter() - start
+    executor.stop()
+    return {
+        "items": executor.get_variable(VariableRef("", "count")),
+        "duration": duration,
+        # Kilobytes on Linux
+        "peakRss": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    }
+
+
+def write_file(path: str, items: int):
+    with open(path, "w") as file:
+        file.write("[")
+        for item in range(items):
+            if item > 0:
+                file.write(",\n")
+            json.dump({"id": item, "name": f"item {item}", "tags": ["a", "b"], "score": item % 100 / 10}, file)
+        file.write("]")
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--items", type=int, default=200_000)
+    parser.add_argument("--run", nargs=2, metavar=("PATH", "PROGRAM"), help="Runs one program and prints its results")
+    args = parser.parse_args()
+
+    if args.run:
+        print(json.dumps(run_program(*args.run)))
+        sys.exit()
+    with tempfile.TemporaryDirectory() as directory:
+        file_path = os.path.join(directory, "items.json")
+        write_file(file_path, args.items)
+        print(f"file size {os.path.getsize(file_path) / 1024 / 1024:.1f} MB")
+        for program_name in programs:
+            output = subprocess.run([sys.executable, "-m", "benchmarks.json_items", "--run", file_path, program_name],
+                                    capture_output=True, text=True, check=True).stdout
+            results = json.loads(output.splitlines()[-1])
+            items_per_second = results["items"] / results["duration"] if results["items"] else 0
+            print(f"{program_name:<15} {items_per_second:12.0f} items/s   peak RSS {results['peakRss']:10d} KB")
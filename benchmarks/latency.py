@@ -0,0 +1,114 @@
+"""
+Measures scheduler wakeup latency for:
+ - a keyboard broadcast until the first block of the triggered script executes
+ - a step until the stepped block has executed and shows up in the status
+
+    python -m benchmarks.latency
+"""
+import random
+import statistics
+import threading
+import time
+
+from engine.blocks.block import pyblock
+from engine.executor.context import Context
+from engine.executor.executor import Executor
+
+probe_times: list[float] = []
+probe_event = threading.Event()
+
+
+@pyblock(category="benchmark")
+async def benchmark_probe(context: Context):
+    probe_times.append(time.perf_counter())
+    probe_event.set()
+    await context.next()
+
+
+def probe_chain(length: int) -> str:
+    chain = ""
+    for i in reversed(range(length)):
+        next_block = f"<next>{chain}</next>" if chain else ""
+        chain = f'<block type="benchmark_probe" id="probe-{i}">{next_block}</block>'
+    return chain
+
+
+keyboard_program = f"""
+<xml>
+    <block type="event_whenkeypressed" id="hat">
+        <field name="KEY_OPTION">a</field>
+        <next>{probe_chain(1)}</next>
+    </block>
+</xml>
+"""
+
+
+def step_program(steps: int):
+    return f"""
+    <xml>
+        <block type="event_whenflagclicked" id="hat">
+            <next>{probe_chain(steps)}</next>
+        </block>
+    </xml>
+    """
+
+
+def create_executor(program: str) -> Executor:
+    executor = Executor()
+    executor.load_blocks([benchmark_probe])
+    executor.load_program(program)
+    return executor
+
+
+def wait_for_probe(timeout: float = 5) -> float:
+    if not probe_event.wait(timeout):
+        raise TimeoutError("Probe block did not execute")
+    probe_event.clear()
+    return probe_times[-1]
+
+
+def keyboard_latency(samples: int) -> list[float]:
+    executor = create_executor(keyboard_program)
+    executor.start(is_eager=True)
+    latencies = []
+    try:
+        for _ in range(samples):
+            time.sleep(random.uniform(0, 0.05))
+            probe_event.clear()
+            start = time.perf_counter()
+            executor.broadcast("keyboard", "a")
+            latencies.append(wait_for_probe() - start)
+    finally:
+        executor.stop()
+    return latencies
+
+
+def step_latency(samples: int) -> list[float]:
+    executor = create_executor(step_program(samples))
+    executor.start()
+    latencies = []
+    try:
+        for _ in range(samples):
+            time.sleep(random.uniform(0, 0.05))
+            probe_event.clear()
+            start = time.perf_counter()
+            executor.step()
+            wait_for_probe()
+            while len(executor.get_highlights()) == 0 and executor.get_task_count() > 0:
+                time.sleep(0)
+            latencies.append(time.perf_counter() - start)
+    finally:
+        executor.stop()
+    return latencies
+
+
+def report(name: str, latencies: list[float]):
+    latencies_ms = sorted(latency * 1000 for latency in latencies)
+    p95 = latencies_ms[int(len(latencies_ms) * 0.95) - 1]
+    print(f"{name:<36} mean {statistics.mean(latencies_ms):8.3f} ms   "
+          f"median {statistics.median(latencies_ms):8.3f} ms   p95 {p95:8.3f} ms")
+
+
+if __name__ == '__main__':
+    report("keyboard broadcast -> first block", keyboard_latency(50))
+    report("step -> status", step_latency(50))
@@ -0,0 +1,72 @@
+"""
+Measures adding, replacing, deleting and searching for the items of a long list with the data blocks. Each operation
+is timed by running a program that fills the list and then applies the operation to every item, less the time taken to
+fill it.
+
+    python -m benchmarks.lists --size 100000
+"""
+import argparse
+import time
+
+from benchmarks.generator import ProgramGenerator, ProgramShape
+from engine.executor.executor import Executor
+
+
+def create_program(size: int, operation: str | None) -> str:
+    generator = ProgramGenerator(ProgramShape())
+    items = generator.field("LIST", "list", "items")
+    index = generator.block("data_variable", generator.field("VARIABLE", "", "index"))
+    statements = [generator.repeat(size, generator.chain([
+        generator.block("data_addtolist", items, generator.value("ITEM", generator.number(1)))
+    ]))]
+    if operation == "replace":
+        statements.append(generator.repeat(size, generator.chain([
+            generator.block("data_replaceitemoflist", items, generator.value("INDEX", index),
+                            generator.value("ITEM", generator.number(2))),
+            generator.block("data_changevariableby", generator.field("VARIABLE", "", "index"),
+                            generator.value("VALUE", generator.number(1)))
+        ])))
+    if operation == "delete":
+        # Deletes the last item, which does not move the others
+        last_index = generator.block("operator_subtract", generator.value(
+            "NUM1", generator.block("data_lengthoflist", items)), generator.value("NUM2", generator.number(1)))
+        statements.append(generator.repeat(size, generator.chain([
+            generator.block("data_deleteoflist", items, generator.value("INDEX", last_index))
+        ])))
+    if operation == "search":
+        # Searches for an item that is not in the list, which scans all of it without an index
+        position = generator.block("data_itemnumoflist", items, generator.value("ITEM", generator.number(2)))
+        statements.append(generator.repeat(size, generator.chain([
+            generator.block("data_setvariableto", generator.field("VARIABLE", "", "index"),
+                            generator.value("VALUE", position))
+        ])))
+    variables = generator.variable("list", "items") + generator.variable("", "index")
+    script = generator.block("event_whenflagclicked", next_block=generator.chain(statements))
+    return f"<xml><variables>{variables}</variables>{script}</xml>"
+
+
+def run_time(xml_string: str, repeats: int, executor: Executor = None) -> float:
+    if executor is None:
+        executor = Executor()
+    executor.load_program(xml_string)
+    durations = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        executor.start(is_eager=True)
+        executor.task_stack.wait_until_complete()
+        durations.append(time.perf_counter() - start)
+        executor.stop()
+    return min(durations)
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--size", type=int, default=100_000)
+    parser.add_argument("--repeats", type=int, default=3)
+    args = parser.parse_args()
+
+    fill_time = run_time(create_program(args.size, None), args.repeats)
+    print(f"append   {args.size} items {fill_time * 1000:10.1f} ms")
+    for operation_name in ["replace", "delete", "search"]:
+        operation_time = run_time(create_program(args.size, operation_name), args.repeats) - fill_time
+        print(f"{operation_name:<8} {args.size} items {operation_time * 1000:10.1f} ms")
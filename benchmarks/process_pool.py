@@ -0,0 +1,72 @@
+"""
+Compares aggregate throughput of sessions running in the server process with sessions running in an
+ExecutorProcessPool as the number of concurrent sessions grows.
+
+    python -m benchmarks.process_pool
+"""
+import asyncio
+import os
+import time
+
+from benchmarks.throughput import counter_program, blocks_per_iteration
+from engine.executor.executor import Executor
+from engine.executor.process_pool import ExecutorProcessPool
+from engine.executor.session import ExecutorSession
+
+iterations = 5_000
+
+
+def create_executor() -> Executor:
+    return Executor()
+
+
+async def run_session(session: ExecutorSession, is_pooled: bool):
+    async def handle(message: dict):
+        if is_pooled:
+            return await session.handle(message)
+        return await asyncio.to_thread(session.handle, message)
+
+    await handle({"type": "program", "value": counter_program.replace("{iterations}", str(iterations))})
+    status = await handle({"type": "start", "isEager": True})
+    # Eager steps run inline, so the task count drops before the loop is done
+    while get_counter(status) < iterations:
+        await asyncio.sleep(0.01)
+        status = await handle({"type": "status"})
+
+
+def get_counter(status: dict) -> float:
+    return next(variable["value"] for variable in status["variables"] if variable["id"] == "counter")
+
+
+async def measure(session_count: int, pool: ExecutorProcessPool | None) -> float:
+    if pool is not None:
+        sessions = [await pool.open_session() for _ in range(session_count)]
+    else:
+        sessions = [ExecutorSession(create_executor()) for _ in range(session_count)]
+    start = time.perf_counter()
+    await asyncio.gather(*[run_session(session, pool is not None) for session in sessions])
+    duration = time.perf_counter() - start
+    for session in sessions:
+        if pool is not None:
+            await session.close()
+        else:
+            session.close()
+    return session_count * iterations * blocks_per_iteration / duration
+
+
+async def main():
+    pool = ExecutorProcessPool(create_executor, size=os.cpu_count())
+    # Start the workers before measuring
+    await measure(os.cpu_count(), pool)
+    print(f"{'sessions':>8}{'in process (blocks/s)':>26}{'process pool (blocks/s)':>26}")
+    try:
+        for session_count in [1, 2, 4, 8, 16]:
+            in_process = await measure(session_count, None)
+            pooled = await measure(session_count, pool)
+            print(f"{session_count:>8}{in_process:>26.0f}{pooled:>26.0f}")
+    finally:
+        pool.shutdown()
+
+
+if __name__ == '__main__':
+    asyncio.run(main())
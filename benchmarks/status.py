@@ -0,0 +1,49 @@
+"""
+Compares the size and serialisation time of full and delta status messages while stepping a program that holds a
+100k element list. The list is assigned once and a counter changes between statuses, as in a loop over the list.
+
+    python -m benchmarks.status
+"""
+import json
+import time
+
+from engine.executor.executor import Executor
+from engine.executor.session import ExecutorSession
+
+list_size = 100_000
+steps = 50
+
+list_program = """
+<xml>
+    <variables>
+        <variable type="list" id="items">items</variable>
+        <variable type="" id="index">index</variable>
+    </variables>
+</xml>
+"""
+
+
+def measure(is_delta: bool) -> tuple[float, float]:
+    session = ExecutorSession(Executor())
+    session.handle({"type": "program", "value": list_program})
+    executor = session.executor
+    executor.load_variables()
+    items, index = executor.compiled_program.variables.slots
+    executor.set_variable(items, list(range(list_size)))
+    version = session.handle({"type": "snapshot"})["version"]
+    total_bytes = 0
+    start = time.perf_counter()
+    for i in range(steps):
+        executor.set_variable(index, i)
+        status = session.handle({"type": "status", "ackVersion": version if is_delta else None})
+        total_bytes += len(json.dumps(status))
+        version = status["version"]
+    duration = time.perf_counter() - start
+    session.close()
+    return total_bytes / steps, duration / steps
+
+
+if __name__ == '__main__':
+    for mode, is_delta in [("full", False), ("delta", True)]:
+        size, duration = measure(is_delta)
+        print(f"{mode:<6} {size:12.0f} bytes/status {duration * 1000:9.3f} ms/status")
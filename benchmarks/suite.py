@@ -0,0 +1,236 @@
+"""
+Headless benchmark suite for the engine. Programs are loaded straight into an Executor, without the server, the GUI or
+keyboard control.
+
+Programs in programs/*.xml are parsed and compiled only, as running them would press keys and open windows. Their plugin
+blocks are loaded when the plugins can be imported, and programs that use blocks which are not available are skipped.
+Generated programs are also run to measure blocks per second, step latency and peak memory.
+
+    python -m benchmarks.suite --output results.json
+    python -m benchmarks.suite --output results.json --compare previous.json
+"""
+import argparse
+import glob
+import json
+import logging
+import os
+import platform
+import statistics
+import subprocess
+import time
+import tracemalloc
+import xml.etree.ElementTree as ElementTree
+from typing import Callable
+
+from benchmarks.generator import ProgramShape, generate_program
+from engine.blocks.block import PyBlockSettings
+from engine.executor.compiler import ProgramCompiler
+from engine.executor.exceptions import ExecutionException
+from engine.executor.executor import Executor
+from engine.executor.profiler import BlockProfiler
+from engine.executor.program_cache import ProgramCache
+
+logger = logging.getLogger(__name__)
+
+generated_shapes = {
+    "small": ProgramShape(scripts=1, chain_length=10, loop_depth=1, loop_iterations=100),
+    "long_chains": ProgramShape(scripts=4, chain_length=200, loop_depth=1, loop_iterations=10),
+    "nested_loops": ProgramShape(scripts=2, chain_length=4, loop_depth=3, loop_iterations=12),
+    "lists": ProgramShape(scripts=2, chain_length=10, loop_depth=1, loop_iterations=100, list_size=2_000),
+    "broadcast_hats": ProgramShape(scripts=20, chain_length=4, loop_depth=1, loop_iterations=20, broadcast_hats=50),
+    "many_scripts": ProgramShape(scripts=200, chain_length=10, loop_depth=1, loop_iterations=5)
+}
+
+
+def load_plugin_blocks() -> list[PyBlockSettings]:
+    blocks = []
+    from engine.plugins.io import io_blocks
+    from engine.plugins.json import json_blocks
+    from engine.plugins.numbers import numbers_blocks
+    from engine.plugins.strings import strings_blocks
+    blocks.extend([*io_blocks, *json_blocks, *numbers_blocks, *strings_blocks])
+    # These need a display to import, but their blocks are only compiled here
+    try:
+        from engine.plugins.gui import gui_blocks
+        blocks.extend(gui_blocks)
+    except Exception as e:
+        logger.warning("GUI blocks are not available: %s", e)
+    try:
+        from engine.plugins.keyboard import keyboard_blocks
+        blocks.extend(keyboard_blocks)
+    except Exception as e:
+        logger.warning("Keyboard blocks are not available: %s", e)
+    return blocks
+
+
+def best_time(func: Callable[[], None], repeats: int) -> float:
+    durations = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        func()
+        durations.append(time.perf_counter() - start)
+    return min(durations)
+
+
+def parse(xml_string: str) -> ElementTree.Element:
+    return ElementTree.fromstring(Executor._namespace_pattern.sub("", xml_string))
+
+
+def compile_program(executor: Executor, program: ElementTree.Element):
+    executor.link_program(ProgramCompiler(executor.block_definitions, executor.block_signatures).compile(program))
+
+
+def measure_loading(executor: Executor, xml_string: str, repeats: int) -> dict:
+    program = parse(xml_string)
+    parse_time = best_time(lambda: parse(xml_string), repeats)
+    compile_time = best_time(lambda: compile_program(executor, program), repeats)
+    # A program that is loaded again is taken from the program cache, and is not compiled or relinked
+    executor.load_program(xml_string)
+    cached_load_time = best_time(lambda: executor.load_program(xml_string), repeats)
+    compile_peak_memory = measure_peak_memory(
+        lambda: Executor(block_registry=executor.block_registry, program_cache=ProgramCache()).load_program(xml_string))
+    return {
+        "blocks": len(executor.compiled_program.blocks),
+        "scripts": len(executor.compiled_program.starting_blocks),
+        "parseTime": parse_time,
+        "compileTime": compile_time,
+        "cachedLoadTime": cached_load_time,
+        "compilePeakMemory": compile_peak_memory
+    }
+
+
+def measure_peak_memory(func: Callable[[], None]) -> int:
+    tracemalloc.start()
+    try:
+        func()
+        return tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+
+def run_to_completion(executor: Executor):
+    executor.start(is_eager=True)
+    executor.task_stack.wait_until_complete()
+    executor.stop()
+
+
+def count_block_executions(xml_string: str) -> int:
+    executor = Executor(profiler=BlockProfiler())
+    executor.load_program(xml_string)
+    run_to_completion(executor)
+    return sum(stats["calls"] for stats in executor.profiler.get_block_stats())
+
+
+def measure_step_latency(xml_string: str, samples: int) -> list[float]:
+    executor = Executor()
+    executor.load_program(xml_string)
+    executor.start()
+    latencies = []
+    try:
+        for _ in range(samples):
+            # A step has been run once it changes the highlights or a variable
+            state = (frozenset(executor.get_highlights()), executor.variable_store.version)
+            if executor.get_task_count() == 0:
+                break
+            start = time.perf_counter()
+            executor.step()
+            deadline = start + 1
+            while (frozenset(executor.get_highlights()), executor.variable_store.version) == state \
+                    and executor.get_task_count() > 0 and time.perf_counter() < deadline:
+                time.sleep(0)
+            latencies.append(time.perf_counter() - start)
+    finally:
+        executor.stop()
+    return latencies
+
+
+def measure_generated(name: str, shape: ProgramShape, repeats: int, step_samples: int) -> dict:
+    xml_string = generate_program(shape)
+    executor = Executor()
+    result = {"name": name, "source": "generated", "shape": shape.__dict__}
+    result.update(measure_loading(executor, xml_string, repeats))
+    block_executions = count_block_executions(xml_string)
+    run_time = best_time(lambda: run_to_completion(executor), repeats)
+    latencies = sorted(measure_step_latency(xml_string, step_samples))
+    result.update({
+        "blockExecutions": block_executions,
+        "runTime": run_time,
+        "blocksPerSecond": block_executions / run_time,
+        "stepLatencyMean": statistics.mean(latencies) if latencies else None,
+        "stepLatencyP95": latencies[max(int(len(latencies) * 0.95) - 1, 0)] if latencies else None,
+        "runPeakMemory": measure_peak_memory(lambda: run_to_completion(executor))
+    })
+    return result
+
+
+def measure_file(path: str, plugin_blocks: list[PyBlockSettings], repeats: int) -> dict:
+    with open(path) as file:
+        xml_string = file.read()
+    executor = Executor()
+    executor.load_blocks(plugin_blocks)
+    result = {"name": os.path.basename(path), "source": path}
+    try:
+        result.update(measure_loading(executor, xml_string, repeats))
+    except ExecutionException as e:
+        result["skipped"] = str(e)
+    return result
+
+
+def get_commit() -> str | None:
+    try:
+        return subprocess.run(["git", "rev-parse", "HEAD"], capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def run_suite(program_paths: list[str], repeats: int, step_samples: int) -> dict:
+    plugin_blocks = load_plugin_blocks()
+    results = [measure_file(path, plugin_blocks, repeats) for path in program_paths]
+    results.extend(measure_generated(name, shape, repeats, step_samples) for name, shape in generated_shapes.items())
+    return {
+        "commit": get_commit(),
+        "timestamp": time.time(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "results": results
+    }
+
+
+def print_results(suite: dict, previous: dict = None):
+    previous_results = {result["name"]: result for result in previous["results"]} if previous else {}
+    metrics = ["parseTime", "compileTime", "cachedLoadTime", "blocksPerSecond", "stepLatencyMean", "runPeakMemory"]
+    for result in suite["results"]:
+        if "skipped" in result:
+            print(f"{result['name']:<16} skipped: {result['skipped']}")
+            continue
+        columns = []
+        for metric in metrics:
+            value = result.get(metric)
+            if value is None:
+                continue
+            column = f"{metric} {value:.6g}"
+            previous_value = previous_results.get(result["name"], {}).get(metric)
+            if previous_value:
+                column += f" ({(value / previous_value - 1) * 100:+.1f}%)"
+            columns.append(column)
+        print(f"{result['name']:<16} {'   '.join(columns)}")
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--output", help="File to store the results in as JSON")
+    parser.add_argument("--compare", help="Results of a previous run to compare with")
+    parser.add_argument("--programs", default="programs/*.xml", help="Glob of program files to load")
+    parser.add_argument("--repeats", type=int, default=5)
+    parser.add_argument("--step-samples", type=int, default=20)
+    args = parser.parse_args()
+
+    suite_results = run_suite(sorted(glob.glob(args.programs)), args.repeats, args.step_samples)
+    previous_results = None
+    if args.compare:
+        with open(args.compare) as previous_file:
+            previous_results = json.load(previous_file)
+    print_results(suite_results, previous_results)
+    if args.output:
+        with open(args.output, "w") as output_file:
+            json.dump(suite_results, output_file, indent=2)
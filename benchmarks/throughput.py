@@ -0,0 +1,75 @@
+"""
+Measures how long it takes to run a loop heavy program to completion, both eagerly and through "complete".
+
+    python -m benchmarks.throughput
+"""
+import time
+
+from engine.executor.executor import Executor
+
+counter_program = """
+<xml>
+    <variables>
+        <variable type="" id="counter">counter</variable>
+        <variable type="" id="total">total</variable>
+    </variables>
+    <block type="event_whenflagclicked" id="hat">
+        <next>
+            <block type="control_repeat" id="loop">
+                <value name="TIMES"><shadow type="math_whole_number"><field name="NUM">{iterations}</field></shadow></value>
+                <statement name="SUBSTACK">
+                    <block type="data_changevariableby" id="increment">
+                        <field name="VARIABLE" id="counter" variabletype="">counter</field>
+                        <value name="VALUE"><shadow type="math_number"><field name="NUM">1</field></shadow></value>
+                        <next>
+                            <block type="data_setvariableto" id="sum">
+                                <field name="VARIABLE" id="total" variabletype="">total</field>
+                                <value name="VALUE">
+                                    <block type="operator_add" id="add">
+                                        <value name="NUM1">
+                                            <block type="data_variable" id="read-total">
+                                                <field name="VARIABLE" id="total" variabletype="">total</field>
+                                            </block>
+                                        </value>
+                                        <value name="NUM2">
+                                            <block type="operator_multiply" id="multiply">
+                                                <value name="NUM1">
+                                                    <block type="data_variable" id="read-counter">
+                                                        <field name="VARIABLE" id="counter" variabletype="">counter</field>
+                                                    </block>
+                                                </value>
+                                                <value name="NUM2"><shadow type="math_number"><field name="NUM">2</field></shadow></value>
+                                            </block>
+                                        </value>
+                                    </block>
+                                </value>
+                            </block>
+                        </next>
+                    </block>
+                </statement>
+            </block>
+        </next>
+    </block>
+</xml>
+"""
+blocks_per_iteration = 6
+
+
+def run(iterations: int, is_eager: bool) -> float:
+    executor = Executor()
+    executor.load_program(counter_program.replace("{iterations}", str(iterations)))
+    start = time.perf_counter()
+    executor.start(is_eager=is_eager)
+    executor.complete()
+    executor.task_stack.wait_until_complete()
+    duration = time.perf_counter() - start
+    executor.stop()
+    return duration
+
+
+if __name__ == '__main__':
+    iterations = 5_000
+    for mode, is_eager in [("eager", True), ("complete", False)]:
+        duration = run(iterations, is_eager)
+        blocks = iterations * blocks_per_iteration
+        print(f"{mode:<10} {duration * 1000:9.1f} ms   {blocks / duration:10.0f} blocks/s")
@@ -0,0 +1,42 @@
+"""
+Measures the cost of debug logging, the execution tracer and the block profiler on the throughput benchmark's program.
+
+    python -m benchmarks.tracing
+"""
+import logging
+import time
+
+from benchmarks.throughput import counter_program, blocks_per_iteration
+from engine.executor.executor import Executor
+from engine.executor.profiler import BlockProfiler
+from engine.executor.tracer import ExecutionTracer
+
+iterations = 5_000
+
+
+def run(tracer: ExecutionTracer = None, profiler: BlockProfiler = None) -> float:
+    executor = Executor(tracer=tracer, profiler=profiler)
+    executor.load_program(counter_program.replace("{iterations}", str(iterations)))
+    start = time.perf_counter()
+    executor.start(is_eager=True)
+    executor.task_stack.wait_until_complete()
+    duration = time.perf_counter() - start
+    executor.stop()
+    return duration
+
+
+if __name__ == '__main__':
+    root = logging.getLogger()
+    # Records below WARN are discarded by the handler, as with the root logger at DEBUG in logging.conf before
+    handler = logging.StreamHandler()
+    handler.setLevel(logging.WARN)
+    root.addHandler(handler)
+    for mode, level, tracer, profiler in [
+        ("debug level, discarded", logging.DEBUG, None, None),
+        ("warn level", logging.WARN, None, None),
+        ("warn level, traced", logging.WARN, ExecutionTracer(10_000), None),
+        ("warn level, profiled", logging.WARN, None, BlockProfiler())
+    ]:
+        root.setLevel(level)
+        duration = min(run(tracer, profiler) for _ in range(3))
+        print(f"{mode:<24} {duration * 1000:9.1f} ms   {iterations * blocks_per_iteration / duration:10.0f} blocks/s")
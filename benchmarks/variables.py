@@ -0,0 +1,95 @@
+"""
+Measures variable access, both for the store alone (compared with the previous dict keyed by VariableRef) and for a
+loop that increments a counter with data_changevariableby.
+
+    python -m benchmarks.variables
+"""
+import statistics
+import time
+import timeit
+
+from engine.executor.executor import Executor
+from engine.executor.variable_reference import VariableRef
+
+increment_program = """
+<xml>
+    <variables>
+        <variable type="" id="counter">counter</variable>
+    </variables>
+    <block type="event_whenflagclicked" id="hat">
+        <next>
+            <block type="control_repeat" id="loop">
+                <value name="TIMES"><shadow type="math_whole_number"><field name="NUM">{iterations}</field></shadow></value>
+                <statement name="SUBSTACK">
+                    <block type="data_changevariableby" id="increment">
+                        <field name="VARIABLE" id="counter" variabletype="">counter</field>
+                        <value name="VALUE"><shadow type="math_number"><field name="NUM">1</field></shadow></value>
+                    </block>
+                </statement>
+            </block>
+        </next>
+    </block>
+</xml>
+"""
+
+
+class DictVariables:
+    """
+    The previous store, a dict keyed by VariableRef
+    """
+
+    def __init__(self):
+        self.variables = {}
+
+    def get(self, ref: VariableRef):
+        return self.variables[ref]
+
+    def set(self, ref: VariableRef, value):
+        self.variables[ref] = value
+
+
+def measure_store(rounds: int = 15, increments: int = 300_000) -> tuple[list[float], list[float]]:
+    """
+    Returns the time per increment of every round for the dict and the store, which take turns so that both see the
+    same noise
+    """
+    executor = Executor()
+    executor.load_program(increment_program.replace("{iterations}", "1"))
+    executor.load_variables()
+    slot = executor.compiled_program.variables.slots[0]
+    ref = VariableRef(slot.type, slot.id)
+    variables = DictVariables()
+    variables.set(ref, 0)
+    store = executor.variable_store
+
+    def dict_increment():
+        variables.set(ref, float(variables.get(ref)) + 1.0)
+
+    def store_increment():
+        store.set(slot, float(store.get(slot)) + 1.0)
+
+    dict_durations, store_durations = [], []
+    for _ in range(rounds):
+        dict_durations.append(timeit.timeit(dict_increment, number=increments) / increments)
+        store_durations.append(timeit.timeit(store_increment, number=increments) / increments)
+    return dict_durations, store_durations
+
+
+def run(iterations: int) -> float:
+    executor = Executor()
+    executor.load_program(increment_program.replace("{iterations}", str(iterations)))
+    start = time.perf_counter()
+    executor.start(is_eager=True)
+    executor.task_stack.wait_until_complete()
+    duration = time.perf_counter() - start
+    assert executor.get_variables()[0]["value"] == iterations
+    executor.stop()
+    return duration
+
+
+if __name__ == '__main__':
+    for name, durations in zip(["dict increment", "store increment"], measure_store()):
+        print(f"{name:<16} median {statistics.median(durations) * 1e9:8.1f} ns   min {min(durations) * 1e9:8.1f} ns")
+    iterations = 20_000
+    duration = min(run(iterations) for _ in range(7))
+    print(f"counter loop     {duration * 1000:8.1f} ms   {iterations / duration:10.0f} increments/s (best of 7)")
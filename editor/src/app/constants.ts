@@ -2,6 +2,6 @@ export const CONFIG = {
   websocketEndpoint: 'ws://localhost:3001/executor',
   blocksEndpoint: 'http://localhost:3001/blocks',
   visibleVariables: [
-    '', 'list'
+    '', 'list', 'array'
   ]
 };
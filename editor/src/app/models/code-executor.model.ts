@@ -11,10 +11,27 @@ interface Message {
 type VariableDefinition = { name: string, type: string, id: string, value: any };
 
 interface StatusMessage extends Message {
+  version: number;
+  isDelta: boolean;
   taskCount: number;
-  highlights: string[];
   isRunning: boolean;
   variables: VariableDefinition[];
+  // Full status
+  highlights?: string[];
+  // Changes since baseVersion
+  baseVersion?: number;
+  removedVariables?: { type: string, id: string }[];
+  addedHighlights?: string[];
+  removedHighlights?: string[];
+}
+
+type BlockProfile = { id: string, type: string, calls: number, cumulativeTime: number, selfTime: number };
+
+interface ProfileMessage extends Message {
+  isEnabled: boolean;
+  blocks: BlockProfile[];
+  types: Omit<BlockProfile, 'id'>[];
+  folded: string;
 }
 
 export default class CodeExecutor {
@@ -27,6 +44,11 @@ export default class CodeExecutor {
   public isRunning$ = new BehaviorSubject(false);
   public taskCount$ = new BehaviorSubject(0);
   public highlights$ = new BehaviorSubject<string[]>([]);
+  public profile$ = new BehaviorSubject<ProfileMessage>(null);
+
+  private statusVersion: number = null;
+  private variableDefinitions = new Map<string, VariableDefinition>();
+  private highlights = new Set<string>();
 
   public connect(): void {
     if (!this.socket$ || this.socket$.closed) {
@@ -66,31 +88,52 @@ export default class CodeExecutor {
   public start(isEager: boolean = false) {
     this.sendMessage({
       type: 'start',
-      isEager
+      isEager,
+      ackVersion: this.statusVersion
     });
   }
 
   public stop() {
     this.sendMessage({
-      type: 'stop'
+      type: 'stop',
+      ackVersion: this.statusVersion
     });
   }
 
   public step() {
     this.sendMessage({
-      type: 'step'
+      type: 'step',
+      ackVersion: this.statusVersion
     });
   }
 
   public status() {
     this.sendMessage({
-      type: 'status'
+      type: 'status',
+      ackVersion: this.statusVersion
+    });
+  }
+
+  public profile(isEnabled?: boolean) {
+    this.sendMessage(isEnabled === undefined ? {type: 'profile'} : {type: 'profile', isEnabled});
+  }
+
+  public trace() {
+    this.sendMessage({
+      type: 'trace'
+    });
+  }
+
+  public snapshot() {
+    this.sendMessage({
+      type: 'snapshot'
     });
   }
 
   public complete() {
     this.sendMessage({
-      type: 'complete'
+      type: 'complete',
+      ackVersion: this.statusVersion
     });
   }
 
@@ -107,16 +150,39 @@ export default class CodeExecutor {
       case 'status':
         this.onStatusMessage(message as StatusMessage);
         return false;
+      case 'profile':
+        this.profile$.next(message as ProfileMessage);
+        return false;
     }
     return false;
   }
 
   private onStatusMessage(message: StatusMessage) {
+    if (message.isDelta && message.baseVersion !== this.statusVersion) {
+      // The changes are relative to a status that has since been replaced
+      this.statusVersion = null;
+      this.snapshot();
+      return;
+    }
+    this.statusVersion = message.version;
     this.isRunning$.next(message.isRunning);
     this.taskCount$.next(message.taskCount);
-    this.highlights$.next(message.highlights);
-    const variables: { [k: string]: string } = {};
+    if (message.isDelta) {
+      for (const variable of message.removedVariables) {
+        this.variableDefinitions.delete(`${variable.type}-${variable.id}`);
+      }
+      message.removedHighlights.forEach(id => this.highlights.delete(id));
+      message.addedHighlights.forEach(id => this.highlights.add(id));
+    } else {
+      this.variableDefinitions.clear();
+      this.highlights = new Set(message.highlights);
+    }
     for (const variableDefinition of message.variables) {
+      this.variableDefinitions.set(`${variableDefinition.type}-${variableDefinition.id}`, variableDefinition);
+    }
+    this.highlights$.next(Array.from(this.highlights));
+    const variables: { [k: string]: string } = {};
+    for (const variableDefinition of this.variableDefinitions.values()) {
       if (!CONFIG.visibleVariables.includes(variableDefinition.type)) {
         continue;
       }
@@ -143,6 +209,7 @@ export default class CodeExecutor {
     this.socket$.complete();
     this.subSink.unsubscribe();
     this.highlights$.complete();
+    this.profile$.complete();
     this.isRunning$.complete();
     this.variables$.complete();
     this.taskCount$.complete();
@@ -31,6 +31,8 @@ class PyBlockSettings(TypedDict, total=False):
     is_visible: bool
     can_run: bool
     is_predefined: bool
+    # The block's result only depends on its arguments and the variables it reads
+    is_pure: bool
     func: Callable
     definition: Optional[PyBlockDefinition]
 
@@ -46,6 +48,7 @@ default_settings = ManagedPyBlockSettings(
     is_visible=True,
     can_run=False,
     is_predefined=False,
+    is_pure=False,
     func=noop,
     definition=None
 )
@@ -6,6 +6,8 @@ from engine.executor.executor import Executor
 
 
 class CorePluginContext:
+    # Broadcasts key releases for the hats that listen for them
+    block_types = ("event_whenkeypressed", "keyboard_whenkeypressed")
     executor: Executor
     key_listener: Listener
 
@@ -1,4 +1,3 @@
-import time
 from typing import Callable
 
 from engine.blocks.block import pyblock, collect_blocks
@@ -9,7 +8,7 @@ from engine.executor.value import Value
 
 @pyblock(category="control", is_predefined=True)
 async def control_wait(context: Context, duration: float):
-    time.sleep(duration)
+    await context.sleep(duration)
     await context.next()
 
 
@@ -43,14 +42,15 @@ async def control_if_else(context: Context, condition: bool, substack: BlockCall
 
 
 @pyblock(category="control", is_predefined=True)
-async def control_wait_until(context: Context, condition: bool):
-    if not condition:
-        await context.recurse()
+async def control_wait_until(context: Context, condition: Value[bool]):
+    await context.watch(condition).wait_until_true()
+    await context.next()
 
 
 @pyblock(category="control", is_predefined=True)
 async def control_repeat_until(context: Context, condition: Value[bool], substack: BlockCall):
-    while await condition.get():
+    watch = context.watch(condition)
+    while await watch.evaluate():
         await substack()
     await context.next()
 
@@ -2,6 +2,7 @@ from typing import Any
 
 from engine.blocks.block import pyblock, collect_blocks
 from engine.executor.context import Context, VariableRef
+from engine.executor.variables.list_index import delete_item, replace_item
 
 
 def __get_variable_list(context: Context, variable_ref: VariableRef):
@@ -23,7 +24,7 @@ async def data_changevariableby(context: Context, variable: VariableRef, value:
     await context.next()
 
 
-@pyblock(category="data", is_predefined=True)
+@pyblock(category="data", is_predefined=True, is_pure=True)
 def data_variable(context: Context, variable: VariableRef):
     return context.get_variable(variable)
 
@@ -40,75 +41,58 @@ async def data_hidevariable(context: Context, variable: VariableRef):
 
 @pyblock(category="data", is_predefined=True)
 async def data_addtolist(context: Context, param_list: VariableRef, item: Any):
-    var_value = __get_variable_list(context, param_list)
-    var_value.append(item)
-    context.set_variable(param_list, var_value)
+    context.change_list(param_list, list.append, item)
     await context.next()
 
 
 @pyblock(category="data", is_predefined=True)
 async def data_insertatlist(context: Context, param_list: VariableRef, item: Any, index: int):
-    var_value = __get_variable_list(context, param_list)
-    var_value.insert(int(index), item)
-    context.set_variable(param_list, var_value)
+    context.change_list(param_list, list.insert, int(index), item)
     await context.next()
 
 
 @pyblock(category="data", is_predefined=True)
 async def data_deleteoflist(context: Context, param_list: VariableRef, index: int):
-    var_value = __get_variable_list(context, param_list)
-    index = int(index)
-    var_value = var_value[:index] + var_value[index + 1:]
-    context.set_variable(param_list, var_value)
+    context.change_list(param_list, delete_item, int(index))
     await context.next()
 
 
 @pyblock(category="data", is_predefined=True)
 async def data_replaceitemoflist(context: Context, param_list: VariableRef, index: int, item: Any):
-    var_value = __get_variable_list(context, param_list)
-    index = int(index)
-    var_value = var_value[:index] + [item] + var_value[index + 1:]
-    context.set_variable(param_list, var_value)
+    context.change_list(param_list, replace_item, int(index), item)
     await context.next()
 
 
-@pyblock(category="data", is_predefined=True)
+@pyblock(category="data", is_predefined=True, is_pure=True)
 async def data_itemoflist(context: Context, param_list: VariableRef, index: int):
     var_value = __get_variable_list(context, param_list)
     index = int(index)
     return var_value[index]
 
 
-@pyblock(category="data", is_predefined=True)
+@pyblock(category="data", is_predefined=True, is_pure=True)
 def data_itemnumoflist(context: Context, param_list: VariableRef, item: Any):
-    var_value = __get_variable_list(context, param_list)
+    return context.find_item(param_list, item)
 
-    for i, el in enumerate(var_value):
-        if el == item:
-            return i
-    return -1
 
-
-@pyblock(category="data", is_predefined=True)
+@pyblock(category="data", is_predefined=True, is_pure=True)
 def data_lengthoflist(context: Context, param_list: VariableRef):
     var_value = __get_variable_list(context, param_list)
     return len(var_value)
 
 
-@pyblock(category="data", is_predefined=True)
+@pyblock(category="data", is_predefined=True, is_pure=True)
 def data_listcontents(context: Context, param_list: VariableRef):
-    var_value = __get_variable_list(context, param_list)
+    # The list may be assigned to another variable, so it must not change with this one
+    var_value = context.snapshot_variable(param_list)
+    if type(var_value) != list:
+        var_value = list(var_value)
     return var_value
 
 
-@pyblock(category="data", is_predefined=True)
+@pyblock(category="data", is_predefined=True, is_pure=True)
 def data_listcontainsitem(context: Context, param_list: VariableRef, item: Any):
-    var_value = __get_variable_list(context, param_list)
-
-    for el in var_value:
-        if el == item:
-            return True
-    return False
+    return context.find_item(param_list, item) != -1
 
 
 @pyblock(category="data", is_predefined=True)
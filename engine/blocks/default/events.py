@@ -6,31 +6,27 @@ from engine.executor.variable_reference import VariableRef
 @pyblock(category="events", is_predefined=True, can_run=True)
 def event_whenflagclicked(context: Context):
     def listener(topic, message):
-        if topic == "executor" and message == "start":
-            return context.next()
+        return context.next()
 
-    context.listen(listener)
+    context.listen(listener, "executor", "start")
 
 
 @pyblock(category="events", is_predefined=True, can_run=True)
 def event_whenkeypressed(context: Context, key_option: str):
     def listener(topic, message):
-        listen_key = key_option.replace(" arrow", "")
-        if topic == "keyboard" and (key_option == "any" or message == listen_key):
-            return context.next()
+        return context.next()
 
-    context.listen(listener)
+    context.listen(listener, "keyboard", None if key_option == "any" else key_option.replace(" arrow", ""))
 
 
 @pyblock(category="events", is_predefined=True, can_run=True)
 def event_whenbroadcastreceived(context: Context, broadcast_option: VariableRef):
     broadcast_value: str = context.get_variable(broadcast_option)
 
-    def listener(topic, received_message):
-        if topic == "broadcast" and received_message == broadcast_value:
-            return context.next()
+    def listener(topic, message):
+        return context.next()
 
-    context.listen(listener)
+    context.listen(listener, "broadcast", broadcast_value)
 
 
 @pyblock(category="events", is_predefined=True)
@@ -5,27 +5,27 @@ from engine.blocks.block import pyblock, collect_blocks
 from engine.executor.context import Context
 
 
-@pyblock(category="operators", is_predefined=True)
+@pyblock(category="operators", is_predefined=True, is_pure=True)
 def operator_add(context: Context, num1: float, num2: float):
     return float(num1) + float(num2)
 
 
-@pyblock(category="operators", is_predefined=True)
+@pyblock(category="operators", is_predefined=True, is_pure=True)
 def operator_subtract(context: Context, num1: float, num2: float):
     return float(num1) - float(num2)
 
 
-@pyblock(category="operators", is_predefined=True)
+@pyblock(category="operators", is_predefined=True, is_pure=True)
 def operator_multiply(context: Context, num1: float, num2: float):
     return float(num1) * float(num2)
 
 
-@pyblock(category="operators", is_predefined=True)
+@pyblock(category="operators", is_predefined=True, is_pure=True)
 def operator_divide(context: Context, num1: float, num2: float):
     return float(num1) / float(num2)
 
 
-@pyblock(category="operators", is_predefined=True)
+@pyblock(category="operators", is_predefined=True, is_pure=True)
 def operator_mod(context: Context, num1: float, num2: float):
     return float(num1) % float(num2)
 
@@ -35,46 +35,46 @@ def operator_random(context: Context, **kwargs):
     return random.randrange(int(kwargs["from"]), int(kwargs["to"]))
 
 
-@pyblock(category="operators", is_predefined=True)
+@pyblock(category="operators", is_predefined=True, is_pure=True)
 def operator_lt(context: Context, operand1: float, operand2: float):
     return float(operand1) < float(operand2)
 
 
-@pyblock(category="operators", is_predefined=True)
+@pyblock(category="operators", is_predefined=True, is_pure=True)
 def operator_equals(context: Context, operand1: float, operand2: float):
     return operand1 == operand2
 
-@pyblock(category="operators", is_predefined=True)
+@pyblock(category="operators", is_predefined=True, is_pure=True)
 def operator_gt(context: Context, operand1: float, operand2: float):
     return operand1 > float(operand2)
 
 
-@pyblock(category="operators", is_predefined=True)
+@pyblock(category="operators", is_predefined=True, is_pure=True)
 def operator_round(context: Context, value: float):
     return round(value)
 
 
-@pyblock(category="operators", is_predefined=True)
+@pyblock(category="operators", is_predefined=True, is_pure=True)
 def operator_and(context: Context, operand1: bool, operand2: bool):
     return operand1 and operand2
 
 
-@pyblock(category="operators", is_predefined=True)
+@pyblock(category="operators", is_predefined=True, is_pure=True)
 def operator_or(context: Context, operand1: bool, operand2: bool):
     return operand1 or operand2
 
 
-@pyblock(category="operators", is_predefined=True)
+@pyblock(category="operators", is_predefined=True, is_pure=True)
 def operator_not(context: Context, operand: bool):
     return not operand
 
 
-@pyblock(category="operators", is_predefined=True)
+@pyblock(category="operators", is_predefined=True, is_pure=True)
 def operator_join(context: Context, string1: str, string2: str):
     return str(string1) + str(string2)
 
 
-@pyblock(category="operators", is_predefined=True)
+@pyblock(category="operators", is_predefined=True, is_pure=True)
 def operator_letter_of(context: Context, letter: int, string: str):
     try:
         return string[int(letter)]
@@ -82,17 +82,17 @@ def operator_letter_of(context: Context, letter: int, string: str):
         return None
 
 
-@pyblock(category="operators", is_predefined=True)
+@pyblock(category="operators", is_predefined=True, is_pure=True)
 def operator_length(context: Context, value: str):
     return len(value)
 
 
-@pyblock(category="operators", is_predefined=True)
+@pyblock(category="operators", is_predefined=True, is_pure=True)
 def operator_contains(context: Context, string1: str, string2: str):
     return string2 in string1
 
 
-@pyblock(category="operators", is_predefined=True)
+@pyblock(category="operators", is_predefined=True, is_pure=True)
 def operator_mathop(context: Context, operator: str, num: float):
     num = float(num)
     if operator == "abs":
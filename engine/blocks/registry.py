@@ -0,0 +1,33 @@
+from types import MappingProxyType
+from typing import Mapping
+
+from engine.blocks.block import PyBlockSettings
+from engine.blocks.signature import BlockSignature
+
+
+class BlockRegistry:
+    """
+    Immutable set of block definitions and their signatures. A registry can be shared by any number of executors, and
+    adding blocks creates a new registry rather than changing this one.
+    """
+    block_definitions: Mapping[str, PyBlockSettings]
+    block_signatures: Mapping[str, BlockSignature]
+
+    def __init__(self, blocks: list[PyBlockSettings] = None, block_signatures: Mapping[str, BlockSignature] = None):
+        block_signatures = block_signatures or {}
+        self.block_definitions = MappingProxyType({block["type"]: block for block in blocks or []})
+        self.block_signatures = MappingProxyType({
+            block_type: block_signatures[block_type] if block_type in block_signatures
+            else BlockSignature.from_settings(block)
+            for block_type, block in self.block_definitions.items()
+        })
+
+    def extend(self, blocks: list[PyBlockSettings]) -> 'BlockRegistry':
+        replaced_types = set(block["type"] for block in blocks)
+        # Signatures of blocks that are not replaced can be reused as they are immutable
+        block_signatures = {block_type: signature for block_type, signature in self.block_signatures.items()
+                            if block_type not in replaced_types}
+        return BlockRegistry([*self.block_definitions.values(), *blocks], block_signatures)
+
+    def __len__(self):
+        return len(self.block_definitions)
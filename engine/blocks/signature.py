@@ -0,0 +1,86 @@
+import inspect
+from dataclasses import dataclass
+from enum import Enum
+from typing import Any, get_origin
+
+from engine.blocks.block import PyBlockSettings
+from engine.blocks.fields import Variable
+from engine.executor.value import Value
+from engine.executor.variable_reference import VariableRef
+from engine.util import remove_reserved_words_from_param_name
+
+
+class ParameterKind(Enum):
+    IMMEDIATE = 1  # Values are resolved before the block is called
+    LAZY = 2  # Values are passed as a Value for the block to resolve
+    REFERENCE = 3  # Variables are passed as a VariableRef
+
+
+@dataclass(frozen=True)
+class ParameterSignature:
+    name: str
+    sanitised_name: str
+    kind: ParameterKind
+    coercion_target: Any = None
+
+    @property
+    def is_reference(self):
+        return self.kind == ParameterKind.REFERENCE
+
+    @property
+    def is_immediate(self):
+        return self.kind != ParameterKind.LAZY
+
+
+@dataclass(frozen=True)
+class BlockSignature:
+    type: str
+    parameters: dict[str, ParameterSignature]
+
+    def get_parameter(self, name: str) -> ParameterSignature:
+        """
+        Returns the parameter for a lower case argument name from the program. Arguments that the block function does
+        not declare, such as those collected by **kwargs, are immediate values.
+        """
+        sanitised_name = remove_reserved_words_from_param_name(name)
+        parameter = self.parameters.get(sanitised_name)
+        if parameter is None:
+            parameter = ParameterSignature(name, sanitised_name, ParameterKind.IMMEDIATE)
+        return parameter
+
+    @staticmethod
+    def from_settings(block_settings: PyBlockSettings) -> 'BlockSignature':
+        func = block_settings["func"]
+        type_hints = getattr(func, "__annotations__", None) or {}
+        definition = block_settings.get("definition")
+
+        # Program argument names are lower case, so only lower case definition arguments can ever match them
+        definition_arguments = {}
+        names = []
+        if definition is not None and definition.arguments is not None:
+            for arg in definition.arguments:
+                names.append(arg.name.lower())
+                if arg.name == arg.name.lower():
+                    definition_arguments[remove_reserved_words_from_param_name(arg.name)] = arg
+        names.extend(inspect.signature(func).parameters)
+
+        parameters = {}
+        for name in names:
+            sanitised_name = remove_reserved_words_from_param_name(name)
+            if sanitised_name in parameters:
+                continue
+            type_hint = type_hints.get(sanitised_name)
+            type_origin = get_origin(type_hint)
+            coercion_target = type_origin if type_origin is not None else type_hint
+            if sanitised_name in definition_arguments:
+                is_reference = type(definition_arguments[sanitised_name]) == Variable
+            else:
+                is_reference = type_hint == VariableRef
+            if is_reference:
+                kind = ParameterKind.REFERENCE
+            elif inspect.isclass(coercion_target) and issubclass(coercion_target, Value):
+                kind = ParameterKind.LAZY
+            else:
+                kind = ParameterKind.IMMEDIATE
+            parameters[sanitised_name] = ParameterSignature(name, sanitised_name, kind, coercion_target)
+        return BlockSignature(block_settings["type"], parameters)
@@ -0,0 +1,220 @@
+import asyncio
+import heapq
+import logging
+import threading
+import time
+from typing import Coroutine, Any
+
+from engine.executor.task import ExecutorStep, TimerStep, WaitStep
+
+logger = logging.getLogger(__name__)
+
+
+class AsyncioExecutorTaskStack:
+    """
+    Task stack that runs block coroutines as tasks on the running asyncio event loop instead of on a dedicated thread.
+    It keeps the step, complete and highlight semantics of ExecutorTaskStack, and blocks may await asyncio futures.
+
+    Eager steps run inline, but a task hands control back to the event loop once it has been running eagerly for
+    longer than eager_time_slice seconds so that a busy script cannot starve the loop.
+    """
+    loop: asyncio.AbstractEventLoop | None
+    tasks: set[asyncio.Task]
+    waiting: list[tuple[int, asyncio.Future]]
+    uninitialised_tasks: list[Coroutine]
+    task_counter: int
+    current_task: int
+    highlights: set[str]
+    is_completing: bool
+    is_running: bool
+
+    def __init__(self, eager_time_slice: float = 0.01):
+        self.eager_time_slice = eager_time_slice
+        self.loop = None
+        self.loop_thread_id = None
+        self.tasks = set()
+        self.waiting = []
+        self.uninitialised_tasks = []
+        self.task_counter = 0
+        self.current_task = -1
+        self.highlights = set()
+        self.is_completing = False
+        self.is_running = False
+
+    def run(self):
+        try:
+            self.loop = asyncio.get_running_loop()
+        except RuntimeError:
+            raise RuntimeError(f"{AsyncioExecutorTaskStack.__name__} must be started from a running event loop")
+        self.loop_thread_id = threading.get_ident()
+        self.is_running = True
+
+    def add_task(self, coro: Coroutine):
+        self._call_in_loop(self._add_task, coro)
+
+    def _add_task(self, coro: Coroutine):
+        if not self.is_running:
+            coro.close()
+            return
+        self.uninitialised_tasks.append(coro)
+        if len(self.uninitialised_tasks) == 1:
+            self.loop.call_soon(self._initialise_tasks)
+
+    def _initialise_tasks(self):
+        while len(self.uninitialised_tasks) > 0 and self.is_running:
+            tasks = self.uninitialised_tasks
+            self.uninitialised_tasks = []
+            for coro in tasks:
+                try:
+                    out = self._advance(coro)
+                except StopIteration:
+                    continue
+                task = self.loop.create_task(self._drive(coro, out))
+                self.tasks.add(task)
+                task.add_done_callback(self._task_done)
+        self._check_if_complete()
+
+    def _advance(self, coro: Coroutine) -> Any:
+        # Runs the coroutine through its eager steps and returns the first thing it yields that has to be waited on
+        deadline = time.monotonic() + self.eager_time_slice
+        out = coro.send(None)
+        while type(out) is ExecutorStep and out.is_eager and self.is_running and time.monotonic() < deadline:
+            out = coro.send(None)
+        return out
+
+    async def _drive(self, coro: Coroutine, out: Any):
+        try:
+            while self.is_running:
+                if type(out) is ExecutorStep:
+                    if out.is_eager:
+                        await asyncio.sleep(0)
+                    else:
+                        await self._wait_for_turn(out)
+                elif type(out) is TimerStep:
+                    await asyncio.sleep(max(out.deadline - time.monotonic(), 0))
+                elif type(out) is WaitStep:
+                    await self._wait_for_notify(out)
+                elif out is None:
+                    await asyncio.sleep(0)
+                elif asyncio.isfuture(out):
+                    # A block awaited an asyncio future. It reads the result itself when it is resumed.
+                    await asyncio.wait((out,))
+                else:
+                    raise ValueError(f"Invalid awaitable type. Expected {ExecutorStep.__name__} or a future")
+                if not self.is_running:
+                    break
+                try:
+                    out = self._advance(coro)
+                except StopIteration:
+                    break
+        finally:
+            coro.close()
+
+    async def _wait_for_turn(self, executor_step: ExecutorStep):
+        priority = self.task_counter
+        self.task_counter += 1
+        if priority <= self.current_task or self.is_completing:
+            return
+        future = self.loop.create_future()
+        heapq.heappush(self.waiting, (priority, future))
+        self.add_highlight(executor_step)
+        try:
+            await future
+        finally:
+            self.remove_highlight(executor_step)
+
+    async def _wait_for_notify(self, wait_step: WaitStep):
+        future = self.loop.create_future()
+
+        def resume():
+            if not future.done():
+                future.set_result(None)
+
+        # The step can be notified from any thread
+        if wait_step.park(lambda: self._call_in_loop(resume)):
+            await future
+
+    def _release_waiting(self):
+        while len(self.waiting) > 0 and (self.is_completing or self.waiting[0][0] <= self.current_task):
+            _, future = heapq.heappop(self.waiting)
+            if not future.done():
+                future.set_result(None)
+
+    def _task_done(self, task: asyncio.Task):
+        self.tasks.discard(task)
+        if not task.cancelled() and task.exception() is not None:
+            logger.error("Block task failed", exc_info=task.exception())
+        self._check_if_complete()
+
+    def _check_if_complete(self):
+        if len(self.tasks) == 0 and len(self.uninitialised_tasks) == 0:
+            self.is_completing = False
+            self.task_counter = 0
+            self.current_task = -1
+
+    def _call_in_loop(self, func, *args):
+        if self.loop is None or threading.get_ident() == self.loop_thread_id:
+            func(*args)
+        else:
+            self.loop.call_soon_threadsafe(func, *args)
+
+    def get_highlights(self):
+        return self.highlights
+
+    def remove_highlight(self, executor_step: ExecutorStep):
+        if executor_step is not None and executor_step.identifier in self.highlights:
+            self.highlights.remove(executor_step.identifier)
+
+    def add_highlight(self, executor_step: ExecutorStep):
+        if executor_step is not None and executor_step.is_eager is False:
+            self.highlights.add(executor_step.identifier)
+
+    def complete(self):
+        self._call_in_loop(self._complete)
+
+    def _complete(self):
+        if len(self.tasks) > 0 or len(self.uninitialised_tasks) > 0:
+            self.is_completing = True
+            self._release_waiting()
+
+    def step(self):
+        self._call_in_loop(self._step)
+
+    def _step(self):
+        if len(self.tasks) > 0:
+            self.current_task += 1
+            self._release_waiting()
+
+    def wait_until_complete(self):
+        """
+        The event loop cannot be blocked, so tasks that have not started yet are run up to their first non-eager step
+        straight away and whatever remains is run to completion in the background.
+        """
+        if self.loop is None:
+            return
+        if threading.get_ident() != self.loop_thread_id:
+            asyncio.run_coroutine_threadsafe(self._wait_until_complete(), self.loop).result()
+            return
+        self._initialise_tasks()
+        self._complete()
+
+    async def _wait_until_complete(self):
+        self.wait_until_complete()
+        while len(self.tasks) > 0:
+            await asyncio.wait(set(self.tasks))
+
+    def stop(self):
+        self._call_in_loop(self._stop)
+
+    def _stop(self):
+        self.is_running = False
+        for coro in self.uninitialised_tasks:
+            coro.close()
+        self.uninitialised_tasks = []
+        for task in self.tasks:
+            task.cancel()
+        self.waiting = []
+        self.highlights.clear()
+
+    def __len__(self):
+        return len(self.tasks) + len(self.uninitialised_tasks)
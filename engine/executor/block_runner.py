@@ -0,0 +1,291 @@
+import inspect
+import logging
+import time
+import types
+from typing import Any, Awaitable, Callable, Coroutine, TYPE_CHECKING
+
+from engine.executor.block_call import BlockCall
+from engine.executor.condition_watch import ConditionWatch
+from engine.executor.context import Context
+from engine.executor.profiler import BlockProfiler
+from engine.executor.program import ArgumentKind, CompiledBlock
+from engine.executor.task import ExecutorStep, TailCall, TimerStep
+from engine.executor.tracer import ExecutionTracer
+from engine.executor.value import Value, StatementValue
+from engine.executor.variable_reference import VariableSlot
+from engine.executor.variables.variable_store import unset
+from engine.util import anoop
+
+if TYPE_CHECKING:
+    from engine.executor.executor import Executor
+
+logger = logging.getLogger(__name__)
+
+
+@types.coroutine
+def run_chain(coro: Coroutine | TailCall, profiler: BlockProfiler = None):
+    """
+    Runs a block and then the blocks that it hands on with `await context.next()` one after the other, so a chain uses
+    the same stack depth however long it is. Everything else that the blocks yield is passed on to the scheduler.
+
+    When profiling, the profiler frame of a block that hands on stays open until the rest of the chain has run, as if
+    the block had awaited it.
+    """
+    result = None
+    handed_on_frames = [] if profiler is not None else None
+    try:
+        while True:
+            if type(coro) is TailCall:
+                runner = coro.runner
+                if runner.executor.stopped:
+                    return None
+                coro = runner.run(coro.is_eager, **coro.kwargs)
+            tail_call = None
+            sent = None
+            send = coro.send
+            while True:
+                try:
+                    out = send(sent)
+                except StopIteration as stop:
+                    result = stop.value
+                    break
+                if type(out) is TailCall:
+                    tail_call = out
+                    sent = None
+                    if profiler is not None:
+                        handed_on_frames.append(profiler.hand_on())
+                    continue
+                try:
+                    sent = yield out
+                except GeneratorExit:
+                    coro.close()
+                    raise
+            if tail_call is None:
+                return result
+            coro = tail_call
+    finally:
+        if handed_on_frames:
+            profiler.exit_chain(handed_on_frames)
+
+
+class BlockRunner:
+    """
+    Binds a CompiledBlock to an Executor. Everything that does not change between invocations (contexts, steps and
+    argument values) is created once when the runner is linked. Whether blocks are logged, traced and profiled is also
+    decided then, so none of them cost anything while they are disabled.
+    """
+    executor: 'Executor'
+    block: CompiledBlock
+    next: 'BlockRunner | None'
+    kwargs: dict[str, Any]
+    value_resolvers: tuple[tuple[str, Callable[[], Any]], ...]
+    statement_resolvers: tuple[tuple[str, Callable[[bool], BlockCall]], ...]
+
+    def __init__(self, executor: 'Executor', block: CompiledBlock):
+        self.executor = executor
+        self.block = block
+        self.func = block.func
+        self.next = None
+        self.kwargs = {}
+        self.value_resolvers = ()
+        self.statement_resolvers = ()
+        self.steps = (
+            ExecutorStep(block.id, block.type, block.can_run),
+            ExecutorStep(block.id, block.type, True)
+        )
+        self.is_debug = logger.isEnabledFor(logging.DEBUG)
+        if executor.profiler is not None:
+            self.run = self.__create_profiled_run(executor.profiler)
+            self.evaluate = self.__create_profiled_evaluate(executor.profiler, self.evaluate)
+        if executor.tracer is not None:
+            self.evaluate = self.__create_traced_evaluate(executor.tracer, self.evaluate)
+        self.calls = (self.__create_call(False), self.__create_call(True))
+        self.next_calls = (self.__create_next_call(False), self.__create_next_call(True))
+        self.reporter_call = self.__create_reporter_call()
+        self.contexts = (None, None)
+
+    def link(self, runners: dict[CompiledBlock, 'BlockRunner']):
+        self.next = runners[self.block.next] if self.block.next is not None else None
+        value_resolvers = []
+        statement_resolvers = []
+        for slot in self.block.arguments:
+            if slot.kind == ArgumentKind.CONSTANT or slot.kind == ArgumentKind.VARIABLE_REF:
+                self.kwargs[slot.name] = slot.value
+                continue
+            value = self.__create_value(slot.kind, slot.value, runners)
+            if not slot.is_immediate:
+                self.kwargs[slot.name] = value
+            elif slot.kind == ArgumentKind.STATEMENT:
+                statement_resolvers.append((slot.name, value.getter))
+            else:
+                value_resolvers.append((slot.name, value.getter))
+        self.value_resolvers = tuple(value_resolvers)
+        self.statement_resolvers = tuple(statement_resolvers)
+        self.contexts = (self.__create_context(False), self.__create_context(True))
+
+    def get_call(self, is_eager: bool) -> BlockCall:
+        return self.calls[is_eager]
+
+    def get_next_call(self, is_eager: bool) -> Callable[..., TailCall]:
+        return self.next_calls[is_eager]
+
+    async def run(self, is_eager: bool, **kwargs):
+        await self.steps[is_eager]
+        return await self.evaluate(is_eager, **kwargs)
+
+    async def evaluate(self, is_eager: bool, **kwargs):
+        """
+        Executes the block without yielding a step to the scheduler first
+        """
+        block_type = self.block.type
+        func_kwargs = {**self.kwargs, **kwargs}
+        func_kwargs["context"] = self.contexts[is_eager]
+        for name, getter in self.value_resolvers:
+            result = getter()
+            if inspect.isawaitable(result):
+                result = await result
+            func_kwargs[name] = result
+        for name, statement_getter in self.statement_resolvers:
+            func_kwargs[name] = statement_getter(is_eager)
+        if self.is_debug:
+            logger.debug(
+                f"Executing block '{block_type}' {'eagerly ' if is_eager else ''}with context: {func_kwargs}")
+        try:
+            return_value = self.func(**func_kwargs)
+            if inspect.isawaitable(return_value):
+                return_value = await return_value
+        except Exception as e:
+            logger.error("Could not execute block", exc_info=e)
+            self.executor.broadcast_exception(e)
+            return None
+        if self.is_debug:
+            logger.debug(f"Executed block '{block_type}' returned '{return_value}' using context: {func_kwargs}")
+        return return_value
+
+    def __create_call(self, is_eager: bool) -> BlockCall:
+        executor = self.executor
+        run = self.run
+        profiler = executor.profiler
+
+        def call(**kwargs):
+            if executor.stopped:
+                return anoop()
+            return run_chain(run(is_eager, **kwargs), profiler)
+
+        return call
+
+    def __create_next_call(self, is_eager: bool) -> Callable[..., TailCall]:
+        tail_call = TailCall(self, is_eager, {})
+
+        def next_call(**kwargs):
+            return TailCall(self, is_eager, kwargs) if len(kwargs) > 0 else tail_call
+
+        return next_call
+
+    def __create_traced_evaluate(self, tracer: ExecutionTracer, evaluate: Callable[..., Coroutine]):
+        block = self.block
+
+        async def evaluate_traced(is_eager: bool, **kwargs):
+            start = time.perf_counter()
+            try:
+                return await evaluate(is_eager, **kwargs)
+            finally:
+                tracer.record(block.id, block.type, start, time.perf_counter() - start)
+
+        return evaluate_traced
+
+    def __create_profiled_evaluate(self, profiler: BlockProfiler, evaluate: Callable[..., Coroutine]):
+        block = self.block
+        label = profiler.get_label(block)
+
+        async def evaluate_profiled(is_eager: bool, **kwargs):
+            frame = profiler.enter(block, label)
+            try:
+                return await evaluate(is_eager, **kwargs)
+            finally:
+                profiler.exit(frame)
+
+        return evaluate_profiled
+
+    def __create_profiled_run(self, profiler: BlockProfiler):
+        steps = self.steps
+
+        async def run_profiled(is_eager: bool, **kwargs):
+            # Blocks run by the scheduler while this one waits for its step are not part of the awaiting block
+            frame, suspended_at = profiler.suspend()
+            try:
+                await steps[is_eager]
+            finally:
+                profiler.resume(frame, suspended_at)
+            return await self.evaluate(is_eager, **kwargs)
+
+        return run_profiled
+
+    @staticmethod
+    def __create_profiled_wait(profiler: BlockProfiler):
+        async def wait_profiled(step: Awaitable):
+            # Other blocks run while this one sleeps or waits, as they do while it waits for its step
+            frame, suspended_at = profiler.suspend()
+            try:
+                await step
+            finally:
+                profiler.resume(frame, suspended_at)
+
+        return wait_profiled
+
+    def __create_reporter_call(self) -> BlockCall:
+        # Reporters always run eagerly, so they are awaited directly by the block that uses them
+        executor = self.executor
+        evaluate = self.evaluate
+
+        def call(**kwargs):
+            if executor.stopped:
+                return anoop()
+            return evaluate(True, **kwargs)
+
+        return call
+
+    def __create_value(self, kind: ArgumentKind, value: Any, runners: dict[CompiledBlock, 'BlockRunner']) -> Value:
+        executor = self.executor
+        if kind == ArgumentKind.VARIABLE:
+            return Value(self.__create_variable_getter(value), value, (value,))
+        if kind == ArgumentKind.BLOCK:
+            return Value(runners[value].reporter_call, read_variables=value.get_read_variables())
+        if value is None:
+            return Value(lambda: anoop)
+        return StatementValue(runners[value].get_call)
+
+    def __create_variable_getter(self, slot: VariableSlot) -> Callable[[], Any]:
+        # The store's list is only replaced when a program is loaded, which also relinks the runners
+        values = self.executor.variable_store.values
+        index = slot.index
+
+        def get_variable():
+            value = values[index]
+            if value is unset:
+                raise KeyError(slot)
+            return value
+
+        return get_variable
+
+    def __create_context(self, is_eager: bool) -> Context:
+        executor = self.executor
+        context_obj = Context()
+        context_obj.recurse = self.get_call(is_eager)
+        context_obj.next = self.next.get_next_call(is_eager) if self.next is not None else anoop
+        context_obj.listen = executor.add_broadcast_listener
+        context_obj.broadcast = executor.broadcast
+        context_obj.set_variable = executor.set_variable
+        context_obj.get_variable = executor.variable_store.get
+        context_obj.change_list = executor.change_list
+        context_obj.find_item = executor.variable_store.find_item
+        context_obj.snapshot_variable = executor.variable_store.snapshot
+        context_obj.get_plugin_context = executor.get_plugin_context
+        if executor.profiler is not None:
+            wait = self.__create_profiled_wait(executor.profiler)
+            context_obj.sleep = lambda duration: wait(TimerStep.after(duration))
+        else:
+            wait = None
+            context_obj.sleep = TimerStep.after
+        context_obj.watch = lambda condition: ConditionWatch(condition, executor.variable_store, wait)
+        return context_obj
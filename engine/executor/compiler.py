@@ -0,0 +1,168 @@
+import logging
+from types import MappingProxyType
+from typing import Any, Mapping
+from xml.etree import ElementTree
+
+from engine.blocks.block import PyBlockSettings, PyBlockDefinition
+from engine.blocks.signature import BlockSignature
+from engine.executor.exceptions import ExecutionException
+from engine.executor.program import ArgumentKind, ArgumentSlot, CompiledBlock, CompiledProgram, VariableLayout
+from engine.executor.variable_reference import VariableRef, VariableSlot
+
+logger = logging.getLogger(__name__)
+
+
+class ProgramCompiler:
+    """
+    Compiles a Scratch blocks program into a linked tree of CompiledBlocks. Only scripts that start with a block that
+    can run are compiled, as no other script is reachable during execution. Variables are referenced by the slot they
+    are assigned in the program's VariableLayout.
+    """
+    block_definitions: Mapping[str, PyBlockSettings]
+    block_signatures: Mapping[str, BlockSignature]
+    blocks: list[CompiledBlock]
+    variable_slots: dict[VariableRef, VariableSlot]
+    variable_names: list[str]
+    variable_elements: list[ElementTree.Element | None]
+
+    def __init__(self, block_definitions: Mapping[str, PyBlockSettings],
+                 block_signatures: Mapping[str, BlockSignature]):
+        self.block_definitions = block_definitions
+        self.block_signatures = block_signatures
+        self.blocks = []
+        self.variable_slots = {}
+        self.variable_names = []
+        self.variable_elements = []
+
+    def compile(self, program: ElementTree.Element) -> CompiledProgram:
+        self.blocks = []
+        self.variable_slots = {}
+        self.variable_names = []
+        self.variable_elements = []
+        variables = program.find("variables")
+        for variable in variables if variables is not None else ():
+            self.get_variable_slot(VariableRef(variable.get("type"), variable.get("id")), variable.text, variable)
+        possible_starting_blocks = set([b["type"] for b in self.block_definitions.values() if b["can_run"]])
+        starting_blocks = []
+        for block in program.findall("block"):
+            if block.get("type") in possible_starting_blocks:
+                starting_blocks.append(self.compile_chain(block))
+        compiled = CompiledProgram(
+            starting_blocks=tuple(starting_blocks),
+            blocks=tuple(self.blocks),
+            variables=VariableLayout(
+                slots=tuple(self.variable_slots.values()),
+                names=tuple(self.variable_names),
+                elements=tuple(self.variable_elements),
+                indices=MappingProxyType({ref: slot.index for ref, slot in self.variable_slots.items()})
+            )
+        )
+        logger.debug(f"Compiled {len(compiled.blocks)} blocks in {len(compiled.starting_blocks)} scripts")
+        return compiled
+
+    def compile_chain(self, block_node: ElementTree.Element) -> CompiledBlock:
+        # Chains are walked iteratively so that long scripts do not exhaust the stack
+        chain = []
+        while block_node is not None:
+            chain.append(block_node)
+            next_node = block_node.find("next")
+            block_node = next_node.find("block") if next_node is not None else None
+        compiled = None
+        for node in reversed(chain):
+            compiled = self.compile_block(node, compiled)
+        return compiled
+
+    def compile_block(self, block_node: ElementTree.Element, next_block: CompiledBlock | None = None):
+        block_type = block_node.get("type")
+        block_settings = self.get_block_settings(block_type)
+        block_signature = self.block_signatures[block_type]
+
+        arguments = self.__get_block_argument_defaults(block_settings["definition"])
+        for el in block_node:
+            if el.tag not in ("field", "value", "statement"):
+                continue
+            name = el.get("name").lower()
+            is_ref_type = block_signature.get_parameter(name).is_reference
+            if el.tag == "field":
+                kind, value = self.compile_field(el, is_ref_type)
+            elif el.tag == "value":
+                kind, value = self.compile_value(el, is_ref_type)
+            else:
+                kind, value = self.compile_statement(el)
+            arguments[name] = (kind, value)
+
+        compiled = CompiledBlock(
+            id=block_node.get("id"),
+            type=block_type,
+            settings=block_settings,
+            func=block_settings["func"],
+            can_run=block_settings["can_run"],
+            arguments=tuple(self.__create_argument_slot(block_signature, name, kind, value)
+                            for name, (kind, value) in arguments.items()),
+            next=next_block
+        )
+        self.blocks.append(compiled)
+        return compiled
+
+    def compile_field(self, el: ElementTree.Element, is_ref_type: bool) -> tuple[ArgumentKind, Any]:
+        var_id: str = el.get("id")
+        if var_id is not None:
+            var_ref = self.get_variable_slot(VariableRef(el.get("variabletype"), var_id), el.text)
+            if is_ref_type:
+                return ArgumentKind.VARIABLE_REF, var_ref
+            return ArgumentKind.VARIABLE, var_ref
+        field_type = el.get("name")
+        if field_type == "NUM":
+            return ArgumentKind.CONSTANT, float(el.text)
+        return ArgumentKind.CONSTANT, el.text or ""
+
+    def compile_value(self, el: ElementTree.Element, is_ref_type=False) -> tuple[ArgumentKind, Any]:
+        block = el.find("block")
+        if block is not None:
+            return ArgumentKind.BLOCK, self.compile_chain(block)
+        shadow = el.find("shadow")
+        if shadow is not None:
+            return self.compile_shadow(shadow, is_ref_type)
+        raise ExecutionException("Could not parse value block")
+
+    def compile_shadow(self, el: ElementTree.Element, is_ref_type=False) -> tuple[ArgumentKind, Any]:
+        field = el.find("field")
+        if field is not None:
+            return self.compile_field(field, is_ref_type)
+        raise ExecutionException("Could not parse shadow block. No field element found")
+
+    def compile_statement(self, el: ElementTree.Element) -> tuple[ArgumentKind, Any]:
+        block = el.find("block")
+        if block is not None:
+            return ArgumentKind.STATEMENT, self.compile_chain(block)
+        return ArgumentKind.STATEMENT, None
+
+    def get_variable_slot(self, ref: VariableRef, name: str, element: ElementTree.Element = None) -> VariableSlot:
+        if ref in self.variable_slots:
+            return self.variable_slots[ref]
+        slot = VariableSlot(ref.type, ref.id, len(self.variable_slots))
+        self.variable_slots[ref] = slot
+        self.variable_names.append(name)
+        self.variable_elements.append(element)
+        return slot
+
+    def get_block_settings(self, block_type: str) -> PyBlockSettings:
+        try:
+            return self.block_definitions[block_type]
+        except KeyError as e:
+            raise ExecutionException(f"Unknown block type {e}")
+
+    @staticmethod
+    def __create_argument_slot(block_signature: BlockSignature, name: str, kind: ArgumentKind, value: Any):
+        parameter = block_signature.get_parameter(name)
+        is_immediate = kind in (ArgumentKind.CONSTANT, ArgumentKind.VARIABLE_REF) or parameter.is_immediate
+        return ArgumentSlot(parameter.sanitised_name, kind, value, is_immediate)
+
+    @staticmethod
+    def __get_block_argument_defaults(block_definition: PyBlockDefinition):
+        arguments = {}
+        if block_definition and block_definition.arguments is not None:
+            for arg in block_definition.arguments:
+                arguments[arg.name.lower()] = (ArgumentKind.CONSTANT, arg.get_default())
+        return arguments
+
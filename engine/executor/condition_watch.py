@@ -0,0 +1,68 @@
+from typing import Awaitable, Callable
+
+from engine.executor.task import TimerStep
+from engine.executor.value import Value
+from engine.executor.variables.variable_store import VariableStore
+
+
+class ConditionWatch:
+    """
+    Caches the result of a condition until one of the variables that it reads is written. Waiting for the condition
+    parks the block until then instead of evaluating it again and again. Conditions that use blocks which are not pure
+    are evaluated every time and are polled every `poll_interval` seconds while they are waited for.
+    """
+    poll_interval = 0.05
+    condition: Value[bool]
+    variable_store: VariableStore
+    indices: tuple[int, ...] | None
+    version: int
+    result: bool | None
+
+    def __init__(self, condition: Value[bool], variable_store: VariableStore,
+                 wait: Callable[[Awaitable], Awaitable] = None):
+        self.condition = condition
+        self.variable_store = variable_store
+        self.wait = wait
+        read_variables = condition.read_variables
+        self.indices = tuple(slot.index for slot in read_variables) if read_variables is not None else None
+        self.version = -1
+        self.result = None
+
+    def has_changed(self) -> bool:
+        if self.indices is None or self.version < 0:
+            return True
+        versions = self.variable_store.versions
+        version = self.version
+        for index in self.indices:
+            if versions[index] > version:
+                return True
+        return False
+
+    async def evaluate(self) -> bool:
+        if self.has_changed():
+            # Read before evaluating, so that a write during the evaluation counts as a change
+            self.version = self.variable_store.checkpoint()
+            self.result = await self.condition.get()
+        return self.result
+
+    async def wait_until_true(self):
+        while not await self.evaluate():
+            await self.wait_for_change()
+
+    async def wait_for_change(self):
+        if self.indices is None:
+            await self.__wait(TimerStep.after(self.poll_interval))
+            return
+        waiter = self.variable_store.watch(self.indices)
+        # A variable may have been written between the evaluation and the watch
+        try:
+            if not self.has_changed():
+                await self.__wait(waiter)
+        finally:
+            # Also stops watching when the block is closed while it waits
+            self.variable_store.unwatch(waiter)
+
+    def __wait(self, step: Awaitable) -> Awaitable:
+        if self.wait is None:
+            return step
+        return self.wait(step)
@@ -1,14 +1,26 @@
-from typing import Callable, Any, Coroutine
+from typing import Awaitable, Callable, Any, Coroutine
 
 from engine.executor.block_call import BlockCall
-from engine.executor.variable_reference import VariableRef
+from engine.executor.condition_watch import ConditionWatch
+from engine.executor.value import Value
+from engine.executor.variable_reference import VariableRef, VariableSlot
 
 
 class Context:
     recurse: BlockCall
     next: BlockCall
-    listen: Callable[[Callable[[str, str], Coroutine]], None]
+    listen: Callable[[Callable[[str, str], Coroutine], str | None, str | None], None]
     broadcast: Callable[[str, str], None]
-    set_variable: Callable[[VariableRef, Any], None]
-    get_variable: Callable[[VariableRef], Any]
+    set_variable: Callable[[VariableRef | VariableSlot, Any], None]
+    get_variable: Callable[[VariableRef | VariableSlot], Any]
+    # Calls an operation such as list.append with a list variable and the arguments, changing the list in place
+    change_list: Callable[..., Any]
+    # Returns the first position of an item in a list variable, or -1 if it is not in the list
+    find_item: Callable[[VariableRef | VariableSlot, Any], int]
+    # Returns a variable's value, which is not changed afterwards if it is a list
+    snapshot_variable: Callable[[VariableRef | VariableSlot], Any]
     get_plugin_context: Callable[[str], Any]
+    # Waits for a number of seconds without blocking other scripts
+    sleep: Callable[[float], Awaitable[None]]
+    # Evaluates a condition again only when the variables it reads change
+    watch: Callable[[Value[bool]], ConditionWatch]
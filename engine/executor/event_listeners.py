@@ -0,0 +1,35 @@
+from typing import Callable, Coroutine
+
+EventListener = Callable[[str, str], Coroutine | None]
+
+
+class EventListeners:
+    """
+    Broadcast listeners indexed by the (topic, message) they listen for, so that a broadcast only calls the listeners
+    that match it. A topic or message of None matches any value.
+    """
+    listeners: dict[tuple[str | None, str | None], tuple[EventListener, ...]]
+
+    def __init__(self):
+        self.listeners = {}
+        self.count = 0
+
+    def add(self, callback: EventListener, topic: str = None, message: str = None):
+        key = (topic, message)
+        # Tuples are replaced rather than appended to, so a broadcast can add listeners while others are being called
+        self.listeners[key] = self.listeners.get(key, ()) + (callback,)
+        self.count += 1
+
+    def get_listeners(self, topic: str, message: str) -> tuple[EventListener, ...]:
+        listeners = self.listeners
+        if not listeners:
+            return ()
+        return listeners.get((topic, message), ()) + listeners.get((topic, None), ()) + \
+            listeners.get((None, message), ()) + listeners.get((None, None), ())
+
+    def clear(self):
+        self.listeners = {}
+        self.count = 0
+
+    def __len__(self):
+        return self.count
@@ -1,82 +1,121 @@
-import builtins
-import inspect
 import json
 import logging
-import re
+import threading
 import xml.etree.ElementTree as ElementTree
-from typing import Any, Callable, ContextManager, Coroutine, get_origin
+from typing import Any, Callable, ContextManager, Type, Mapping
 
-from engine.blocks.block import PyBlockSettings, PyBlockDefinition
+from engine.blocks.block import PyBlockSettings
 from engine.blocks.default import default_blocks
-from engine.blocks.fields import Variable
-from engine.executor.context import Context
-from engine.executor.task import ExecutorStep
+from engine.blocks.registry import BlockRegistry
+from engine.blocks.signature import BlockSignature
+from engine.executor.async_task_loop import AsyncioExecutorTaskStack
+from engine.executor.block_runner import BlockRunner, run_chain
+from engine.executor.event_listeners import EventListeners, EventListener
+from engine.executor.exceptions import ExecutionException
+from engine.executor.profiler import BlockProfiler
+from engine.executor.program_cache import ProgramCache, namespace_pattern, program_cache
+from engine.executor.program import CompiledBlock, CompiledProgram, VariableLayout
 from engine.executor.task_loop import ExecutorTaskStack
-from engine.executor.value import Value, StatementValue
-from engine.executor.variable_reference import VariableRef
+from engine.executor.tracer import ExecutionTracer
+from engine.executor.variable_reference import VariableRef, VariableSlot
 from engine.executor.variables.core_variable_handlers import core_variable_handlers
 from engine.executor.variables.variable_handler import VariableHandler
-from engine.util import anoop
+from engine.executor.variables.variable_store import VariableStore, unset
+from engine.util import remove_reserved_words_from_param_name
 
 logger = logging.getLogger(__name__)
 
-
-class ExecutionException(Exception):
-    pass
+default_block_registry = BlockRegistry(default_blocks)
 
 
 class Executor:
-    _namespace_pattern = re.compile(r"xmlns=\"[^\"]+\"")
-    starting_blocks: list[ElementTree.Element] = []
-    block_definitions: dict[str, PyBlockSettings] = {}
-    cached_contexts: dict[str, dict] = {}
-    block_factories: dict[str, Callable[[bool], Callable[[Any], Coroutine]]] = {}
-    task_stack: ExecutorTaskStack = ExecutorTaskStack()
-    variables: dict[VariableRef, Any] = {}
-    variable_names: dict[VariableRef, str] = {}
+    _namespace_pattern = namespace_pattern
+    block_registry: BlockRegistry
+    starting_blocks: list[CompiledBlock]
+    compiled_program: CompiledProgram
+    runners: dict[CompiledBlock, BlockRunner]
+    task_stack: ExecutorTaskStack | AsyncioExecutorTaskStack
+    task_stack_type: Type[ExecutorTaskStack | AsyncioExecutorTaskStack]
+    variable_store: VariableStore
     program: ElementTree.Element
-    plugin_contexts: dict[str, Callable[['Executor'], ContextManager]] = {}
-    active_contexts: dict[str, ContextManager[Any]] = {}
-    event_listeners: [Callable[[str, str], None]] = []
-    global_event_listeners: [Callable[[str, str], None]] = []
-    variable_handlers: dict[str, VariableHandler] = {}
+    plugin_contexts: dict[str, Callable[['Executor'], ContextManager]]
+    active_contexts: dict[str, ContextManager[Any]]
+    required_contexts: list[str]
+    event_listeners: EventListeners
+    global_event_listeners: EventListeners
+    variable_handlers: dict[str, VariableHandler]
+    tracer: ExecutionTracer | None
+    profiler: BlockProfiler | None
+    program_cache: ProgramCache
+    caches: dict[str, Any]
     stopped: bool
 
-    def __init__(self, load_default_blocks=True):
+    def __init__(self, load_default_blocks=True,
+                 task_stack_type: Type[ExecutorTaskStack | AsyncioExecutorTaskStack] = ExecutorTaskStack,
+                 block_registry: BlockRegistry = None, tracer: ExecutionTracer = None,
+                 profiler: BlockProfiler = None, program_cache: ProgramCache = program_cache):
         self.stopped = False
-        if load_default_blocks:
-            self.load_blocks(default_blocks)
+        self.program_cache = program_cache
+        self.caches = {"program": program_cache}
+        self.tracer = tracer
+        self.profiler = profiler
+        if block_registry is None:
+            block_registry = default_block_registry if load_default_blocks else BlockRegistry()
+        self.block_registry = block_registry
+        self.starting_blocks = []
+        self.compiled_program = CompiledProgram((), (), VariableLayout((), (), (), {}))
+        self.runners = {}
+        self.task_stack_type = task_stack_type
+        self.task_stack = task_stack_type()
+        self.variable_store = VariableStore(self.compiled_program.variables)
+        self.plugin_contexts = {}
+        self.active_contexts = {}
+        self.required_contexts = []
+        self.plugin_context_lock = threading.RLock()
+        self.event_listeners = EventListeners()
+        self.global_event_listeners = EventListeners()
+        self.variable_handlers = {}
         for handler in core_variable_handlers:
             self.add_variable_handler(handler())
 
+    @property
+    def block_definitions(self) -> Mapping[str, PyBlockSettings]:
+        return self.block_registry.block_definitions
+
+    @property
+    def block_signatures(self) -> Mapping[str, BlockSignature]:
+        return self.block_registry.block_signatures
+
     def load_blocks(self, blocks: list[PyBlockSettings]):
-        for block in blocks:
-            self.block_definitions[block["type"]] = block
+        self.block_registry = self.block_registry.extend(blocks)
 
     def load_program(self, xml_string: str):
-        xml_string = self._namespace_pattern.sub("", xml_string)
-        self.program = ElementTree.fromstring(xml_string)
-        blocks = self.program.findall("block")
+        program, compiled_program = self.program_cache.load(xml_string, self.block_registry)
+        self.program = program
         self.stop()
-        self.starting_blocks = []
-        self.block_factories = {}
-        self.cached_contexts = {}
-
-        possible_starting_blocks = set([b["type"] for b in self.block_definitions.values() if b["can_run"]])
-        for block in blocks:
-            block_type = block.get("type")
-            if block_type in possible_starting_blocks:
-                self.starting_blocks.append(block)
+        if compiled_program is self.compiled_program:
+            # The runners are already linked to this program and its variable store
+            self.variable_store.clear()
+        else:
+            self.compiled_program = compiled_program
+            self.variable_store = VariableStore(compiled_program.variables)
+            self.link_program(compiled_program)
+        self.starting_blocks = list(self.compiled_program.starting_blocks)
+        self.required_contexts = self.get_required_plugin_contexts(self.compiled_program)
+        self.__close_plugin_contexts([key for key in self.active_contexts if key not in self.required_contexts])
 
     def start(self, is_eager=False):
         self.stop()
         self.stopped = False
         self.load_variables()
-        self.__create_plugin_contexts()
-        self.task_stack = ExecutorTaskStack()
+        if self.profiler is not None:
+            self.profiler.reset()
+        for key in self.required_contexts:
+            self.__activate_plugin_context(key)
+        self.task_stack = self.task_stack_type()
         self.task_stack.run()
         for block in self.starting_blocks:
-            logger.debug("Added starting block to task list: %s", block.get("type"))
+            logger.debug("Added starting block to task list: %s", block.type)
             self.execute_block(block, is_eager=is_eager)
         self.task_stack.wait_until_complete()
         self.broadcast("executor", "start")
@@ -95,171 +134,119 @@ class Executor:
         self.task_stack.stop()
         self.event_listeners.clear()
         self.stopped = True
-        self.__close_plugin_contexts()
+        self.__reset_plugin_contexts()
+
+    def close(self):
+        """
+        Stops the program and closes the plugin contexts, which are otherwise kept active between runs
+        """
+        self.stop()
+        self.__close_plugin_contexts(list(self.active_contexts))
+
+    @property
+    def variables(self) -> dict[VariableRef, Any]:
+        return {VariableRef(slot.type, slot.id): value for slot, value in self.variable_store.items()}
+
+    @property
+    def variable_names(self) -> dict[VariableRef, str]:
+        layout = self.compiled_program.variables
+        return {VariableRef(slot.type, slot.id): name for slot, name in zip(layout.slots, layout.names)}
 
     def get_variables_json(self):
-        return json.dumps({f"{ref[0]}-{ref[1]}": v for ref, v in self.variables.items()})
+        return json.dumps({f"{slot.type}-{slot.id}": self.to_json(slot, v) for slot, v in self.variable_store.items()})
 
     def get_variables(self):
+        names = self.compiled_program.variables.names
         return [{
-            "value": value,
-            "type": ref[0],
-            "id": ref[1],
-            "name": self.variable_names[ref]
-        } for ref, value in self.variables.items()]
-
-    def execute_block(self, block_node: ElementTree.Element, is_eager=True) -> Any:
-        block_factory = self.get_block_function_factory(block_node)
-        self.task_stack.add_task(block_factory(is_eager)())
-
-    def get_block_function_factory(self, block_node: ElementTree.Element):
-
-        block_id = block_node.get("id")
-        if block_id in self.block_factories:
-            return self.block_factories[block_id]
-
-        block_type = block_node.get("type")
-        block_settings = self.get_block_settings(block_type)
-        block_definition = block_settings["definition"]
-        block_is_run_type = block_settings["can_run"]
-
-        default_func_kwargs: dict[str, Any | Context] = self.extract_context(block_node, block_definition)
-        default_func_kwargs = {Executor.remove_reserved_words_from_param_name(k): v for k, v in
-                               default_func_kwargs.items()}
-
-        def block_task_create(is_eager: bool):
-            if self.stopped:
-                return anoop
-
-            async def block_task(**kwargs):
-                await ExecutorStep(block_id, block_type, is_eager or block_is_run_type)
-                func_kwargs = {**default_func_kwargs, **kwargs}
-                func_kwargs.update(self.create_default_context(block_node, is_eager))
-                await Executor.__resolve_block_task_value_kwargs(block_settings, func_kwargs, is_eager)
-                logger.debug(
-                    f"Executing block '{block_type}' {'eagerly ' if is_eager else ''}with context: {func_kwargs}")
-                try:
-                    return_value = block_settings["func"](**func_kwargs)
-                    if inspect.isawaitable(return_value):
-                        return_value = await return_value
-                except Exception as e:
-                    logger.error("Could not execute block", exc_info=e)
-                    self.broadcast_exception(e)
-                    return None
-                logger.debug(f"Executed block '{block_type}' returned '{return_value}' using context: {func_kwargs}")
-                return return_value
-            return block_task
-
-        self.block_factories[block_id] = block_task_create
-        return block_task_create
+            "value": self.to_json(slot, value),
+            "type": slot.type,
+            "id": slot.id,
+            "name": names[slot.index]
+        } for slot, value in self.variable_store.items()]
+
+    def get_variable_changes(self, since_version: int) -> tuple[list[dict], list[dict]]:
+        """
+        Returns the variables written after a version of the variable store, and those that were cleared
+        """
+        names = self.compiled_program.variables.names
+        variables = []
+        removed_variables = []
+        for slot, value in self.variable_store.changed_since(since_version):
+            if value is unset:
+                removed_variables.append({"type": slot.type, "id": slot.id})
+            else:
+                variables.append({
+                    "value": self.to_json(slot, value),
+                    "type": slot.type,
+                    "id": slot.id,
+                    "name": names[slot.index]
+                })
+        return variables, removed_variables
+
+    def to_json(self, slot: VariableSlot, value: Any) -> Any:
+        if slot.type in self.variable_handlers:
+            return self.variable_handlers[slot.type].to_json(value)
+        return value
+
+    def add_cache(self, name: str, cache: Any):
+        """
+        Adds a cache to report in get_cache_stats, which must have a get_stats method
+        """
+        self.caches[name] = cache
+
+    def get_cache_stats(self) -> dict[str, dict]:
+        return {name: cache.get_stats() for name, cache in self.caches.items()}
+
+    def set_profiler(self, profiler: BlockProfiler | None):
+        """
+        Enables or disables profiling, which takes effect when the program is next started
+        """
+        self.profiler = profiler
+        self.link_program(self.compiled_program)
+
+    def execute_block(self, block: CompiledBlock, is_eager=True) -> Any:
+        self.task_stack.add_task(self.runners[block].get_call(is_eager)())
+
+    def link_program(self, compiled_program: CompiledProgram):
+        runners = {block: BlockRunner(self, block) for block in compiled_program.blocks}
+        for runner in runners.values():
+            runner.link(runners)
+        self.runners = runners
 
     def load_variables(self):
-        variables = self.program.find("variables")
-        if not variables:
-            return
-        for variable in variables:
-            var_id: str = variable.get("id")
-            var_type: str = variable.get("type")
-            var_name: str = variable.text
-            var_ref = VariableRef(var_type, var_id)
-            if var_type in self.variable_handlers:
-                self.variables[var_ref] = self.variable_handlers[var_type].get_default_value(variable)
+        layout = self.compiled_program.variables
+        self.variable_store.clear()
+        for slot, variable in zip(layout.slots, layout.elements):
+            if variable is None:
+                continue
+            if slot.type in self.variable_handlers:
+                self.variable_store.set(slot, self.variable_handlers[slot.type].get_default_value(variable))
             else:
-                self.variables[var_ref] = variable.text
-            self.variable_names[var_ref] = var_name
-            logger.debug(f"Loaded variable: [{var_ref[0]}-{var_ref[1]}]={self.variables[var_ref]}")
-
-    def extract_context_with_cache(self, current_block: ElementTree.Element, block_definition: PyBlockDefinition):
-        block_id = current_block.get("id")
-        if block_id is None:
-            return self.extract_context(current_block, block_definition)
-        cache_key = block_id
-        if cache_key in self.cached_contexts:
-            return self.cached_contexts[cache_key]
-        context = self.extract_context(current_block, block_definition)
-        self.cached_contexts[cache_key] = context
-        return context
-
-    def extract_context(self, current_block: ElementTree.Element, block_definition: PyBlockDefinition):
-        context = self.__get_block_kwargs_defaults(block_definition)
-        for el in current_block:
-            name = el.get("name").lower() if el.get("name") else None
-            is_ref_type = self.__is_variable_ref_type(current_block, name)
-            if el.tag == "field":
-                context[name] = self.parse_field(el, is_ref_type)
-            elif el.tag == "value":
-                context[name] = self.parse_value(el, is_ref_type)
-            elif el.tag == "statement":
-                context[name] = self.parse_statement(el)
-        return context
-
-    def create_default_context(self, block: ElementTree.Element, is_eager=True):
-        next_block = block.find("next")
-
-        context_obj = Context()
-        context_obj.recurse = self.get_block_function_factory(block)(is_eager)
-        context_obj.next = self.get_block_function_factory(next_block.find("block"))(is_eager) if next_block else anoop
-        context_obj.listen = self.add_broadcast_listener
-        context_obj.broadcast = self.broadcast
-        context_obj.set_variable = self.set_variable
-        context_obj.get_variable = self.get_variable
-        context_obj.get_plugin_context = lambda k: self.active_contexts[k]
-
-        return {
-            "context": context_obj
-        }
-
-    def parse_field(self, el, is_ref_type):
-        var_id: str = el.get("id")
-        if var_id is not None:
-            var_type: str = el.get("variabletype")
-            var_ref = VariableRef(var_type, var_id)
-            if is_ref_type:
-                return var_ref
-            return Value(lambda: self.get_variable(var_ref))
-        else:
-            field_type = el.get("name")
-            if field_type == "NUM":
-                return float(el.text)
-            return el.text or ""
-
-    def parse_value(self, el: ElementTree.Element, is_ref_type=False):
-        block = el.find("block")
-        if block is not None:
-            return Value(self.get_block_function_factory(block)(True))
-        shadow = el.find("shadow")
-        if shadow is not None:
-            return self.parse_shadow(shadow, is_ref_type)
-        raise ExecutionException("Could not parse value block")
-
-    def parse_shadow(self, el, is_ref_type=False):
-        field = el.find("field")
-        if field is not None:
-            return self.parse_field(field, is_ref_type)
-        raise ExecutionException("Could not parse shadow block. No field element found")
-
-    def parse_statement(self, el: ElementTree.Element) -> Value[Callable]:
-        block = el.find("block")
-        if block is not None:
-            return StatementValue(self.get_block_function_factory(block))
-        return Value(lambda: anoop)
-
-    def add_broadcast_listener(self, callback: Callable[[str, str], Coroutine | None]):
-        self.event_listeners.append(callback)
+                self.variable_store.set(slot, variable.text)
+            if logger.isEnabledFor(logging.DEBUG):
+                logger.debug(f"Loaded variable: [{slot.type}-{slot.id}]={self.variable_store.get(slot)}")
+
+    def add_broadcast_listener(self, callback: EventListener, topic: str = None, message: str = None):
+        """
+        Adds an event listener for broadcasts matching the topic and message, where None matches anything
+        """
+        self.event_listeners.add(callback, topic, message)
 
     """
     Adds an event listener that does not get removed on every run
     """
 
-    def add_global_broadcast_listener(self, callback: Callable[[str, str], None]):
-        self.global_event_listeners.append(callback)
+    def add_global_broadcast_listener(self, callback: EventListener, topic: str = None, message: str = None):
+        self.global_event_listeners.add(callback, topic, message)
 
     def broadcast(self, topic: str, message: str):
-        for event_listener in self.global_event_listeners + self.event_listeners:
+        for event_listener in self.global_event_listeners.get_listeners(topic, message) + \
+                self.event_listeners.get_listeners(topic, message):
             try:
                 response = event_listener(topic, message)
                 if response is not None:
-                    self.task_stack.add_task(response)
+                    # Hats hand their script on with `await context.next()`, which needs a chain to run it
+                    self.task_stack.add_task(run_chain(response, self.profiler))
             except Exception as e:
                 logger.error("Failed to run from broadcast", exc_info=e)
                 self.broadcast_exception(e)
@@ -267,19 +254,33 @@ class Executor:
     def broadcast_exception(self, e: Exception):
         self.broadcast("error", f"{type(e).__name__}: {str(e)}")
 
-    def set_variable(self, ref: VariableRef, value: Any):
-        if logger.level <= logging.DEBUG:
-            old_value = self.variables[ref] if ref in self.variables else None
+    def set_variable(self, ref: VariableRef | VariableSlot, value: Any):
+        if logger.isEnabledFor(logging.DEBUG):
+            old_value = self.variable_store.get_or_default(ref)
             logger.debug(f"Updated variable '{ref[0]}-{ref[1]}': {old_value} -> {value}")
         self.broadcast("variable", "change")
-        self.variables[ref] = value
+        self.variable_store.set(ref, value)
+
+    def change_list(self, ref: VariableRef | VariableSlot, operation: Callable[..., Any], *args: Any) -> Any:
+        """
+        Changes a list variable in place, see VariableStore.change_list
+        """
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug(f"Updated list '{ref[0]}-{ref[1]}': {operation.__name__}{args}")
+        self.broadcast("variable", "change")
+        return self.variable_store.change_list(ref, operation, *args)
 
-    def get_variable(self, ref: VariableRef):
-        return self.variables[ref]
+    def get_variable(self, ref: VariableRef | VariableSlot):
+        return self.variable_store.get(ref)
 
     def get_variable_names(self):
         return self.variable_names
 
+    def get_plugin_context(self, key: str):
+        if key in self.active_contexts:
+            return self.active_contexts[key]
+        return self.__activate_plugin_context(key)
+
     def get_block_settings(self, block_type):
         try:
             return self.block_definitions[block_type]
@@ -294,87 +295,52 @@ class Executor:
 
     @staticmethod
     def remove_reserved_words_from_param_name(name: str):
-        if name in globals() or name in dir(builtins):
-            return f"param_{name}"
-        return name
+        return remove_reserved_words_from_param_name(name)
 
     def add_variable_handler(self, handler: VariableHandler):
         self.variable_handlers[handler.get_type_name()] = handler
 
     def add_plugin_context(self, context_creator: Callable[[], ContextManager]):
+        """
+        Plugin contexts can declare the `block_types` and `block_categories` that use them, so that they are only
+        activated for programs containing those blocks. Contexts that declare neither are activated for every program.
+        """
         key = context_creator.__name__
         self.plugin_contexts[key] = context_creator
 
-    def __is_variable_ref_type(self, block_node: ElementTree.Element, name: str):
-        if name is None:
-            return False
-
-        block_type = block_node.get("type")
-        block_settings = self.get_block_settings(block_type)
-        # Check arguments first
-        if "definition" in block_settings and block_settings["definition"] is not None:
-            definition: PyBlockDefinition = block_settings["definition"]
-            for arg in definition.arguments:
-                if arg.name == name:
-                    return type(arg) == Variable
-        # Check annotations
-        func: Any = block_settings["func"]
-        type_hints = func.__annotations__
-        sanitised_name = Executor.remove_reserved_words_from_param_name(name)
-        if type_hints is not None and sanitised_name in type_hints and type_hints[sanitised_name] == VariableRef:
-            return True
-
-        # Default to value-type
-        return False
-
-    @staticmethod
-    def __is_value_immediate(block_settings: PyBlockSettings, name: str):
-        if name is None:
-            return True
-
-        # Check annotations
-        func: Any = block_settings["func"]
-        type_hints = func.__annotations__
-        sanitised_name = Executor.remove_reserved_words_from_param_name(name)
-        if type_hints is not None and sanitised_name in type_hints:
-            type_hint = type_hints[sanitised_name]
-            type_origin = get_origin(type_hint)
-            if type_origin is not None:
-                type_hint = type_origin
-            if issubclass(type_hint, Value):
-                return False
-
-        # Default to immediate-type
-        return True
-
-    @staticmethod
-    async def __resolve_block_task_value_kwargs(block_settings: PyBlockSettings, func_kwargs: dict, is_eager: bool):
-        for k in func_kwargs:
-            if issubclass(type(func_kwargs[k]), Value) and Executor.__is_value_immediate(block_settings, k):
-                if type(func_kwargs[k]) == StatementValue:
-                    func_kwargs[k] = func_kwargs[k].get(is_eager)
-                else:
-                    result = func_kwargs[k].get()
-                    if inspect.isawaitable(result):
-                        result = await result
-                    func_kwargs[k] = result
-
-    def __create_plugin_contexts(self):
-        for key, plugin_context_creator in self.plugin_contexts.items():
-            context = plugin_context_creator(self)
+    def get_required_plugin_contexts(self, program: CompiledProgram) -> list[str]:
+        block_types = {block.type for block in program.blocks}
+        block_categories = {block.settings.get("category") for block in program.blocks}
+        required_contexts = []
+        for key, context_creator in self.plugin_contexts.items():
+            context_block_types = getattr(context_creator, "block_types", ())
+            context_block_categories = getattr(context_creator, "block_categories", ())
+            if (len(context_block_types) == 0 and len(context_block_categories) == 0) \
+                    or not block_types.isdisjoint(context_block_types) \
+                    or not block_categories.isdisjoint(context_block_categories):
+                required_contexts.append(key)
+        return required_contexts
+
+    def __activate_plugin_context(self, key: str):
+        with self.plugin_context_lock:
+            if key in self.active_contexts:
+                return self.active_contexts[key]
+            logger.debug("Activating plugin context %s", key)
+            context = self.plugin_contexts[key](self)
             context.__enter__()
             self.active_contexts[key] = context
-
-    def __close_plugin_contexts(self):
-        for plugin_context in self.active_contexts.values():
-            if plugin_context.__exit__:
-                plugin_context.__exit__(None, None, None)
-        self.active_contexts.clear()
-
-    @staticmethod
-    def __get_block_kwargs_defaults(block_definition: PyBlockDefinition):
-        func_kwargs = {}
-        if block_definition and block_definition.arguments is not None:
-            for arg in block_definition.arguments:
-                func_kwargs[arg.name.lower()] = arg.get_default()
-        return func_kwargs
+            return context
+
+    def __reset_plugin_contexts(self):
+        # Contexts stay active between runs, so they only clear what the last run left behind
+        with self.plugin_context_lock:
+            for plugin_context in self.active_contexts.values():
+                if hasattr(plugin_context, "reset"):
+                    plugin_context.reset()
+
+    def __close_plugin_contexts(self, keys: list[str]):
+        with self.plugin_context_lock:
+            for key in keys:
+                plugin_context = self.active_contexts.pop(key)
+                if plugin_context.__exit__:
+                    plugin_context.__exit__(None, None, None)
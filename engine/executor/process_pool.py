@@ -0,0 +1,264 @@
+import asyncio
+import itertools
+import logging
+import multiprocessing
+import os
+import queue
+import threading
+from concurrent.futures import Future
+from multiprocessing.connection import Connection
+from typing import Callable
+
+from engine.executor.exceptions import ExecutionException
+from engine.executor.executor import Executor
+from engine.executor.session import ExecutorSession
+
+logger = logging.getLogger(__name__)
+
+
+class WorkerSession:
+    """
+    Handles the messages of one session in a worker process on its own thread, so that a slow message (such as loading a
+    large program) does not hold up the other sessions of the worker. Messages of a session are handled in the order
+    they were sent.
+    """
+
+    def __init__(self, executor_factory: Callable[[], Executor], send: Callable[[int, bool, dict | None], None]):
+        self.executor_factory = executor_factory
+        self.send = send
+        self.session = None
+        self.messages = queue.Queue()
+        self.thread = threading.Thread(target=self.run, daemon=True)
+        self.thread.start()
+
+    def run(self):
+        try:
+            while True:
+                request = self.messages.get()
+                if request is None:
+                    break
+                request_id, message = request
+                try:
+                    if message["type"] == "open":
+                        self.session = ExecutorSession(self.executor_factory())
+                        response = None
+                    elif message["type"] == "close":
+                        self.close()
+                        response = None
+                    else:
+                        response = self.session.handle(message)
+                    self.send(request_id, True, response)
+                except Exception as e:
+                    logger.error("Executor worker encountered an error", exc_info=e)
+                    self.send(request_id, False, f"{type(e).__name__}: {str(e)}")
+        finally:
+            self.close()
+
+    def close(self):
+        if self.session is not None:
+            self.session.close()
+            self.session = None
+
+    def stop(self, timeout: float):
+        self.messages.put(None)
+        self.thread.join(timeout)
+
+
+def run_worker(connection: Connection, executor_factory: Callable[[], Executor]):
+    sessions: dict[int, WorkerSession] = {}
+    send_lock = threading.Lock()
+
+    def send(request_id: int, is_success: bool, response: dict | None):
+        with send_lock:
+            connection.send((request_id, is_success, response))
+
+    try:
+        while True:
+            try:
+                request = connection.recv()
+            except EOFError:
+                break
+            if request is None:
+                break
+            request_id, session_id, message = request
+            if message["type"] == "open":
+                sessions[session_id] = WorkerSession(executor_factory, send)
+            if session_id not in sessions:
+                send(request_id, False, f"KeyError: unknown session {session_id}")
+                continue
+            sessions[session_id].messages.put((request_id, message))
+            if message["type"] == "close":
+                # The session thread ends once it has closed the session
+                sessions.pop(session_id).messages.put(None)
+    finally:
+        for worker_session in sessions.values():
+            worker_session.stop(timeout=5)
+
+
+class ExecutorWorker:
+    """
+    Handle for a worker process that hosts the executors of one or more sessions. Requests are tagged with an id and
+    their responses are matched up by a reader thread, so the requests of different sessions can overlap.
+    """
+    process: multiprocessing.Process
+    connection: Connection
+    active_sessions: int
+    sessions_served: int
+    pending_requests: dict[int, Future]
+
+    def __init__(self, context, executor_factory: Callable[[], Executor]):
+        self.connection, worker_connection = context.Pipe()
+        self.process = context.Process(target=run_worker, args=(worker_connection, executor_factory), daemon=True)
+        self.process.start()
+        worker_connection.close()
+        self.lock = threading.Lock()
+        self.active_sessions = 0
+        self.sessions_served = 0
+        self.is_retiring = False
+        self.pending_requests = {}
+        self.request_ids = itertools.count()
+        self.is_closed = False
+        self.reader = threading.Thread(target=self.__read_responses, daemon=True)
+        self.reader.start()
+
+    def request(self, session_id: int, message: dict) -> dict | None:
+        future = Future()
+        with self.lock:
+            if self.is_closed:
+                raise ExecutionException("Executor worker has exited")
+            request_id = next(self.request_ids)
+            self.pending_requests[request_id] = future
+            try:
+                self.connection.send((request_id, session_id, message))
+            except Exception:
+                del self.pending_requests[request_id]
+                raise
+        is_success, response = future.result()
+        if not is_success:
+            raise ExecutionException(response)
+        return response
+
+    def shutdown(self):
+        with self.lock:
+            try:
+                self.connection.send(None)
+            except (BrokenPipeError, OSError):
+                pass
+        self.process.join(timeout=5)
+        if self.process.is_alive():
+            self.process.terminate()
+            self.process.join(timeout=5)
+        # The reader stops once the worker's end of the pipe is closed
+        self.reader.join(timeout=5)
+        self.connection.close()
+
+    def __read_responses(self):
+        while True:
+            try:
+                request_id, is_success, response = self.connection.recv()
+            except (EOFError, OSError):
+                break
+            with self.lock:
+                future = self.pending_requests.pop(request_id)
+            future.set_result((is_success, response))
+        with self.lock:
+            self.is_closed = True
+            pending_requests = self.pending_requests
+            self.pending_requests = {}
+        for future in pending_requests.values():
+            future.set_result((False, "Executor worker has exited"))
+
+
+class PooledSession:
+    """
+    Proxies the messages of a websocket session to the executor hosted by a worker process
+    """
+
+    def __init__(self, pool: 'ExecutorProcessPool', worker: ExecutorWorker, session_id: int):
+        self.pool = pool
+        self.worker = worker
+        self.session_id = session_id
+        self.is_closed = False
+
+    async def handle(self, message: dict) -> dict | None:
+        return await asyncio.to_thread(self.worker.request, self.session_id, message)
+
+    async def close(self):
+        if self.is_closed:
+            return
+        self.is_closed = True
+        try:
+            await asyncio.to_thread(self.worker.request, self.session_id, {"type": "close"})
+        finally:
+            self.pool.release(self.worker)
+
+
+class ExecutorProcessPool:
+    """
+    Runs the executors of sessions in worker processes so that CPU heavy programs in different sessions do not compete
+    for the same GIL. Sessions are placed on the worker with the fewest active sessions. A worker that has served
+    max_sessions_per_worker sessions stops taking new ones and is replaced once its last session closes.
+
+    executor_factory is called in the worker processes, so it must be picklable (e.g. a module level function).
+    """
+    workers: list[ExecutorWorker]
+
+    def __init__(self, executor_factory: Callable[[], Executor], size: int = None, max_sessions_per_worker: int = 100):
+        self.executor_factory = executor_factory
+        self.size = size or os.cpu_count() or 1
+        self.max_sessions_per_worker = max_sessions_per_worker
+        self.context = multiprocessing.get_context("spawn")
+        self.workers = []
+        self.lock = threading.Lock()
+        self.session_ids = itertools.count()
+
+    async def open_session(self) -> PooledSession:
+        # Starting a worker process takes a while, which must not hold up the event loop
+        worker = await asyncio.to_thread(self.__acquire_worker)
+        session = PooledSession(self, worker, next(self.session_ids))
+        try:
+            await asyncio.to_thread(worker.request, session.session_id, {"type": "open"})
+        except Exception:
+            self.release(worker)
+            raise
+        return session
+
+    def release(self, worker: ExecutorWorker):
+        with self.lock:
+            worker.active_sessions -= 1
+            if not worker.is_retiring or worker.active_sessions > 0 or worker not in self.workers:
+                return
+            self.workers.remove(worker)
+        logger.debug("Recycling executor worker %s", worker.process.pid)
+        worker.shutdown()
+
+    def shutdown(self):
+        with self.lock:
+            workers = self.workers
+            self.workers = []
+        for worker in workers:
+            worker.shutdown()
+
+    def __acquire_worker(self) -> ExecutorWorker:
+        with self.lock:
+            return self.__choose_worker()
+
+    def __choose_worker(self) -> ExecutorWorker:
+        # Must be called while holding the lock
+        for worker in [w for w in self.workers if not w.process.is_alive()]:
+            logger.warning("Executor worker %s exited unexpectedly", worker.process.pid)
+            self.workers.remove(worker)
+        available_workers = [w for w in self.workers if not w.is_retiring]
+        if len(self.workers) < self.size or len(available_workers) == 0:
+            worker = ExecutorWorker(self.context, self.executor_factory)
+            self.workers.append(worker)
+        else:
+            worker = min(available_workers, key=lambda w: w.active_sessions)
+        worker.active_sessions += 1
+        worker.sessions_served += 1
+        if worker.sessions_served >= self.max_sessions_per_worker:
+            worker.is_retiring = True
+        return worker
+
+    def __len__(self):
+        return len(self.workers)
@@ -0,0 +1,191 @@
+import time
+
+from engine.executor.program import CompiledBlock
+
+
+class BlockStats:
+    __slots__ = ("block_id", "block_type", "calls", "cumulative_time", "self_time", "active")
+
+    def __init__(self, block_id: str | None, block_type: str):
+        self.block_id = block_id
+        self.block_type = block_type
+        self.calls = 0
+        self.cumulative_time = 0.0
+        self.self_time = 0.0
+        # Number of unfinished executions, so that recursive executions are only counted once in the cumulative time
+        self.active = 0
+
+
+class ProfileNode:
+    """
+    Node of the call tree, identified by the path of blocks that led to it
+    """
+    __slots__ = ("label", "children", "self_time")
+
+    def __init__(self, label: str):
+        self.label = label
+        self.children = {}
+        self.self_time = 0.0
+
+    def get_child(self, label: str) -> 'ProfileNode':
+        child = self.children.get(label)
+        if child is None:
+            child = self.children[label] = ProfileNode(label)
+        return child
+
+
+class ProfileChain:
+    """
+    Time that a chain of nested block executions has spent waiting for the scheduler
+    """
+    __slots__ = ("suspended_time",)
+
+    def __init__(self):
+        self.suspended_time = 0.0
+
+
+class ProfileFrame:
+    __slots__ = ("stats", "node", "parent", "chain", "start", "suspended_at_start", "child_time", "is_handing_on")
+
+    def __init__(self, stats: BlockStats, node: ProfileNode, parent: 'ProfileFrame | None', chain: ProfileChain):
+        self.stats = stats
+        self.node = node
+        self.parent = parent
+        self.chain = chain
+        self.suspended_at_start = chain.suspended_time
+        self.child_time = 0.0
+        # Set while the blocks after this one in its chain run, which are part of its cumulative time
+        self.is_handing_on = False
+        self.start = time.perf_counter()
+
+
+class BlockProfiler:
+    """
+    Records call counts, cumulative time and self time per block. A block's cumulative time includes the blocks that it
+    awaits (its next block, substacks and reporters), and its self time excludes them. Next blocks run after the block
+    before them has returned (see run_chain), so the frames of a chain are only exited once the whole chain has run.
+    Time spent waiting for the scheduler (for example between steps) is not counted.
+    """
+    stats: dict[str | None, BlockStats]
+    root: ProfileNode
+    current: ProfileFrame | None
+
+    def __init__(self):
+        self.stats = {}
+        self.root = ProfileNode("program")
+        self.current = None
+
+    def enter(self, block: CompiledBlock, label: str) -> ProfileFrame:
+        parent = self.current
+        stats = self.stats.get(block.id)
+        if stats is None:
+            stats = self.stats[block.id] = BlockStats(block.id, block.type)
+        stats.calls += 1
+        stats.active += 1
+        if parent is None:
+            frame = ProfileFrame(stats, self.root.get_child(label), None, ProfileChain())
+        else:
+            frame = ProfileFrame(stats, parent.node.get_child(label), parent, parent.chain)
+        self.current = frame
+        return frame
+
+    def exit(self, frame: ProfileFrame):
+        if frame.is_handing_on:
+            # Stays the current frame, so that the next block is entered as its child
+            return
+        duration = time.perf_counter() - frame.start - (frame.chain.suspended_time - frame.suspended_at_start)
+        self_time = duration - frame.child_time
+        stats = frame.stats
+        stats.self_time += self_time
+        stats.active -= 1
+        if stats.active == 0:
+            stats.cumulative_time += duration
+        frame.node.self_time += self_time
+        if frame.parent is not None:
+            frame.parent.child_time += duration
+        self.current = frame.parent
+
+    def hand_on(self) -> ProfileFrame | None:
+        """
+        Called when the current block hands on to its next block, keeps its frame open until exit_chain
+        """
+        frame = self.current
+        if frame is not None:
+            frame.is_handing_on = True
+        return frame
+
+    def exit_chain(self, frames: list[ProfileFrame | None]):
+        for frame in reversed(frames):
+            if frame is not None:
+                frame.is_handing_on = False
+                self.exit(frame)
+
+    def suspend(self) -> tuple[ProfileFrame | None, float]:
+        """
+        Called before a block waits for the scheduler, which runs other blocks until it is resumed
+        """
+        frame = self.current
+        self.current = None
+        return frame, time.perf_counter()
+
+    def resume(self, frame: ProfileFrame | None, suspended_at: float):
+        self.current = frame
+        if frame is not None:
+            frame.chain.suspended_time += time.perf_counter() - suspended_at
+
+    def reset(self):
+        self.stats = {}
+        self.root = ProfileNode("program")
+        self.current = None
+
+    def get_block_stats(self) -> list[dict]:
+        return [{
+            "id": stats.block_id,
+            "type": stats.block_type,
+            "calls": stats.calls,
+            "cumulativeTime": stats.cumulative_time,
+            "selfTime": stats.self_time
+        } for stats in self.stats.values()]
+
+    def get_type_stats(self) -> list[dict]:
+        """
+        Sums the stats of the blocks of each type. Cumulative times of nested blocks of the same type overlap.
+        """
+        types = {}
+        for stats in self.stats.values():
+            if stats.block_type not in types:
+                types[stats.block_type] = {
+                    "type": stats.block_type,
+                    "calls": 0,
+                    "cumulativeTime": 0.0,
+                    "selfTime": 0.0
+                }
+            type_stats = types[stats.block_type]
+            type_stats["calls"] += stats.calls
+            type_stats["cumulativeTime"] += stats.cumulative_time
+            type_stats["selfTime"] += stats.self_time
+        return list(types.values())
+
+    def get_folded_stacks(self) -> str:
+        """
+        Returns the self time of every path in the call tree in microseconds, in the folded format used by flamegraph
+        tools (one "frame;frame;frame count" line per path)
+        """
+        lines = []
+        stack = [(child, child.label) for child in self.root.children.values()]
+        while len(stack) > 0:
+            node, path = stack.pop()
+            microseconds = int(node.self_time * 1_000_000)
+            if microseconds > 0:
+                lines.append(f"{path} {microseconds}")
+            stack.extend((child, f"{path};{child.label}") for child in node.children.values())
+        return "\n".join(sorted(lines))
+
+    def write_folded_stacks(self, path: str):
+        with open(path, "w") as file:
+            file.write(self.get_folded_stacks())
+
+    @staticmethod
+    def get_label(block: CompiledBlock) -> str:
+        # Semicolons separate frames and the last space separates the count, so neither can be part of a label
+        return f"{block.type}[{block.id}]".replace(";", "_").replace(" ", "_")
@@ -0,0 +1,75 @@
+from dataclasses import dataclass
+from enum import Enum
+from typing import Any, Callable, Mapping
+from xml.etree import ElementTree
+
+from engine.blocks.block import PyBlockSettings
+from engine.executor.variable_reference import VariableRef, VariableSlot
+
+
+class ArgumentKind(Enum):
+    CONSTANT = 1  # Literal value passed as is
+    VARIABLE_REF = 2  # VariableRef passed as is
+    VARIABLE = 3  # VariableRef resolved to the variable's value
+    BLOCK = 4  # Reporter block resolved to its return value
+    STATEMENT = 5  # Statement chain (or None for an empty statement)
+
+
+@dataclass(frozen=True)
+class ArgumentSlot:
+    name: str
+    kind: ArgumentKind
+    value: Any
+    is_immediate: bool = True
+
+
+@dataclass(frozen=True, eq=False)
+class CompiledBlock:
+    id: str | None
+    type: str
+    settings: PyBlockSettings
+    func: Callable
+    can_run: bool
+    arguments: tuple[ArgumentSlot, ...]
+    next: 'CompiledBlock | None' = None
+
+    def get_read_variables(self) -> tuple[VariableSlot, ...] | None:
+        """
+        Returns the variables read by this reporter and the reporters it uses, or None if any of them is not pure and
+        its result can change without a variable changing
+        """
+        if not self.settings.get("is_pure", False):
+            return None
+        slots = []
+        for argument in self.arguments:
+            if argument.kind == ArgumentKind.VARIABLE or argument.kind == ArgumentKind.VARIABLE_REF:
+                slots.append(argument.value)
+            elif argument.kind == ArgumentKind.BLOCK:
+                read_variables = argument.value.get_read_variables()
+                if read_variables is None:
+                    return None
+                slots.extend(read_variables)
+            elif argument.kind == ArgumentKind.STATEMENT:
+                return None
+        return tuple(dict.fromkeys(slots))
+
+
+@dataclass(frozen=True, eq=False)
+class VariableLayout:
+    """
+    Assigns every variable of a program a dense slot index. Variables that are used but not declared have no element.
+    """
+    slots: tuple[VariableSlot, ...]
+    names: tuple[str, ...]
+    elements: tuple[ElementTree.Element | None, ...]
+    indices: Mapping[VariableRef, int]
+
+    def __len__(self):
+        return len(self.slots)
+
+
+@dataclass(frozen=True, eq=False)
+class CompiledProgram:
+    starting_blocks: tuple[CompiledBlock, ...]
+    blocks: tuple[CompiledBlock, ...]
+    variables: VariableLayout
@@ -0,0 +1,76 @@
+import hashlib
+import re
+import threading
+import xml.etree.ElementTree as ElementTree
+from collections import OrderedDict
+
+from engine.blocks.registry import BlockRegistry
+from engine.executor.compiler import ProgramCompiler
+from engine.executor.program import CompiledProgram
+
+namespace_pattern = re.compile(r"xmlns=\"[^\"]+\"")
+
+CachedProgram = tuple[ElementTree.Element, CompiledProgram]
+
+
+class ProgramCache:
+    """
+    Least recently used cache of parsed and compiled programs keyed by a hash of their XML and the block registry they
+    were compiled with, so that a program that is loaded again (by the same or another session) is only compiled once.
+    The oldest programs are evicted when there are more than max_programs. Compiled programs are immutable and are
+    shared between executors, the parsed XML must not be changed.
+    """
+    programs: OrderedDict[tuple[bytes, BlockRegistry], CachedProgram]
+    max_programs: int
+    hits: int
+    misses: int
+
+    def __init__(self, max_programs: int = 32):
+        self.programs = OrderedDict()
+        self.max_programs = max_programs
+        self.hits = 0
+        self.misses = 0
+        # Sessions load programs on their own threads
+        self.lock = threading.Lock()
+
+    @property
+    def hit_rate(self) -> float:
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups > 0 else 0.0
+
+    def load(self, xml_string: str, block_registry: BlockRegistry) -> CachedProgram:
+        key = (hashlib.sha256(xml_string.encode()).digest(), block_registry)
+        with self.lock:
+            if key in self.programs:
+                self.programs.move_to_end(key)
+                self.hits += 1
+                return self.programs[key]
+            self.misses += 1
+        program = ElementTree.fromstring(namespace_pattern.sub("", xml_string))
+        compiled_program = ProgramCompiler(block_registry.block_definitions,
+                                           block_registry.block_signatures).compile(program)
+        with self.lock:
+            # Another session may have compiled the same program in the meantime
+            cached_program = self.programs.setdefault(key, (program, compiled_program))
+            while len(self.programs) > self.max_programs:
+                self.programs.popitem(last=False)
+            return cached_program
+
+    def get_stats(self) -> dict:
+        with self.lock:
+            return {
+                "size": len(self.programs),
+                "maxSize": self.max_programs,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hitRate": self.hit_rate
+            }
+
+    def clear(self):
+        with self.lock:
+            self.programs.clear()
+            self.hits = 0
+            self.misses = 0
+
+
+program_cache = ProgramCache()
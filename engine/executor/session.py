@@ -0,0 +1,141 @@
+import logging
+from collections import OrderedDict
+from typing import NamedTuple
+
+from engine.executor.executor import Executor
+from engine.executor.profiler import BlockProfiler
+from engine.executor.variables.variable_store import VariableStore
+
+logger = logging.getLogger(__name__)
+
+# What a client holds after applying a status, so the next status can be sent as the changes since then
+StatusBaseline = NamedTuple("StatusBaseline", [
+    ("variable_store", VariableStore),
+    ("variable_version", int),
+    ("highlights", frozenset[str])
+])
+
+
+class ExecutorSession:
+    """
+    Handles the messages of one /executor websocket session for an Executor.
+
+    Every status has a version. A client that sends the version it last applied as "ackVersion" receives only the
+    variables and highlights that changed since that version. A full status is sent when the version is unknown, after
+    a program is loaded and for "snapshot" messages.
+    """
+    executor: Executor
+    broadcast_list: list[list[str]]
+    version: int
+    baselines: OrderedDict[int, StatusBaseline]
+    max_baselines = 16
+
+    def __init__(self, executor: Executor):
+        self.executor = executor
+        self.broadcast_list = []
+        self.version = 0
+        self.baselines = OrderedDict()
+        executor.add_global_broadcast_listener(self.broadcast_listener)
+
+    def broadcast_listener(self, topic: str, message: str):
+        self.broadcast_list.append([topic, message])
+
+    def get_status(self, ack_version: int = None):
+        executor = self.executor
+        variable_store = executor.variable_store
+        # Read before the variables, so that a write while the status is created is sent again in the next one
+        variable_version = variable_store.checkpoint()
+        highlights = frozenset(executor.get_highlights())
+        baseline = self.baselines[ack_version] if ack_version in self.baselines else None
+        if baseline is not None and baseline.variable_store is not variable_store:
+            baseline = None
+
+        self.version += 1
+        obj = {
+            "type": "status",
+            "version": self.version,
+            "isDelta": baseline is not None,
+            "isRunning": not executor.is_complete(),
+            "taskCount": executor.get_task_count(),
+            "broadcasts": self.broadcast_list
+        }
+        if baseline is not None:
+            variables, removed_variables = executor.get_variable_changes(baseline.variable_version)
+            obj["baseVersion"] = ack_version
+            obj["variables"] = variables
+            obj["removedVariables"] = removed_variables
+            obj["addedHighlights"] = list(highlights - baseline.highlights)
+            obj["removedHighlights"] = list(baseline.highlights - highlights)
+        else:
+            obj["variables"] = executor.get_variables()
+            obj["highlights"] = list(highlights)
+        self.broadcast_list = []
+
+        self.baselines[self.version] = StatusBaseline(variable_store, variable_version, highlights)
+        if len(self.baselines) > self.max_baselines:
+            self.baselines.popitem(last=False)
+        return obj
+
+    def get_trace(self):
+        tracer = self.executor.tracer
+        return {
+            "type": "trace",
+            "isEnabled": tracer is not None,
+            "value": tracer.dump() if tracer is not None else []
+        }
+
+    def get_profile(self):
+        profiler = self.executor.profiler
+        return {
+            "type": "profile",
+            "isEnabled": profiler is not None,
+            "blocks": profiler.get_block_stats() if profiler is not None else [],
+            "types": profiler.get_type_stats() if profiler is not None else [],
+            "folded": profiler.get_folded_stacks() if profiler is not None else ""
+        }
+
+    def handle(self, message: dict) -> dict | None:
+        """
+        Runs a message and returns the response if the message has one
+        """
+        message_type = message["type"]
+        executor = self.executor
+        ack_version = message["ackVersion"] if "ackVersion" in message else None
+        if message_type == "program":
+            executor.load_program(message["value"])
+            # Reloading the same program keeps its variable store, so the baselines are dropped here instead
+            self.baselines.clear()
+        if message_type == "start":
+            if "isEager" in message:
+                executor.start(message["isEager"])
+            else:
+                executor.start()
+            return self.get_status(ack_version)
+        if message_type == "complete":
+            executor.complete()
+            return self.get_status(ack_version)
+        if message_type == "stop":
+            executor.stop()
+            return self.get_status(ack_version)
+        if message_type == "step":
+            executor.step()
+            return self.get_status(ack_version)
+        if message_type == "status":
+            return self.get_status(ack_version)
+        if message_type == "snapshot":
+            return self.get_status()
+        if message_type == "trace":
+            return self.get_trace()
+        if message_type == "profile":
+            if "isEnabled" in message and message["isEnabled"] != (executor.profiler is not None):
+                executor.set_profiler(BlockProfiler() if message["isEnabled"] else None)
+            return self.get_profile()
+        if message_type == "stats":
+            return {"type": "stats", "caches": executor.get_cache_stats()}
+        if message_type == "exit":
+            logger.debug("Closing executor socket...")
+            executor.stop()
+        return None
+
+    def close(self):
+        self.executor.close()
@@ -1,3 +1,8 @@
+import threading
+import time
+from typing import Any, Callable
+
+
 class ExecutorStep:
     identifier: str
     name: str
@@ -14,3 +19,82 @@ class ExecutorStep:
 
     def __str__(self):
         return f"<Step:{self.name}>"
+
+
+class TimerStep:
+    """
+    Yielded by a block that waits until a deadline (in time.monotonic seconds). The scheduler parks the block and runs
+    other blocks until the deadline has passed.
+    """
+    deadline: float
+
+    def __init__(self, deadline: float):
+        self.deadline = deadline
+
+    def __await__(self):
+        yield self
+
+    @classmethod
+    def after(cls, duration: float) -> 'TimerStep':
+        return cls(time.monotonic() + max(float(duration), 0))
+
+    def __str__(self):
+        return f"<Timer:{self.deadline}>"
+
+
+class WaitStep:
+    """
+    Yielded by a block that waits until `notify` is called, which may happen on any thread. The scheduler parks the
+    block and resumes it once it has been notified.
+    """
+    is_notified: bool
+    on_notify: Callable[[], None] | None
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.is_notified = False
+        self.on_notify = None
+
+    def __await__(self):
+        yield self
+
+    def park(self, on_notify: Callable[[], None]) -> bool:
+        """
+        Called by the scheduler, returns False when the step has already been notified and will not call on_notify
+        """
+        with self.lock:
+            if self.is_notified:
+                return False
+            self.on_notify = on_notify
+            return True
+
+    def notify(self):
+        with self.lock:
+            if self.is_notified:
+                return
+            self.is_notified = True
+            on_notify = self.on_notify
+            self.on_notify = None
+        if on_notify is not None:
+            on_notify()
+
+    def __str__(self):
+        return f"<Wait:{'notified' if self.is_notified else 'waiting'}>"
+
+
+class TailCall:
+    """
+    Returned by `context.next()`. Awaiting it hands the next block to the chain that runs the current block, which
+    runs it once the current block has returned, so that long chains of blocks do not nest.
+    """
+    __slots__ = ("runner", "is_eager", "kwargs", "yielded")
+
+    def __init__(self, runner: Any, is_eager: bool, kwargs: dict[str, Any]):
+        self.runner = runner
+        self.is_eager = is_eager
+        self.kwargs = kwargs
+        self.yielded = (self,)
+
+    def __await__(self):
+        # Iterating a tuple yields the call without creating a generator for every block
+        return iter(self.yielded)
@@ -1,3 +1,5 @@
+import heapq
+import itertools
 import logging
 import threading
 import time
@@ -5,7 +7,7 @@ from functools import total_ordering
 from queue import PriorityQueue, Empty, Queue, LifoQueue
 from typing import Coroutine
 
-from engine.executor.task import ExecutorStep
+from engine.executor.task import ExecutorStep, TimerStep, WaitStep
 
 logger = logging.getLogger(__name__)
 
@@ -36,12 +38,19 @@ class StackElement:
 
 
 class ExecutorTaskStack:
+    """
+    Runs block coroutines on a dedicated thread. Blocks that sleep are parked in a heap ordered by deadline, and are
+    resumed eagerly once their deadline has passed while the other blocks keep running. Blocks that wait for a
+    WaitStep are parked until it is notified.
+    """
     task_queue: PriorityQueue[StackElement]
     eager_queue: LifoQueue[StackElement]
     uninitialised_tasks: list[Coroutine]
+    timers: list[tuple[float, int, Coroutine]]
+    parked_tasks: set[Coroutine]
     task_counter: int
     current_task: int
-    highlights: set[str] = set()
+    highlights: set[str]
     is_completing: bool
     is_running: bool
     thread: threading.Thread | None
@@ -50,47 +59,104 @@ class ExecutorTaskStack:
         self.task_queue = PriorityQueue()
         self.eager_queue = LifoQueue()
         self.uninitialised_tasks = []
+        self.timers = []
+        self.parked_tasks = set()
+        # Orders timers with the same deadline, so that coroutines are never compared
+        self.timer_sequence = itertools.count()
         self.lock = threading.Lock()
+        # Signalled whenever the scheduler may be able to make progress or finishes completing
+        self.condition = threading.Condition(self.lock)
         self.is_completing = False
         self.is_running = False
         self.task_counter = 0
         self.current_task = -1
+        self.highlights = set()
         self.task_iteration_limit = task_iteration_limit
         self.stopped = False
         self.thread = None
+        # Checked once so that debug messages are not formatted for every task when they would be discarded
+        self.is_debug = logger.isEnabledFor(logging.DEBUG)
 
     def add_task(self, coro: Coroutine):
         # Initial task steps are always eager
         self._add_task(coro, executor_step=None)
 
     def _add_task(self, coro: Coroutine, executor_step: ExecutorStep | None):
-        with self.lock:
+        with self.condition:
+            self.condition.notify_all()
             if executor_step is None:
-                logger.debug(f"init queue: {coro}")
+                if self.is_debug:
+                    logger.debug(f"init queue: {coro}")
                 self.uninitialised_tasks.append(coro)
                 return
             is_eager = executor_step is None or executor_step.is_eager
             if not is_eager:
                 priority = self.task_counter
                 self.task_queue.put(StackElement(coro, executor_step, priority))
-                logger.debug(f"Task queue: {executor_step} [{priority}]")
+                if self.is_debug:
+                    logger.debug(f"Task queue: {executor_step} [{priority}]")
                 self.task_counter += 1
             else:
-                logger.debug(f"Eager queue: {executor_step}")
+                if self.is_debug:
+                    logger.debug(f"Eager queue: {executor_step}")
                 self.eager_queue.put(StackElement(coro, executor_step, -1))
 
+    def _add_timer(self, coro: Coroutine, timer: TimerStep):
+        with self.condition:
+            heapq.heappush(self.timers, (timer.deadline, next(self.timer_sequence), coro))
+            self.condition.notify_all()
+
+    def _park(self, coro: Coroutine, wait_step: WaitStep):
+        with self.condition:
+            self.parked_tasks.add(coro)
+        if not wait_step.park(lambda: self._unpark(coro)):
+            self._unpark(coro)
+
+    def _unpark(self, coro: Coroutine):
+        with self.condition:
+            # Coroutines that are no longer parked have been closed by stop
+            if coro not in self.parked_tasks:
+                return
+            self.parked_tasks.remove(coro)
+            self.eager_queue.put(StackElement(coro, None, -1))
+            self.condition.notify_all()
+
+    def _release_timers(self):
+        # Must be called while holding the lock
+        now = time.monotonic()
+        while len(self.timers) > 0 and self.timers[0][0] <= now:
+            _, _, coro = heapq.heappop(self.timers)
+            self.eager_queue.put(StackElement(coro, None, -1))
+
+    def _get_timer_timeout(self) -> float | None:
+        # Must be called while holding the lock
+        if len(self.timers) == 0:
+            return None
+        return max(self.timers[0][0] - time.monotonic(), 0)
+
     def _pop_task(self, ):
-        with self.lock:
-            if self.eager_queue.qsize() > 0:
-                item = self.eager_queue.get()
-            else:
-                item = self.task_queue.get()
+        # Must be called while holding the lock
+        if self.eager_queue.qsize() > 0:
+            item = self.eager_queue.get()
+        else:
+            item = self.task_queue.get()
+        if self.is_debug:
             logger.debug(f"Pop queue: {item.executor_step}")
-            return item
+        return item
 
     def _is_empty(self):
         return self.eager_queue.qsize() == 0 and self.task_queue.qsize() == 0
 
+    def _can_make_progress(self):
+        if not self.is_running or len(self.uninitialised_tasks) > 0 or self.eager_queue.qsize() > 0:
+            return True
+        if len(self.timers) > 0 and self.timers[0][0] <= time.monotonic():
+            return True
+        if self.task_queue.qsize() > 0:
+            return self.is_completing or self.task_queue.queue[0].priority <= self.current_task
+        # Completing also wakes an empty scheduler so that it can signal that it is complete, unless blocks are waiting
+        return self.is_completing and len(self.timers) == 0 and len(self.parked_tasks) == 0
+
     def get_highlights(self):
         return self.highlights
 
@@ -103,66 +169,96 @@ class ExecutorTaskStack:
             self.highlights.add(executor_step.identifier)
 
     def complete(self):
-        self.is_completing = True
+        with self.condition:
+            self.is_completing = True
+            self.condition.notify_all()
 
     def step(self):
-        self.current_task += 1
+        with self.condition:
+            self.current_task += 1
+            self.condition.notify_all()
 
     def wait_until_complete(self):
-        self.is_completing = True
-        while self.is_completing:
-            time.sleep(0.1)
+        with self.condition:
+            self.is_completing = True
+            self.condition.notify_all()
+            self.condition.wait_for(lambda: not self.is_completing or not self.is_running)
 
     def _execute_coro(self, coro: Coroutine, step: ExecutorStep | None) -> ExecutorStep:
         self.remove_highlight(step)
         out_step = coro.send(None)
-        logger.debug(f"Step {out_step}")
+        # Nothing can run between eager steps, so they are resumed straight away instead of being queued. New tasks
+        # still get to initialise first, as they would have when the step was queued.
+        while type(out_step) is ExecutorStep and out_step.is_eager and self.is_running \
+                and len(self.uninitialised_tasks) == 0:
+            out_step = coro.send(None)
+        if self.is_debug:
+            logger.debug(f"Step {out_step}")
         if type(out_step) is ExecutorStep:
             self.add_highlight(out_step)
             self._add_task(coro, out_step)
             return out_step
+        elif type(out_step) is TimerStep:
+            self._add_timer(coro, out_step)
+            return out_step
+        elif type(out_step) is WaitStep:
+            self._park(coro, out_step)
+            return out_step
         else:
             raise ValueError(f"Invalid awaitable type. Expected {ExecutorStep.__name__}")
 
     def run(self):
-        if not self.thread or not self.thread.isAlive():
+        if not self.thread or not self.thread.is_alive():
+            self.is_running = True
             self.thread = threading.Thread(target=self._run)
             self.thread.start()
 
     def _run(self):
         logger.info("Started ExecutorTaskStack thread")
-        self.is_running = True
         while self.is_running:
-            if len(self.uninitialised_tasks) > 0:
+            with self.condition:
                 tasks = self.uninitialised_tasks
                 self.uninitialised_tasks = []
-                logger.debug(f"Init tasks: {len(tasks)}")
+            if len(tasks) > 0:
+                if self.is_debug:
+                    logger.debug(f"Init tasks: {len(tasks)}")
                 for coro in reversed(tasks):
                     try:
                         self._execute_coro(coro, None)
                     except StopIteration:
                         pass
-            if self._is_empty():
-                self.is_completing = False
-                self.task_counter = 0
-                self.current_task = -1
-                time.sleep(0.1)
-                continue
-            item = self._pop_task()
-            priority, coro, step = item
-            if priority > self.current_task and not self.is_completing:
-                self.add_highlight(step)
-                self.task_queue.put(item)  # Put exact item back into task_queue (eager tasks should not reach here)
-                time.sleep(0.1)
-            else:
-                try:
-                    self._execute_coro(coro, step)
-                except StopIteration:
-                    pass
+            with self.condition:
+                if len(self.uninitialised_tasks) > 0:
+                    continue
+                self._release_timers()
+                if self._is_empty():
+                    # Waiting blocks still have to finish before the program is complete
+                    if len(self.timers) == 0 and len(self.parked_tasks) == 0:
+                        self.is_completing = False
+                        self.task_counter = 0
+                        self.current_task = -1
+                        self.condition.notify_all()
+                    self.condition.wait_for(self._can_make_progress, self._get_timer_timeout())
+                    continue
+                item = self._pop_task()
+                priority, coro, step = item
+                if priority > self.current_task and not self.is_completing:
+                    self.add_highlight(step)
+                    self.task_queue.put(item)  # Put exact item back into task_queue (eager tasks should not reach here)
+                    self.condition.wait_for(self._can_make_progress, self._get_timer_timeout())
+                    continue
+            try:
+                self._execute_coro(coro, step)
+            except StopIteration:
+                pass
+        with self.condition:
+            self.condition.notify_all()
         logger.info("Stopped ExecutorTaskStack thread")
 
     def stop(self):
-        self.is_running = False
+        with self.condition:
+            self.is_running = False
+            self.condition.notify_all()
         try:
             while True:
                 item = self.task_queue.get_nowait()
@@ -178,6 +274,19 @@ class ExecutorTaskStack:
         self.highlights.clear()
         if self.thread:
             self.thread.join()
+        # Closed once the thread has stopped, as the last block it ran may have started sleeping
+        with self.condition:
+            timers = self.timers
+            self.timers = []
+            uninitialised_tasks = self.uninitialised_tasks
+            self.uninitialised_tasks = []
+            parked_tasks = self.parked_tasks
+            self.parked_tasks = set()
+        for _, _, coro in timers:
+            coro.close()
+        for coro in [*uninitialised_tasks, *parked_tasks]:
+            coro.close()
 
     def __len__(self):
-        return self.task_queue.qsize() + self.eager_queue.qsize() + len(self.uninitialised_tasks)
+        return self.task_queue.qsize() + self.eager_queue.qsize() + len(self.uninitialised_tasks) + len(self.timers) \
+            + len(self.parked_tasks)
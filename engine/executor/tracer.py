@@ -0,0 +1,42 @@
+import time
+from collections import deque
+from typing import NamedTuple
+
+TraceRecord = NamedTuple("TraceRecord", [
+    ("block_id", str | None),
+    ("block_type", str),
+    ("start", float),
+    ("duration", float)
+])
+
+
+class ExecutionTracer:
+    """
+    Records every block execution into a ring buffer holding the most recent `capacity` records. The duration of a
+    block lasts until it returns, so it includes the blocks that it awaits (such as its substacks).
+    """
+    records: deque[TraceRecord]
+
+    def __init__(self, capacity: int = 10_000):
+        self.capacity = capacity
+        self.records = deque(maxlen=capacity)
+        # Records use the performance counter, which is converted to wall clock time when they are dumped
+        self.time_origin = time.time() - time.perf_counter()
+
+    def record(self, block_id: str | None, block_type: str, start: float, duration: float):
+        self.records.append(TraceRecord(block_id, block_type, start, duration))
+
+    def clear(self):
+        self.records.clear()
+
+    def dump(self) -> list[dict]:
+        # Copying is atomic, so blocks can keep running while the records are dumped
+        return [{
+            "id": record.block_id,
+            "type": record.block_type,
+            "timestamp": self.time_origin + record.start,
+            "duration": record.duration
+        } for record in self.records.copy()]
+
+    def __len__(self):
+        return len(self.records)
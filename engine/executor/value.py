@@ -1,6 +1,6 @@
 from typing import Callable, TypeVar, Generic, Awaitable, Coroutine
 
-from engine.executor.variable_reference import VariableRef
+from engine.executor.variable_reference import VariableRef, VariableSlot
 
 T = TypeVar("T")
 
@@ -8,10 +8,14 @@ T = TypeVar("T")
 class Value(Generic[T]):
     variable_ref: VariableRef | None
     getter: Callable[[], Awaitable[T]]
+    # Variables that the value depends on, or None if it can change without a variable changing
+    read_variables: tuple[VariableSlot, ...] | None
 
-    def __init__(self, getter: Callable[[], Awaitable[T]], variable_ref: VariableRef = None):
+    def __init__(self, getter: Callable[[], Awaitable[T]], variable_ref: VariableRef = None,
+                 read_variables: tuple[VariableSlot, ...] = None):
         self.getter = getter
         self.variable_ref = variable_ref
+        self.read_variables = read_variables
 
     def get(self) -> Awaitable[T]:
         return self.getter()
@@ -1,3 +1,7 @@
 from typing import NamedTuple
 
-VariableRef = NamedTuple("VariableRef", [("type", str), ("id", str)])
\ No newline at end of file
+VariableRef = NamedTuple("VariableRef", [("type", str), ("id", str)])
+
+# VariableRef with the index of the variable's slot in a VariableLayout. Blocks receive these from the compiler so
+# variables can be read and written without a lookup.
+VariableSlot = NamedTuple("VariableSlot", [("type", str), ("id", str), ("index", int)])
@@ -0,0 +1,84 @@
+import bisect
+from typing import Any, Callable
+
+
+def delete_item(items: list, index: int):
+    if -len(items) <= index < len(items):
+        del items[index]
+
+
+def replace_item(items: list, index: int, item: Any):
+    # An index past the end adds the item
+    if -len(items) <= index < len(items):
+        items[index] = item
+    elif index >= len(items):
+        items.append(item)
+
+
+class ListIndex:
+    """
+    Maps the items of a list to their positions, in ascending order, so that an item can be found without scanning the
+    list. Changes at the end of the list and replaced items are applied to the index, other changes would move the
+    positions of the following items and drop it instead.
+    """
+    items: list
+    positions: dict[Any, list[int]]
+
+    def __init__(self, items: list):
+        self.items = items
+        self.positions = {}
+        for position, item in enumerate(items):
+            if item in self.positions:
+                self.positions[item].append(position)
+            else:
+                self.positions[item] = [position]
+
+    def find(self, item: Any) -> int:
+        positions = self.positions.get(item)
+        return positions[0] if positions else -1
+
+    def apply(self, operation: Callable[..., Any], args: tuple) -> bool:
+        """
+        Updates the index for an operation that is about to change the list, and returns False if it cannot be updated
+        """
+        try:
+            if operation is list.append:
+                self.__add(args[0], len(self.items))
+            elif operation is list.insert:
+                if args[0] < len(self.items):
+                    return False
+                self.__add(args[1], len(self.items))
+            elif operation is delete_item:
+                position = args[0] + len(self.items) if args[0] < 0 else args[0]
+                if 0 <= position == len(self.items) - 1:
+                    self.__remove(self.items[position], position)
+                elif 0 <= position < len(self.items):
+                    return False
+            elif operation is replace_item:
+                position = args[0] + len(self.items) if args[0] < 0 else args[0]
+                if 0 <= position < len(self.items):
+                    # Adding first means that an unhashable item leaves the index unchanged
+                    self.__add(args[1], position)
+                    self.__remove(self.items[position], position)
+                elif position >= len(self.items):
+                    self.__add(args[1], len(self.items))
+            elif operation is list.clear:
+                self.positions.clear()
+            else:
+                return False
+        except TypeError:
+            # Unhashable items cannot be indexed
+            return False
+        return True
+
+    def __add(self, item: Any, position: int):
+        if item in self.positions:
+            bisect.insort(self.positions[item], position)
+        else:
+            self.positions[item] = [position]
+
+    def __remove(self, item: Any, position: int):
+        positions = self.positions[item]
+        positions.remove(position)
+        if len(positions) == 0:
+            del self.positions[item]
@@ -11,3 +11,9 @@ class VariableHandler(ABC):
     @abstractmethod
     def get_type_name(self) -> str:
         pass
+
+    def to_json(self, value: Any) -> Any:
+        """
+        Converts a value of this type to one that can be serialised as JSON
+        """
+        return value
@@ -0,0 +1,231 @@
+import threading
+from typing import Any, Callable, Iterator
+
+from engine.executor.program import VariableLayout
+from engine.executor.task import WaitStep
+from engine.executor.variables.list_index import ListIndex
+from engine.executor.variable_reference import VariableRef, VariableSlot
+
+unset = object()
+
+
+class VariableStore:
+    """
+    Holds the values of a program's variables in a list indexed by their slot in the VariableLayout. Values are unset
+    until they are loaded or first assigned. Every write records the store's version against the slot, and readers that
+    need to find the changes later take a version with checkpoint, which moves the store on to the next version. So the
+    variables that changed since a checkpoint can be found without comparing values, and writes, which are far more
+    common than checkpoints, only record the version.
+
+    A WaitStep can watch slots, and is notified (and stops watching) when one of them is written.
+
+    Lists are changed in place with change_list, but only lists that it copied itself and that nobody else holds yet.
+    Any other list, such as one assigned with set whose caller may still hold it, is copied by the first change.
+    Readers outside the program (such as the status) get the list itself as a snapshot, and the list stops being owned
+    so that the next change copies it instead of changing the snapshot.
+
+    A list is indexed by its items the first time an item is searched for, and change_list keeps the index up to date
+    from then on.
+    """
+    layout: VariableLayout
+    values: list[Any]
+    versions: list[int]
+    version: int
+    watchers: dict[int, set[WaitStep]]
+    watched_indices: dict[WaitStep, tuple[int, ...]]
+    owned_lists: dict[int, list]
+    list_indices: dict[int, ListIndex]
+
+    def __init__(self, layout: VariableLayout):
+        self.layout = layout
+        self.values = [unset] * len(layout)
+        self.versions = [0] * len(layout)
+        # Writes are newer than version 0, before any checkpoint has been taken
+        self.version = 1
+        self.watchers = {}
+        self.watched_indices = {}
+        # Variables are set from the scheduler and from plugin threads (such as the GUI)
+        self.watch_lock = threading.Lock()
+        self.owned_lists = {}
+        self.list_indices = {}
+        self.list_lock = threading.Lock()
+
+    def index_of(self, ref: VariableRef | VariableSlot) -> int:
+        if type(ref) is VariableSlot:
+            return ref.index
+        return self.layout.indices[VariableRef(ref[0], ref[1])]
+
+    def get(self, ref: VariableRef | VariableSlot) -> Any:
+        # Indexing the slot's tuple directly is the fastest way to its index, a VariableRef has no third item
+        try:
+            value = self.values[ref[2]]
+        except IndexError:
+            value = self.values[self.index_of(ref)]
+        if value is unset:
+            raise KeyError(ref)
+        return value
+
+    def get_or_default(self, ref: VariableRef | VariableSlot, default: Any = None) -> Any:
+        try:
+            return self.get(ref)
+        except KeyError:
+            return default
+
+    def set(self, ref: VariableRef | VariableSlot, value: Any):
+        try:
+            index = ref[2]
+        except IndexError:
+            index = self.index_of(ref)
+        self.values[index] = value
+        # Recorded after the write, so that a checkpoint taken in between reads the new value
+        self.versions[index] = self.version
+        if self.watchers and index in self.watchers:
+            self.notify_watchers(index)
+
+    def change_list(self, ref: VariableRef | VariableSlot, operation: Callable[..., Any], *args: Any) -> Any:
+        """
+        Calls the operation with the variable's list and the arguments, for example list.append, and returns its result.
+        The list is copied first unless the store owns it.
+        """
+        try:
+            index = ref[2]
+        except IndexError:
+            index = self.index_of(ref)
+        with self.list_lock:
+            items = self.values[index]
+            if self.owned_lists.get(index) is not items:
+                if items is unset:
+                    raise KeyError(ref)
+                copy = self.values[index] = self.owned_lists[index] = list(items)
+                if index in self.list_indices and self.list_indices[index].items is items:
+                    self.list_indices[index].items = copy
+                items = copy
+            if index in self.list_indices:
+                list_index = self.list_indices[index]
+                if list_index.items is not items or not list_index.apply(operation, args):
+                    del self.list_indices[index]
+            result = operation(items, *args)
+        self.versions[index] = self.version
+        if index in self.watchers:
+            self.notify_watchers(index)
+        return result
+
+    def find_item(self, ref: VariableRef | VariableSlot, item: Any) -> int:
+        """
+        Returns the first position of the item in the variable's list, or -1 if it is not in the list
+        """
+        try:
+            index = ref[2]
+        except IndexError:
+            index = self.index_of(ref)
+        with self.list_lock:
+            items = self.values[index]
+            if type(items) is not list:
+                if items is unset:
+                    raise KeyError(ref)
+                return self.__scan(list(items), item)
+            list_index = self.list_indices.get(index)
+            try:
+                # The index belongs to the list it was built for, a list assigned since then needs a new one
+                if list_index is None or list_index.items is not items:
+                    list_index = self.list_indices[index] = ListIndex(items)
+                return list_index.find(item)
+            except TypeError:
+                # Unhashable items cannot be indexed
+                self.list_indices.pop(index, None)
+                return self.__scan(items, item)
+
+    @staticmethod
+    def __scan(items: list, item: Any) -> int:
+        for position, element in enumerate(items):
+            if element == item:
+                return position
+        return -1
+
+    def snapshot(self, ref: VariableRef | VariableSlot) -> Any:
+        """
+        Returns the variable's value, which is not changed afterwards if it is a list
+        """
+        value = self.__snapshot(self.index_of(ref))
+        if value is unset:
+            raise KeyError(ref)
+        return value
+
+    def __snapshot(self, index: int) -> Any:
+        with self.list_lock:
+            value = self.values[index]
+            if type(value) is list:
+                self.owned_lists.pop(index, None)
+        return value
+
+    def checkpoint(self) -> int:
+        """
+        Returns a version that every later write is newer than, to be taken before reading the variables
+        """
+        version = self.version
+        self.version = version + 1
+        return version
+
+    def watch(self, indices: tuple[int, ...]) -> WaitStep:
+        waiter = WaitStep()
+        with self.watch_lock:
+            self.watched_indices[waiter] = indices
+            for index in indices:
+                if index not in self.watchers:
+                    self.watchers[index] = set()
+                self.watchers[index].add(waiter)
+        return waiter
+
+    def unwatch(self, waiter: WaitStep):
+        with self.watch_lock:
+            self.__remove_watcher(waiter)
+
+    def notify_watchers(self, index: int):
+        with self.watch_lock:
+            waiters = self.watchers.pop(index, ())
+            for waiter in waiters:
+                self.__remove_watcher(waiter)
+        for waiter in waiters:
+            waiter.notify()
+
+    def __remove_watcher(self, waiter: WaitStep):
+        # Must be called while holding the watch lock
+        for index in self.watched_indices.pop(waiter, ()):
+            if index in self.watchers:
+                self.watchers[index].discard(waiter)
+                if len(self.watchers[index]) == 0:
+                    del self.watchers[index]
+
+    def clear(self):
+        self.values[:] = [unset] * len(self.layout)
+        self.versions[:] = [self.version] * len(self.layout)
+        with self.list_lock:
+            self.owned_lists.clear()
+            self.list_indices.clear()
+        # The blocks that were waiting have been stopped
+        with self.watch_lock:
+            self.watchers.clear()
+            self.watched_indices.clear()
+
+    def changed_since(self, version: int) -> Iterator[tuple[VariableSlot, Any]]:
+        """
+        Yields the slots written after the checkpoint with snapshots of their values, which are unset for cleared slots
+        """
+        for slot, slot_version, value in zip(self.layout.slots, self.versions, self.values):
+            if slot_version > version:
+                yield slot, self.__snapshot(slot.index) if type(value) is list else value
+
+    def items(self) -> Iterator[tuple[VariableSlot, Any]]:
+        """
+        Yields the slots that are set with snapshots of their values
+        """
+        for slot, value in zip(self.layout.slots, self.values):
+            if value is not unset:
+                yield slot, self.__snapshot(slot.index) if type(value) is list else value
+
+    def __contains__(self, ref: VariableRef | VariableSlot) -> bool:
+        try:
+            self.get(ref)
+        except KeyError:
+            return False
+        return True
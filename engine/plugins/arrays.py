@@ -0,0 +1,247 @@
+"""
+Numeric arrays backed by NumPy, and blocks that work on a whole array with a single vectorised call. Array variables
+are never changed in place, every block that changes one assigns it a new array. Dividing by zero is an error, as it is
+for numbers, instead of producing infinities and NaN.
+"""
+from typing import Any
+from xml.etree import ElementTree
+
+import numpy
+
+from engine.blocks.block import PyBlockDefinition, pyblock, collect_blocks
+from engine.blocks.fields import Dropdown, Variable
+from engine.blocks.inputs import InputValue
+from engine.executor.context import Context
+from engine.executor.variable_reference import VariableRef
+from engine.executor.variables.variable_handler import VariableHandler
+
+category = "arrays"
+color = 30
+variable_type = "array"
+
+statistics = {
+    "sum": numpy.sum,
+    "mean": numpy.mean,
+    "min": numpy.min,
+    "max": numpy.max
+}
+
+arithmetic_operators = {
+    "+": numpy.add,
+    "-": numpy.subtract,
+    "*": numpy.multiply,
+    "/": numpy.divide
+}
+
+comparison_operators = {
+    "<": numpy.less,
+    "=": numpy.equal,
+    ">": numpy.greater
+}
+
+
+class ArrayVariableHandler(VariableHandler):
+    def get_type_name(self):
+        return variable_type
+
+    def get_default_value(self, variable: ElementTree.Element):
+        return numpy.zeros(0)
+
+    def to_json(self, value: numpy.ndarray) -> list[float | None]:
+        if numpy.isfinite(value).all():
+            return value.tolist()
+        # JSON has no infinity or NaN (the editor's JSON.parse rejects them), an array can still hold them when they were
+        # loaded from a list or a calculation overflowed
+        return [item if numpy.isfinite(item) else None for item in value.tolist()]
+
+
+def to_operand(value: Any) -> numpy.ndarray | float:
+    if isinstance(value, numpy.ndarray):
+        return value
+    return float(value)
+
+
+@pyblock(
+    category=category,
+    definition=PyBlockDefinition(
+        title="set %1 to numbers from %2 up to %3",
+        arguments=[
+            Variable(name="ARRAY", variableTypes=[variable_type]),
+            InputValue(name="START"),
+            InputValue(name="STOP")
+        ],
+        has_next_statement=True,
+        has_previous_statement=True,
+        color=color
+    )
+)
+async def array_range(context: Context, array: VariableRef, start: float, stop: float):
+    context.set_variable(array, numpy.arange(float(start), float(stop), dtype=numpy.float64))
+    await context.next()
+
+
+@pyblock(
+    category=category,
+    definition=PyBlockDefinition(
+        title="set %1 to numbers in list %2",
+        arguments=[
+            Variable(name="ARRAY", variableTypes=[variable_type]),
+            Variable(name="LIST", variableTypes=["list"])
+        ],
+        has_next_statement=True,
+        has_previous_statement=True,
+        color=color
+    )
+)
+async def array_fromlist(context: Context, array: VariableRef, param_list: list):
+    context.set_variable(array, numpy.array(param_list, dtype=numpy.float64))
+    await context.next()
+
+
+@pyblock(
+    category=category,
+    definition=PyBlockDefinition(
+        title="set list %1 to %2",
+        arguments=[
+            Variable(name="LIST", variableTypes=["list"]),
+            Variable(name="ARRAY", variableTypes=[variable_type])
+        ],
+        has_next_statement=True,
+        has_previous_statement=True,
+        color=color
+    )
+)
+async def array_tolist(context: Context, param_list: VariableRef, array: numpy.ndarray):
+    context.set_variable(param_list, array.tolist())
+    await context.next()
+
+
+@pyblock(
+    category=category,
+    is_pure=True,
+    definition=PyBlockDefinition(
+        title="%1",
+        arguments=[
+            Variable(name="ARRAY", variableTypes=[variable_type])
+        ],
+        color=color,
+        extensions=["output_string"]
+    )
+)
+def array_contents(context: Context, array: numpy.ndarray):
+    return array
+
+
+@pyblock(
+    category=category,
+    is_pure=True,
+    definition=PyBlockDefinition(
+        title="length of %1",
+        arguments=[
+            Variable(name="ARRAY", variableTypes=[variable_type])
+        ],
+        color=color,
+        extensions=["output_number"]
+    )
+)
+def array_length(context: Context, array: numpy.ndarray):
+    return len(array)
+
+
+@pyblock(
+    category=category,
+    is_pure=True,
+    definition=PyBlockDefinition(
+        title="%1 of %2",
+        arguments=[
+            Dropdown(name="STATISTIC", options=[(name, name) for name in statistics]),
+            InputValue(name="ARRAY")
+        ],
+        color=color,
+        extensions=["output_number"]
+    )
+)
+def array_statistic(context: Context, statistic: str, array: numpy.ndarray):
+    if len(array) == 0 and statistic != "sum":
+        raise ValueError(f"The {statistic} of an empty array is undefined")
+    return float(statistics[statistic](array))
+
+
+@pyblock(
+    category=category,
+    definition=PyBlockDefinition(
+        title="set %1 to %2 %3 %4",
+        arguments=[
+            Variable(name="ARRAY", variableTypes=[variable_type]),
+            InputValue(name="LEFT"),
+            Dropdown(name="OPERATOR", options=[(name, name) for name in arithmetic_operators]),
+            InputValue(name="RIGHT")
+        ],
+        has_next_statement=True,
+        has_previous_statement=True,
+        color=color
+    )
+)
+async def array_arithmetic(context: Context, array: VariableRef, left: Any, operator: str, right: Any):
+    with numpy.errstate(divide="raise", invalid="raise"):
+        result = arithmetic_operators[operator](to_operand(left), to_operand(right))
+    context.set_variable(array, numpy.asarray(result, dtype=numpy.float64).reshape(-1))
+    await context.next()
+
+
+@pyblock(
+    category=category,
+    definition=PyBlockDefinition(
+        title="set %1 to cumulative sum of %2",
+        arguments=[
+            Variable(name="ARRAY", variableTypes=[variable_type]),
+            InputValue(name="SOURCE")
+        ],
+        has_next_statement=True,
+        has_previous_statement=True,
+        color=color
+    )
+)
+async def array_cumulativesum(context: Context, array: VariableRef, source: numpy.ndarray):
+    context.set_variable(array, numpy.cumsum(source, dtype=numpy.float64))
+    await context.next()
+
+
+@pyblock(
+    category=category,
+    definition=PyBlockDefinition(
+        title="sort %1",
+        arguments=[
+            Variable(name="ARRAY", variableTypes=[variable_type])
+        ],
+        has_next_statement=True,
+        has_previous_statement=True,
+        color=color
+    )
+)
+async def array_sort(context: Context, array: VariableRef):
+    context.set_variable(array, numpy.sort(context.get_variable(array)))
+    await context.next()
+
+
+@pyblock(
+    category=category,
+    definition=PyBlockDefinition(
+        title="set %1 to items of %2 %3 %4",
+        arguments=[
+            Variable(name="ARRAY", variableTypes=[variable_type]),
+            InputValue(name="SOURCE"),
+            Dropdown(name="OPERATOR", options=[(name, name) for name in comparison_operators]),
+            InputValue(name="VALUE")
+        ],
+        has_next_statement=True,
+        has_previous_statement=True,
+        color=color
+    )
+)
+async def array_filter(context: Context, array: VariableRef, source: numpy.ndarray, operator: str, value: Any):
+    context.set_variable(array, source[comparison_operators[operator](source, to_operand(value))])
+    await context.next()
+
+
+arrays_blocks = collect_blocks(__name__)
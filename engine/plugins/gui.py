@@ -1,7 +1,7 @@
 import logging
+import os
 import queue
-import time
-from threading import Thread
+from threading import Event, Lock, Thread
 from typing import Callable, Optional
 
 from pynput.keyboard import Controller
@@ -159,68 +159,167 @@ import tkinter as tk
 
 
 class GuiPluginContext:
-    message_check_interval_ms = 200
+    """
+    Runs Tk on its own thread. Blocks queue widget commands and wake the Tk thread by writing to a pipe that Tk watches,
+    and the Tk thread then runs every queued command, so it sleeps while nothing is queued. Where Tk cannot watch a pipe
+    (Windows), the wake is a virtual event, which threaded Tcl hands to the Tk thread. Tk is only ever called from its
+    own thread. Changes to a textfield or checkbox are written to its variable once that widget has not changed for
+    `variable_update_delay_ms`, so that typing does not set the variable on every keystroke.
+    """
+    block_categories = ("gui",)
+    variable_update_delay_ms = 150
     logger = logging.getLogger(__name__)
     thread: Thread
     active_element_stack: list[tuple[tk.Widget, str]]
     in_queue: queue.Queue
+    pending_variable_updates: dict[int, tuple[Callable[[str], None], str]]
+    variable_update_timers: dict[int, str]
     root: Optional[tk.Tk]
+    wake_reader: Optional[int]
+    wake_writer: Optional[int]
     executor: Executor
 
     def __init__(self, executor: Executor):
         self.executor = executor
+        self.wake_reader = None
+        self.wake_writer = None
+        self.wake_lock = Lock()
 
     @staticmethod
     def queue_call(func):
         def wrapper(self, *arg, **kw):
-            self.in_queue.put(lambda: func(self, *arg, **kw))
+            self.post(lambda: func(self, *arg, **kw))
 
         return wrapper
 
     def __enter__(self):
         self.active_element_stack = []
         self.in_queue = queue.Queue()
+        self.pending_variable_updates = {}
+        self.variable_update_timers = {}
         self.root = None
+        started = Event()
 
         def start():
-            self.root = tk.Tk()
-            self.root.title('PyBlock GUI')
-            self.root.group("")
-            self.root.withdraw()
-            self.root.after(self.message_check_interval_ms, self.check_queue())
+            try:
+                self.root = tk.Tk()
+                self.root.title('PyBlock GUI')
+                self.root.group("")
+                self.root.withdraw()
+                self.open_wake()
+            finally:
+                started.set()
             logging.info("Tkinter window started")
             self.root.mainloop()
-            self.in_queue.put(None)
+            self.close_wake()
             self.root = None
             logging.info("Tkinter window closed")
 
         self.thread = Thread(target=start)
         self.thread.start()
-        while self.root is None:
-            time.sleep(1)
+        started.wait()
+        self.assert_gui_exists()
+
+    def reset(self):
+        # The window is kept between runs, unless it has been closed
+        if not self.thread.is_alive():
+            self.__enter__()
+            return
+        self.clear()
 
     def create_gui(self):
         pass
         # obj = self
 
-    def check_queue(self):
-        try:
-            message = self.in_queue.get(block=False)
-            if message is None:
-                return
-
-            if callable(message):
+    def post(self, message: Callable[[], None]):
+        self.in_queue.put(message)
+        self.wake()
+
+    def open_wake(self):
+        """
+        Called on the tkinter thread, lets other threads wake it once they have queued a command
+        """
+        if hasattr(self.root.tk, "createfilehandler"):
+            reader, writer = os.pipe()
+            os.set_blocking(reader, False)
+            os.set_blocking(writer, False)
+            self.root.tk.createfilehandler(reader, tk.READABLE, self.check_queue)
+            with self.wake_lock:
+                self.wake_reader, self.wake_writer = reader, writer
+        else:
+            self.root.bind("<<Drain>>", self.check_queue)
+        # Commands may have been queued before the wake was set up
+        self.drain_queue()
+
+    def close_wake(self):
+        with self.wake_lock:
+            reader, writer = self.wake_reader, self.wake_writer
+            self.wake_reader = self.wake_writer = None
+        if reader is not None:
+            self.root.tk.deletefilehandler(reader)
+            os.close(reader)
+            os.close(writer)
+
+    def wake(self):
+        with self.wake_lock:
+            if self.wake_writer is not None:
                 try:
-                    logging.debug("Found function on tkinter queue")
-                    message()
-                except Exception as e:
-                    self.logger.error("GUI call failed", e)
-
-            self.root.after(self.message_check_interval_ms, self.check_queue)
-        except queue.Empty:
-            # let's try again later
-            self.root.after(self.message_check_interval_ms, self.check_queue)
-            return
+                    os.write(self.wake_writer, b"\0")
+                except BlockingIOError:
+                    # The pipe is full, so the tkinter thread has a wake pending already
+                    pass
+                return
+        root = self.root
+        if root is not None and not hasattr(root.tk, "createfilehandler"):
+            try:
+                root.event_generate("<<Drain>>", when="tail")
+            except (RuntimeError, tk.TclError):
+                # The window has been closed
+                pass
+
+    def check_queue(self, *_):
+        """
+        Called on the tkinter thread when it has been woken
+        """
+        if self.wake_reader is not None:
+            # Emptied before the queue, so that a command queued meanwhile wakes it again
+            try:
+                while os.read(self.wake_reader, 4096):
+                    pass
+            except BlockingIOError:
+                pass
+        self.drain_queue()
+
+    def drain_queue(self):
+        """
+        Runs every queued command on the tkinter thread
+        """
+        while True:
+            try:
+                message = self.in_queue.get(block=False)
+            except queue.Empty:
+                return
+            try:
+                message()
+            except Exception:
+                self.logger.exception("GUI call failed")
+
+    def update_variable(self, widget_value: tk.Variable, setter: Callable[[str], None], value: str):
+        """
+        Called on the tkinter thread, delays the update until the widget has not changed for a while
+        """
+        key = id(widget_value)
+        self.pending_variable_updates[key] = (setter, value)
+        timer = self.variable_update_timers.get(key)
+        if timer is not None:
+            self.root.after_cancel(timer)
+        self.variable_update_timers[key] = self.root.after(self.variable_update_delay_ms,
+                                                           lambda: self.flush_variable_update(key))
+
+    def flush_variable_update(self, key: int):
+        self.variable_update_timers.pop(key, None)
+        setter, value = self.pending_variable_updates.pop(key)
+        setter(value)
 
     def assert_gui_exists(self):
         if self.root is None:
@@ -265,7 +364,8 @@ class GuiPluginContext:
         panel, direction = self.get_current_panel()
         value = tk.IntVar()
         value.set(0)
-        value.trace_add('write', lambda var, index, mode: setter("true" if value.get() else "false"))
+        value.trace_add('write', lambda var, index, mode: self.update_variable(
+            value, setter, "true" if value.get() else "false"))
 
         checkbox = tk.Checkbutton(panel,
                                   text=title,
@@ -281,7 +381,7 @@ class GuiPluginContext:
         panel, direction = self.get_current_panel()
         value = tk.StringVar()
         value.set("")
-        value.trace_add('write', lambda var, index, mode: setter(value.get()))
+        value.trace_add('write', lambda var, index, mode: self.update_variable(value, setter, value.get()))
 
         frame = tk.Frame(panel)
         label = tk.Label(frame, text=title)
@@ -291,6 +391,17 @@ class GuiPluginContext:
         text.grid(row=0, column=1)
         frame.pack(side=self.get_side(direction))
 
+    @queue_call
+    def clear(self):
+        self.active_element_stack.clear()
+        self.pending_variable_updates.clear()
+        for timer in self.variable_update_timers.values():
+            self.root.after_cancel(timer)
+        self.variable_update_timers.clear()
+        for child in self.root.winfo_children():
+            child.destroy()
+        self.root.withdraw()
+
     @queue_call
     def destroy(self):
         try:
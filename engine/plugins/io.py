@@ -1,6 +1,12 @@
+from typing import TextIO
+
 from engine.blocks.block import PyBlockDefinition, pyblock, collect_blocks
-from engine.blocks.inputs import InputValue
+from engine.blocks.fields import Variable
+from engine.blocks.inputs import InputStatement, InputValue
+from engine.executor.block_call import BlockCall
 from engine.executor.context import Context
+from engine.executor.executor import Executor
+from engine.executor.variable_reference import VariableRef
 
 category = "io"
 color = 200
@@ -36,7 +42,185 @@ async def io_print(context: Context, message: str):
 )
 async def io_readfile(context: Context, path: str):
     with open(path, "r") as f:
-        return "\n".join(f.readlines())
+        return f.read()
+
+
+class LineReader:
+    """
+    Reads a file one line at a time, reading a line ahead so that the end of the file is known before it is reached
+    """
+    file: TextIO
+    line: str
+
+    def __init__(self, path: str):
+        self.file = open(path, "r")
+        self.line = self.file.readline()
+
+    def is_at_end(self) -> bool:
+        return self.line == ""
+
+    def read_line(self) -> str:
+        line = self.line
+        if line != "":
+            self.line = self.file.readline()
+        return line.rstrip("\n")
+
+    def close(self):
+        self.file.close()
+
+
+class FilePluginContext:
+    """
+    Holds the files opened by the "open file" block until they are closed or the program stops
+    """
+    block_types = ("io_openfile", "io_readline", "io_endoffile", "io_closefile")
+    executor: Executor
+    readers: dict[str, LineReader]
+
+    def __init__(self, executor: Executor):
+        self.executor = executor
+        self.readers = {}
+
+    def __enter__(self):
+        pass
+
+    def open(self, path: str) -> LineReader:
+        self.close(path)
+        reader = self.readers[path] = LineReader(path)
+        return reader
+
+    def get_reader(self, path: str) -> LineReader:
+        # Files are opened when they are first read
+        if path in self.readers:
+            return self.readers[path]
+        return self.open(path)
+
+    def close(self, path: str):
+        if path in self.readers:
+            self.readers.pop(path).close()
+
+    def reset(self):
+        for reader in self.readers.values():
+            reader.close()
+        self.readers.clear()
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.reset()
+
+
+@pyblock(
+    category=category,
+    definition=PyBlockDefinition(
+        title="For each line %1 of file %2\n%3",
+        arguments=[
+            Variable(name="VARIABLE"),
+            InputValue(name="PATH"),
+            InputStatement(name="SUBSTACK")
+        ],
+        has_next_statement=True,
+        has_previous_statement=True,
+        color=color
+    )
+)
+async def io_foreachline(context: Context, variable: VariableRef, path: str, substack: BlockCall):
+    # Only the current line is held in memory
+    with open(path, "r") as f:
+        for line in f:
+            context.set_variable(variable, line.rstrip("\n"))
+            await substack()
+    await context.next()
+
+
+@pyblock(
+    category=category,
+    definition=PyBlockDefinition(
+        title="Open file %1",
+        arguments=[
+            InputValue(name="PATH")
+        ],
+        has_next_statement=True,
+        has_previous_statement=True,
+        color=color
+    )
+)
+async def io_openfile(context: Context, path: str):
+    file_context: FilePluginContext = context.get_plugin_context(FilePluginContext.__name__)
+    file_context.open(path)
+    await context.next()
+
+
+@pyblock(
+    category=category,
+    definition=PyBlockDefinition(
+        title="Next line of file %1",
+        arguments=[
+            InputValue(name="PATH")
+        ],
+        color=color,
+        extensions=["output_string"]
+    )
+)
+def io_readline(context: Context, path: str):
+    file_context: FilePluginContext = context.get_plugin_context(FilePluginContext.__name__)
+    return file_context.get_reader(path).read_line()
+
+
+@pyblock(
+    category=category,
+    definition=PyBlockDefinition(
+        title="At end of file %1",
+        arguments=[
+            InputValue(name="PATH")
+        ],
+        color=color,
+        extensions=["output_boolean"]
+    )
+)
+def io_endoffile(context: Context, path: str):
+    file_context: FilePluginContext = context.get_plugin_context(FilePluginContext.__name__)
+    return file_context.get_reader(path).is_at_end()
+
+
+@pyblock(
+    category=category,
+    definition=PyBlockDefinition(
+        title="Close file %1",
+        arguments=[
+            InputValue(name="PATH")
+        ],
+        has_next_statement=True,
+        has_previous_statement=True,
+        color=color
+    )
+)
+async def io_closefile(context: Context, path: str):
+    file_context: FilePluginContext = context.get_plugin_context(FilePluginContext.__name__)
+    file_context.close(path)
+    await context.next()
+
+
+@pyblock(
+    category=category,
+    definition=PyBlockDefinition(
+        title="Number of lines in file %1",
+        arguments=[
+            InputValue(name="PATH")
+        ],
+        color=color,
+        extensions=["output_number"]
+    )
+)
+def io_linecount(context: Context, path: str):
+    count = 0
+    last_chunk = b""
+    with open(path, "rb") as f:
+        # Counted a megabyte at a time, so the file is never held in memory
+        while chunk := f.read(1 << 20):
+            count += chunk.count(b"\n")
+            last_chunk = chunk
+    if last_chunk != b"" and not last_chunk.endswith(b"\n"):
+        count += 1
+    return count
 
 
 io_blocks = collect_blocks(__name__)
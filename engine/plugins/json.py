@@ -1,14 +1,197 @@
+import functools
+import io
 import json
+import re
+import threading
+from collections import OrderedDict
+from typing import Any, Iterable, Iterator, TextIO
 
 from engine.blocks.block import PyBlockDefinition, pyblock, collect_blocks
 from engine.blocks.fields import Variable
-from engine.blocks.inputs import InputValue
+from engine.blocks.inputs import InputStatement, InputValue
+from engine.executor.block_call import BlockCall
 from engine.executor.context import Context
 from engine.executor.variable_reference import VariableRef
 
 category = "json"
 color = 93
 
+whitespace_pattern = re.compile(r"\s*")
+path_step_pattern = re.compile(r'\.?([^.\[\]"]+)|\[(-?\d+)]|\["((?:[^"\\]|\\.)*)"]')
+
+
+class DocumentCache:
+    """
+    Least recently used cache of parsed JSON documents keyed by their text, so that a document that is read many times
+    is only parsed once. The oldest documents are evicted when there are more than max_documents, or when the cached
+    texts are longer than max_length in total. Documents are shared, so they must not be changed.
+    """
+    documents: OrderedDict[str, Any]
+    max_documents: int
+    max_length: int
+    length: int
+    hits: int
+    misses: int
+
+    def __init__(self, max_documents: int = 16, max_length: int = 64 * 1024 * 1024):
+        self.documents = OrderedDict()
+        self.max_documents = max_documents
+        self.max_length = max_length
+        self.length = 0
+        self.hits = 0
+        self.misses = 0
+        # Sessions run programs on their own threads
+        self.lock = threading.Lock()
+
+    def parse(self, text: str) -> Any:
+        with self.lock:
+            if text in self.documents:
+                self.documents.move_to_end(text)
+                self.hits += 1
+                return self.documents[text]
+            self.misses += 1
+        document = json.loads(text)
+        if len(text) > self.max_length:
+            return document
+        with self.lock:
+            if text not in self.documents:
+                self.documents[text] = document
+                self.length += len(text)
+            while len(self.documents) > self.max_documents or self.length > self.max_length:
+                evicted_text, _ = self.documents.popitem(last=False)
+                self.length -= len(evicted_text)
+        return document
+
+    @property
+    def hit_rate(self) -> float:
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups > 0 else 0.0
+
+    def get_stats(self) -> dict:
+        with self.lock:
+            return {
+                "size": len(self.documents),
+                "maxSize": self.max_documents,
+                "length": self.length,
+                "maxLength": self.max_length,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hitRate": self.hit_rate
+            }
+
+    def clear(self):
+        with self.lock:
+            self.documents.clear()
+            self.length = 0
+            self.hits = 0
+            self.misses = 0
+
+
+document_cache = DocumentCache()
+
+
+@functools.lru_cache(maxsize=256)
+def compile_path(path: str) -> tuple[str | int, ...]:
+    """
+    Splits a path such as a.b[3].c or a["b.c"] into its keys and indices
+    """
+    steps = []
+    position = 0
+    while position < len(path):
+        match = path_step_pattern.match(path, position)
+        if match is None or (position > 0 and match.group(1) is not None and path[position] != "."):
+            raise ValueError(f"Invalid JSON path at {position}: {path}")
+        key, index, quoted_key = match.groups()
+        if index is not None:
+            steps.append(int(index))
+        elif quoted_key is not None:
+            steps.append(json.loads(f'"{quoted_key}"'))
+        else:
+            steps.append(key)
+        position = match.end()
+    return tuple(steps)
+
+
+def get_step(obj: Any, step: str | int) -> Any:
+    if type(obj) == list:
+        return obj[int(step)]
+    return obj[step]
+
+
+class JsonItemReader:
+    """
+    Reads the items of a JSON array, or of newline delimited JSON, one at a time. Only the current item and a chunk of
+    the text after it are held in memory.
+    """
+    reader: TextIO
+    chunk_size: int
+    buffer: str
+    position: int
+    is_at_end: bool
+
+    decoder = json.JSONDecoder()
+    number_characters = "0123456789.eE+-"
+
+    def __init__(self, reader: TextIO, chunk_size: int = 64 * 1024):
+        self.reader = reader
+        self.chunk_size = chunk_size
+        self.buffer = ""
+        self.position = 0
+        self.is_at_end = False
+
+    def read_more(self) -> bool:
+        if self.is_at_end:
+            return False
+        # Reads at least as much as is buffered, so that an item longer than a chunk is not decoded too many times
+        chunk = self.reader.read(max(self.chunk_size, len(self.buffer) - self.position))
+        self.buffer = self.buffer[self.position:] + chunk
+        self.position = 0
+        self.is_at_end = chunk == ""
+        return not self.is_at_end
+
+    def peek(self) -> str:
+        """
+        Skips whitespace and returns the next character, or an empty string at the end of the text
+        """
+        while True:
+            self.position = whitespace_pattern.match(self.buffer, self.position).end()
+            if self.position < len(self.buffer) or not self.read_more():
+                return self.buffer[self.position:self.position + 1]
+
+    def decode(self) -> Any:
+        self.peek()
+        while True:
+            try:
+                item, end = self.decoder.raw_decode(self.buffer, self.position)
+                # A number that is followed by the end of the buffer, or by what could be the rest of the number, may
+                # have been cut off at the end of a chunk
+                is_complete = end < len(self.buffer) and self.buffer[end] not in self.number_characters
+                if is_complete or not self.read_more():
+                    self.position = end
+                    return item
+            except json.JSONDecodeError:
+                if not self.read_more():
+                    raise
+
+    def expect(self, characters: str) -> str:
+        character = self.peek()
+        if character == "" or character not in characters:
+            raise json.JSONDecodeError(f"Expecting one of {characters!r}", self.buffer, self.position)
+        self.position += 1
+        return character
+
+    def __iter__(self) -> Iterator[Any]:
+        if self.peek() == "[":
+            self.position += 1
+            if self.peek() == "]":
+                return
+            while True:
+                yield self.decode()
+                if self.expect(",]") == "]":
+                    return
+        while self.peek() != "":
+            yield self.decode()
+
 
 @pyblock(
     category=category,
@@ -22,7 +205,7 @@ color = 93
     )
 )
 def json_parse(context: Context, string: str):
-    return json.loads(string)
+    return document_cache.parse(string)
 
 @pyblock(
     category=category,
@@ -38,10 +221,28 @@ def json_parse(context: Context, string: str):
 )
 def json_value(context: Context, key: str, obj: dict | list | str):
     if type(obj) == str:
-        obj = json.loads(obj)
-    if type(obj) == list:
-        return obj[int(key)]
-    return obj[key]
+        obj = document_cache.parse(obj)
+    return get_step(obj, key)
+
+
+@pyblock(
+    category=category,
+    definition=PyBlockDefinition(
+        title="Get path %1 from %2",
+        arguments=[
+            InputValue(name="PATH"),
+            InputValue(name="OBJ"),
+        ],
+        color=color,
+        extensions=["output_string"]
+    )
+)
+def json_path(context: Context, path: str, obj: dict | list | str):
+    if type(obj) == str:
+        obj = document_cache.parse(obj)
+    for step in compile_path(str(path)):
+        obj = get_step(obj, step)
+    return obj
 
 @pyblock(
     category=category,
@@ -58,9 +259,58 @@ def json_value(context: Context, key: str, obj: dict | list | str):
 )
 async def json_array_to_list(context: Context, value: list | str, variable_list: VariableRef):
     if type(value) == str:
-        value = json.loads(value)
+        value = document_cache.parse(value)
     context.set_variable(variable_list, list(value))
     await context.next()
 
 
+async def for_each_item(context: Context, items: Iterable, variable: VariableRef, substack: BlockCall):
+    for item in items:
+        context.set_variable(variable, item)
+        await substack()
+
+
+@pyblock(
+    category=category,
+    definition=PyBlockDefinition(
+        title="For each item %1 of JSON array %2\n%3",
+        arguments=[
+            Variable(name="VARIABLE"),
+            InputValue(name="VALUE"),
+            InputStatement(name="SUBSTACK")
+        ],
+        has_next_statement=True,
+        has_previous_statement=True,
+        color=color
+    )
+)
+async def json_foreachitem(context: Context, variable: VariableRef, value: list | tuple | str, substack: BlockCall):
+    # A parsed array (or a list) is iterated as it is, only text is streamed
+    if isinstance(value, (list, tuple)):
+        await for_each_item(context, value, variable, substack)
+    else:
+        await for_each_item(context, JsonItemReader(io.StringIO(str(value))), variable, substack)
+    await context.next()
+
+
+@pyblock(
+    category=category,
+    definition=PyBlockDefinition(
+        title="For each item %1 of JSON array in file %2\n%3",
+        arguments=[
+            Variable(name="VARIABLE"),
+            InputValue(name="PATH"),
+            InputStatement(name="SUBSTACK")
+        ],
+        has_next_statement=True,
+        has_previous_statement=True,
+        color=color
+    )
+)
+async def json_foreachfileitem(context: Context, variable: VariableRef, path: str, substack: BlockCall):
+    with open(path, "r") as f:
+        await for_each_item(context, JsonItemReader(f), variable, substack)
+    await context.next()
+
+
 json_blocks = collect_blocks(__name__)
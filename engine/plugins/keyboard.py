@@ -1,5 +1,4 @@
 import string
-import time
 
 import pyperclip
 from pynput.keyboard import Key, Controller, KeyCode
@@ -40,10 +39,9 @@ def resolve_key(key: str):
 )
 def keyboard_whenkeypressed(context: Context, key_option: str):
     async def listener(topic, message):
-        if topic == "keyboard" and message == key_option:
-            await context.next()
+        await context.next()
 
-    context.listen(listener)
+    context.listen(listener, "keyboard", key_option)
 
 
 @pyblock(
@@ -218,8 +216,8 @@ async def set_clipboard_to(context: Context, text: str):
         extensions=["output_string"]
     )
 )
-def clipboard_value(context: Context):
-    time.sleep(0.05)
+async def clipboard_value(context: Context):
+    await context.sleep(0.05)
     return pyperclip.paste()
 
 
@@ -227,6 +225,8 @@ keyboard_blocks = collect_blocks(__name__)
 
 
 class KeyboardPluginContext:
+    block_types = ("press_key", "release_key")
+
     def __init__(self, executor: Executor):
         self.executor = executor
         self.pressed_keys = set()
@@ -242,6 +242,10 @@ class KeyboardPluginContext:
         keyboard.release(key)
         self.pressed_keys.remove(key)
 
-    def __exit__(self, exc_type, exc_val, exc_tb):
+    def reset(self):
         for key in self.pressed_keys:
             keyboard.release(key)
+        self.pressed_keys.clear()
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.reset()
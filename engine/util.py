@@ -1,3 +1,4 @@
+import builtins
 from xml.etree import ElementTree
 
 block_template_imports = "from blocks.block import pyblock\n\n\n"
@@ -7,6 +8,9 @@ def {name}():
 """
 
 
+reserved_words = frozenset(dir(builtins))
+
+
 def noop(*args, **kwargs):
     pass
 
@@ -15,6 +19,12 @@ async def anoop(*args, **kwargs):
     pass
 
 
+def remove_reserved_words_from_param_name(name: str):
+    if name in reserved_words or name in globals():
+        return f"param_{name}"
+    return name
+
+
 def create_blocks_from_xml(toolbox_path: str):
     toolbox_xml = ElementTree.parse(toolbox_path)
     current_category = "unknown"
@@ -1,7 +1,7 @@
+import functools
 import json
 import logging.config
 import os
-import sys
 from typing import Callable, ContextManager
 
 import uvicorn
@@ -13,10 +13,17 @@ from starlette.staticfiles import StaticFiles
 from engine.blocks.block import get_block_definition
 from engine.blocks.core_plugin import CorePluginContext
 from engine.blocks.default import default_blocks
+from engine.blocks.registry import BlockRegistry
+from engine.executor.async_task_loop import AsyncioExecutorTaskStack
 from engine.executor.executor import Executor
+from engine.executor.process_pool import ExecutorProcessPool
+from engine.executor.session import ExecutorSession
+from engine.executor.task_loop import ExecutorTaskStack
+from engine.executor.tracer import ExecutionTracer
+from engine.executor.variables.variable_handler import VariableHandler
 from engine.plugins.gui import gui_blocks, GuiPluginContext
-from engine.plugins.io import io_blocks
-from engine.plugins.json import json_blocks
+from engine.plugins.io import io_blocks, FilePluginContext
+from engine.plugins.json import json_blocks, document_cache
 from engine.plugins.keyboard import keyboard_blocks, KeyboardPluginContext
 from engine.plugins.numbers import numbers_blocks
 from engine.plugins.strings import strings_blocks
@@ -26,7 +33,11 @@ print(os.path.abspath(logging_config_file or "logging.conf"))
 logging.config.fileConfig(fname=logging_config_file, disable_existing_loggers=False)
 logger = logging.getLogger()
 
-sys.setrecursionlimit(2**16)
+task_stack_types = {
+    "thread": ExecutorTaskStack,
+    "asyncio": AsyncioExecutorTaskStack
+}
+task_stack_type = task_stack_types[os.environ['PYBLOCK_SCHEDULER'] if 'PYBLOCK_SCHEDULER' in os.environ else 'thread']
 
 loaded_blocks = [
     *default_blocks,
@@ -38,12 +49,49 @@ loaded_blocks = [
     *json_blocks
 ]
 
+loaded_variable_handlers: list[Callable[[], VariableHandler]] = []
+
+# Array blocks need NumPy, which is optional
+try:
+    from engine.plugins.arrays import arrays_blocks, ArrayVariableHandler
+    loaded_blocks.extend(arrays_blocks)
+    loaded_variable_handlers.append(ArrayVariableHandler)
+except ImportError as e:
+    logger.warning("Array blocks are not available: %s", e)
+
+block_registry = BlockRegistry(loaded_blocks)
+
 loaded_plugin_contexts: list[Callable[['Executor'], ContextManager]] = [
     GuiPluginContext,
     CorePluginContext,
-    KeyboardPluginContext
+    KeyboardPluginContext,
+    FilePluginContext
 ]
 
+
+# Number of block executions kept for the "trace" message, tracing is disabled when it is 0
+trace_size = int(os.environ['PYBLOCK_TRACE_SIZE']) if 'PYBLOCK_TRACE_SIZE' in os.environ else 0
+
+
+def create_executor(executor_task_stack_type: type = task_stack_type) -> Executor:
+    tracer = ExecutionTracer(trace_size) if trace_size > 0 else None
+    executor = Executor(task_stack_type=executor_task_stack_type, block_registry=block_registry, tracer=tracer)
+    for plugin_context in loaded_plugin_contexts:
+        executor.add_plugin_context(plugin_context)
+    for variable_handler in loaded_variable_handlers:
+        executor.add_variable_handler(variable_handler())
+    executor.add_cache("document", document_cache)
+    return executor
+
+
+# Sessions run in a pool of worker processes when a pool size is set, and in the server process otherwise
+process_pool_size = int(os.environ['PYBLOCK_PROCESS_POOL_SIZE']) if 'PYBLOCK_PROCESS_POOL_SIZE' in os.environ else 0
+process_pool_max_sessions = int(os.environ['PYBLOCK_PROCESS_POOL_MAX_SESSIONS']) \
+    if 'PYBLOCK_PROCESS_POOL_MAX_SESSIONS' in os.environ else 100
+# Worker processes have no event loop to schedule tasks on
+process_pool = ExecutorProcessPool(functools.partial(create_executor, ExecutorTaskStack), process_pool_size,
+                                   process_pool_max_sessions) if process_pool_size > 0 else None
+
 app = FastAPI()
 origins = [
     "http://localhost",
@@ -84,57 +132,23 @@ async def blocks():
 @app.websocket("/executor")
 async def ws(websocket: WebSocket):
     await websocket.accept()
-    executor = Executor()
-    executor.load_blocks(loaded_blocks)
-    for plugin_context in loaded_plugin_contexts:
-        executor.add_plugin_context(plugin_context)
-
-    broadcast_list = []
+    if process_pool is not None:
+        session = await process_pool.open_session()
+    else:
+        session = ExecutorSession(create_executor())
 
-    def broadcast_listener(topic, message):
-        broadcast_list.append([topic, message])
-
-    executor.add_global_broadcast_listener(broadcast_listener)
-
-    def get_status():
-        nonlocal broadcast_list
-        obj = {
-            "type": "status",
-            "variables": executor.get_variables(),
-            "isRunning": not executor.is_complete(),
-            "taskCount": executor.get_task_count(),
-            "highlights": list(executor.get_highlights()),
-            "broadcasts": broadcast_list
-        }
-        broadcast_list = []
-        return obj
+    async def handle(message: dict):
+        if process_pool is not None:
+            return await session.handle(message)
+        return session.handle(message)
 
     try:
         async for data_json in websocket.iter_json():
-            message_type = data_json["type"]
             try:
-                if message_type == "program":
-                    executor.load_program(data_json["value"])
-                if message_type == "start":
-                    if "isEager" in data_json:
-                        executor.start(data_json["isEager"])
-                    else:
-                        executor.start()
-                    await websocket.send_json(get_status())
-                if message_type == "complete":
-                    executor.complete()
-                    await websocket.send_json(get_status())
-                if message_type == "stop":
-                    executor.stop()
-                    await websocket.send_json(get_status())
-                if message_type == "step":
-                    executor.step()
-                    await websocket.send_json(get_status())
-                if message_type == "status":
-                    await websocket.send_json(get_status())
-                if message_type == "exit":
-                    logger.debug("Closing executor socket...")
-                    executor.stop()
+                status = await handle(data_json)
+                if status is not None:
+                    await websocket.send_json(status)
+                if data_json["type"] == "exit":
                     break
                 await websocket.send_text(json.dumps({
                     "type": "log",
@@ -150,7 +164,16 @@ async def ws(websocket: WebSocket):
     except Exception as e:
         logger.error("Websocket closed unexpectedly", exc_info=e)
     finally:
-        executor.stop()
+        if process_pool is not None:
+            await session.close()
+        else:
+            session.close()
+
+
+@app.on_event("shutdown")
+def shutdown():
+    if process_pool is not None:
+        process_pool.shutdown()
 
 
 if __name__ == "__main__":
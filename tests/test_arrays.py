@@ -0,0 +1,137 @@
+import json
+import unittest
+
+from engine.blocks.default import default_blocks
+from engine.blocks.registry import BlockRegistry
+from engine.executor.executor import Executor
+
+try:
+    import numpy
+    from engine.plugins.arrays import ArrayVariableHandler, arrays_blocks
+except ImportError:
+    arrays_blocks = None
+
+array_field = '<field name="ARRAY" id="numbers" variabletype="array">numbers</field>'
+source_field = '<field name="ARRAY" id="source" variabletype="array">source</field>'
+
+
+def number(name: str, value: float) -> str:
+    return f'<value name="{name}"><shadow type="math_number"><field name="NUM">{value}</field></shadow></value>'
+
+
+def source(name: str) -> str:
+    return f'<value name="{name}"><block type="array_contents">{source_field}</block></value>'
+
+
+def create_program(*statements: str) -> str:
+    chain = ""
+    for statement in reversed(statements):
+        chain = statement[:-len("</block>")] + (f"<next>{chain}</next>" if chain else "") + "</block>"
+    return f"""
+    <xml>
+        <variables>
+            <variable type="array" id="numbers">numbers</variable>
+            <variable type="array" id="source">source</variable>
+            <variable type="list" id="items">items</variable>
+            <variable type="" id="result">result</variable>
+        </variables>
+        <block type="event_whenflagclicked" id="hat"><next>{chain}</next></block>
+    </xml>
+    """
+
+
+fill_source = f'<block type="array_range">{source_field}{number("START", 0)}{number("STOP", 5)}</block>'
+
+
+@unittest.skipIf(arrays_blocks is None, "NumPy is not installed")
+class ArrayTests(unittest.TestCase):
+    def create_executor(self) -> Executor:
+        executor = Executor(block_registry=BlockRegistry([*default_blocks, *arrays_blocks]))
+        executor.add_variable_handler(ArrayVariableHandler())
+        self.errors = []
+        executor.add_global_broadcast_listener(lambda topic, message: self.errors.append(message), "error")
+        return executor
+
+    def run_program(self, *statements: str) -> dict:
+        executor = self.create_executor()
+        executor.load_program(create_program(fill_source, *statements))
+        executor.start(is_eager=True)
+        executor.task_stack.wait_until_complete()
+        executor.stop()
+        return {variable["name"]: variable["value"] for variable in executor.get_variables()}
+
+    def test_statistics(self):
+        for statistic, expected in [("sum", 10), ("mean", 2), ("min", 0), ("max", 4)]:
+            variables = self.run_program(
+                '<block type="data_setvariableto"><field name="VARIABLE" id="result" variabletype="">result</field>'
+                f'<value name="VALUE"><block type="array_statistic"><field name="STATISTIC">{statistic}</field>'
+                f'{source("ARRAY")}</block></value></block>'
+            )
+            self.assertEqual(expected, variables["result"])
+
+    def test_arithmetic(self):
+        variables = self.run_program(
+            f'<block type="array_arithmetic">{array_field}{source("LEFT")}<field name="OPERATOR">*</field>'
+            f'{source("RIGHT")}</block>'
+        )
+        self.assertEqual([0, 1, 4, 9, 16], variables["numbers"])
+        variables = self.run_program(
+            f'<block type="array_arithmetic">{array_field}{source("LEFT")}<field name="OPERATOR">-</field>'
+            f'{number("RIGHT", 1)}</block>'
+        )
+        self.assertEqual([-1, 0, 1, 2, 3], variables["numbers"])
+
+    def test_division_by_zero_is_an_error(self):
+        variables = self.run_program(
+            f'<block type="array_arithmetic">{array_field}{number("LEFT", 1)}<field name="OPERATOR">/</field>'
+            f'{source("RIGHT")}</block>'
+        )
+        self.assertEqual([], variables["numbers"])
+        self.assertEqual(1, len(self.errors))
+        self.assertTrue(self.errors[0].startswith("FloatingPointError"))
+
+    def test_mean_of_empty_array_is_an_error(self):
+        self.run_program(
+            '<block type="data_setvariableto"><field name="VARIABLE" id="result" variabletype="">result</field>'
+            '<value name="VALUE"><block type="array_statistic"><field name="STATISTIC">mean</field>'
+            '<value name="ARRAY"><block type="array_contents">'
+            f'{array_field}</block></value></block></value></block>'
+        )
+        self.assertEqual(["ValueError: The mean of an empty array is undefined"], self.errors)
+
+    def test_status_of_non_finite_numbers_is_valid_json(self):
+        executor = self.create_executor()
+        executor.load_program(create_program(fill_source))
+        executor.load_variables()
+        numbers = executor.compiled_program.variables.slots[0]
+        executor.set_variable(numbers, numpy.array([1.0, numpy.inf, -numpy.inf, numpy.nan]))
+        status = json.loads(json.dumps(executor.get_variables(), allow_nan=False))
+        self.assertEqual([1.0, None, None, None], status[0]["value"])
+
+    def test_cumulative_sum_sort_and_filter(self):
+        variables = self.run_program(f'<block type="array_cumulativesum">{array_field}{source("SOURCE")}</block>')
+        self.assertEqual([0, 1, 3, 6, 10], variables["numbers"])
+        variables = self.run_program(
+            f'<block type="array_arithmetic">{array_field}{number("LEFT", 0)}<field name="OPERATOR">-</field>'
+            f'{source("RIGHT")}</block>',
+            f'<block type="array_sort">{array_field}</block>'
+        )
+        self.assertEqual([-4, -3, -2, -1, 0], variables["numbers"])
+        variables = self.run_program(
+            f'<block type="array_filter">{array_field}{source("SOURCE")}<field name="OPERATOR">&gt;</field>'
+            f'{number("VALUE", 2)}</block>'
+        )
+        self.assertEqual([3, 4], variables["numbers"])
+
+    def test_lists(self):
+        items_field = '<field name="LIST" id="items" variabletype="list">items</field>'
+        variables = self.run_program(
+            f'<block type="array_tolist">{items_field}{source_field}</block>',
+            f'<block type="array_fromlist">{array_field}{items_field}</block>'
+        )
+        self.assertEqual([0, 1, 2, 3, 4], variables["items"])
+        self.assertEqual([0, 1, 2, 3, 4], variables["numbers"])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,86 @@
+import asyncio
+import unittest
+
+from engine.blocks.block import pyblock
+from engine.executor.async_task_loop import AsyncioExecutorTaskStack
+from engine.executor.context import Context
+from engine.executor.executor import Executor
+
+
+@pyblock(category="test")
+async def sleep_asyncio(context: Context):
+    await asyncio.sleep(0.01)
+    await context.next()
+
+
+def set_variable_block(block_id: str, value: str, next_block: str = ""):
+    return f"""
+    <block type="data_setvariableto" id="{block_id}">
+        <field name="VARIABLE" id="var" variabletype="">var</field>
+        <value name="VALUE"><shadow type="text"><field name="TEXT">{value}</field></shadow></value>
+        {f"<next>{next_block}</next>" if next_block else ""}
+    </block>
+    """
+
+
+def create_program(script: str):
+    return f"""
+    <xml>
+        <variables><variable type="" id="var">var</variable></variables>
+        <block type="event_whenflagclicked" id="hat"><next>{script}</next></block>
+    </xml>
+    """
+
+
+async def wait_until_idle(executor: Executor):
+    for _ in range(1000):
+        if executor.get_task_count() == 0:
+            return
+        await asyncio.sleep(0.001)
+    raise TimeoutError("Executor did not finish")
+
+
+class AsyncioTaskStackTests(unittest.IsolatedAsyncioTestCase):
+    def create_executor(self, script: str):
+        executor = Executor(task_stack_type=AsyncioExecutorTaskStack)
+        executor.load_blocks([sleep_asyncio])
+        executor.load_program(create_program(script))
+        self.addCleanup(executor.stop)
+        return executor
+
+    async def test_step_program(self):
+        executor = self.create_executor(set_variable_block("first", "1", set_variable_block("second", "2")))
+        executor.start()
+        await asyncio.sleep(0.01)
+        self.assertEqual({"first"}, executor.get_highlights())
+        self.assertEqual(0, executor.get_variables()[0]["value"])
+
+        executor.step()
+        await asyncio.sleep(0.01)
+        self.assertEqual({"second"}, executor.get_highlights())
+        self.assertEqual("1", executor.get_variables()[0]["value"])
+
+        executor.step()
+        await wait_until_idle(executor)
+        self.assertEqual(set(), executor.get_highlights())
+        self.assertEqual("2", executor.get_variables()[0]["value"])
+
+    async def test_complete_program_awaiting_asyncio(self):
+        executor = self.create_executor(set_variable_block(
+            "first", "1", '<block type="sleep_asyncio" id="sleep">' +
+                          f'<next>{set_variable_block("second", "2")}</next></block>'))
+        executor.start()
+        executor.complete()
+        await wait_until_idle(executor)
+        self.assertEqual("2", executor.get_variables()[0]["value"])
+
+    async def test_eager_program_does_not_block_event_loop(self):
+        executor = self.create_executor('<block type="control_forever" id="forever"><statement name="SUBSTACK">' +
+                                        set_variable_block("set", "1") + '</statement></block>')
+        executor.start(is_eager=True)
+        # The loop is only free to run this coroutine if the forever loop yields
+        await asyncio.sleep(0.05)
+        self.assertEqual(1, executor.get_task_count())
+        executor.stop()
+        await asyncio.sleep(0.01)
+        self.assertEqual(0, executor.get_task_count())
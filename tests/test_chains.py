@@ -0,0 +1,33 @@
+import sys
+import unittest
+
+from benchmarks.generator import ProgramShape, generate_program
+from engine.executor.executor import Executor
+from engine.executor.profiler import BlockProfiler
+
+
+class ChainTests(unittest.TestCase):
+    chain_length = 3000
+
+    def run_chain(self, executor: Executor):
+        self.assertGreater(self.chain_length, sys.getrecursionlimit())
+        executor.load_program(generate_program(ProgramShape(scripts=1, chain_length=self.chain_length, loop_depth=0)))
+        executor.start(is_eager=True)
+        executor.task_stack.wait_until_complete()
+        executor.stop()
+        counter = next(variable for variable in executor.get_variables() if variable["id"] == "counter-0")
+        self.assertEqual(self.chain_length / 2, counter["value"])
+
+    def test_chain_longer_than_recursion_limit(self):
+        self.run_chain(Executor())
+
+    def test_profiled_chain_longer_than_recursion_limit(self):
+        executor = Executor(profiler=BlockProfiler())
+        self.run_chain(executor)
+        # Every block of the chain is exited once the chain has finished
+        self.assertIsNone(executor.profiler.current)
+        self.assertTrue(all(stats.active == 0 for stats in executor.profiler.stats.values()))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,58 @@
+import unittest
+
+from engine.executor.executor import Executor
+from engine.executor.program import ArgumentKind
+from engine.executor.variable_reference import VariableRef
+
+
+class CompilerTests(unittest.TestCase):
+    def test_compile_simple_2_program(self):
+        executor = Executor()
+        with open("./programs/simple_2.xml") as f:
+            executor.load_program(f.read())
+        program = executor.compiled_program
+        self.assertEqual(["event_whenflagclicked"], [b.type for b in program.starting_blocks])
+        set_variable = program.starting_blocks[0].next
+        self.assertEqual("data_setvariableto", set_variable.type)
+        self.assertEqual("control_if_else", set_variable.next.type)
+        arguments = {slot.name: slot for slot in set_variable.arguments}
+        self.assertEqual(ArgumentKind.VARIABLE_REF, arguments["variable"].kind)
+        self.assertEqual(ArgumentKind.CONSTANT, arguments["value"].kind)
+        self.assertEqual("10", arguments["value"].value)
+        # Loose scripts cannot run, so they are not compiled
+        self.assertNotIn("SCK^h!Em|hDcX};k.5x(", [b.id for b in program.blocks])
+
+    def test_lazy_values_are_not_immediate(self):
+        executor = Executor()
+        executor.load_program("""
+        <xml>
+            <block type="event_whenflagclicked" id="start">
+                <next>
+                    <block type="control_repeat_until" id="loop">
+                        <value name="CONDITION">
+                            <block type="operator_not" id="not">
+                                <value name="OPERAND"><shadow type="text"><field name="TEXT"></field></shadow></value>
+                            </block>
+                        </value>
+                    </block>
+                </next>
+            </block>
+        </xml>
+        """)
+        repeat_until = executor.compiled_program.starting_blocks[0].next
+        arguments = {slot.name: slot for slot in repeat_until.arguments}
+        self.assertEqual(ArgumentKind.BLOCK, arguments["condition"].kind)
+        self.assertFalse(arguments["condition"].is_immediate)
+
+    def test_variables_are_assigned_slots(self):
+        executor = Executor()
+        with open("./programs/simple_2.xml") as f:
+            executor.load_program(f.read())
+        layout = executor.compiled_program.variables
+        self.assertEqual(["test", "message1", "doThing", "doOtherThing"], list(layout.names))
+        self.assertEqual(list(range(len(layout))), [slot.index for slot in layout.slots])
+        set_variable = executor.compiled_program.starting_blocks[0].next
+        variable = {slot.name: slot for slot in set_variable.arguments}["variable"].value
+        self.assertIs(layout.slots[0], variable)
+        self.assertEqual(0, layout.indices[VariableRef(variable.type, variable.id)])
+        self.assertEqual([], executor.get_variables())
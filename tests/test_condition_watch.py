@@ -0,0 +1,97 @@
+import time
+import unittest
+
+from engine.executor.executor import Executor
+from engine.executor.profiler import BlockProfiler
+from engine.executor.variable_reference import VariableRef
+
+wait_until_program = """
+<xml>
+    <variables>
+        <variable type="" id="flag">flag</variable>
+        <variable type="" id="other">other</variable>
+        <variable type="" id="done">done</variable>
+    </variables>
+    <block type="event_whenflagclicked" id="hat">
+        <next>
+            <block type="control_wait_until" id="wait">
+                <value name="CONDITION">
+                    <block type="operator_equals" id="equals">
+                        <value name="OPERAND1">
+                            <block type="data_variable" id="read-flag">
+                                <field name="VARIABLE" id="flag" variabletype="">flag</field>
+                            </block>
+                        </value>
+                        <value name="OPERAND2"><shadow type="text"><field name="TEXT">go</field></shadow></value>
+                    </block>
+                </value>
+                <next>
+                    <block type="data_setvariableto" id="finish">
+                        <field name="VARIABLE" id="done" variabletype="">done</field>
+                        <value name="VALUE"><shadow type="text"><field name="TEXT">yes</field></shadow></value>
+                    </block>
+                </next>
+            </block>
+        </next>
+    </block>
+</xml>
+"""
+
+
+class ConditionWatchTests(unittest.TestCase):
+    def setUp(self):
+        self.executor = Executor(profiler=BlockProfiler())
+        self.executor.load_program(wait_until_program)
+        self.addCleanup(self.executor.stop)
+
+    def get_evaluations(self):
+        return {stats["id"]: stats["calls"] for stats in self.executor.profiler.get_block_stats()}["equals"]
+
+    def get_variable(self, name: str):
+        return {variable["name"]: variable["value"] for variable in self.executor.get_variables()}[name]
+
+    def wait_for_scheduler(self):
+        # Parked blocks are resumed by the scheduler thread
+        time.sleep(0.05)
+
+    def test_condition_is_only_evaluated_when_its_variables_change(self):
+        self.executor.start(is_eager=True)
+        self.wait_for_scheduler()
+        self.assertEqual(1, self.get_evaluations())
+        self.assertEqual(1, self.executor.get_task_count())
+
+        self.executor.set_variable(VariableRef("", "other"), "go")
+        self.wait_for_scheduler()
+        self.assertEqual(1, self.get_evaluations())
+
+        self.executor.set_variable(VariableRef("", "flag"), "wait")
+        self.wait_for_scheduler()
+        self.assertEqual(2, self.get_evaluations())
+        self.assertEqual(1, self.executor.get_task_count())
+
+        self.executor.set_variable(VariableRef("", "flag"), "go")
+        self.wait_for_scheduler()
+        self.assertEqual(3, self.get_evaluations())
+        self.assertEqual("yes", self.get_variable("done"))
+        self.assertEqual(0, self.executor.get_task_count())
+
+    def test_stop_closes_waiting_blocks(self):
+        self.executor.start(is_eager=True)
+        self.wait_for_scheduler()
+        self.executor.stop()
+        self.assertEqual(0, self.executor.get_task_count())
+        self.assertEqual(0, len(self.executor.variable_store.watchers))
+
+    def test_conditions_with_blocks_that_are_not_pure_are_not_watched(self):
+        wait = self.executor.compiled_program.starting_blocks[0].next
+        condition = wait.arguments[0].value
+        flag = self.executor.compiled_program.variables.slots[0]
+        self.assertEqual((flag,), condition.get_read_variables())
+        random_program = wait_until_program.replace('type="data_variable"', 'type="operator_random"')
+        self.executor.load_program(random_program)
+        condition = self.executor.compiled_program.starting_blocks[0].next.arguments[0].value
+        self.assertIsNone(condition.get_read_variables())
+
+
+if __name__ == '__main__':
+    unittest.main()
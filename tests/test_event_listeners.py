@@ -0,0 +1,29 @@
+import unittest
+
+from engine.executor.event_listeners import EventListeners
+
+
+class EventListenersTests(unittest.TestCase):
+    def test_listeners_match_by_key_and_wildcard(self):
+        listeners = EventListeners()
+        exact = lambda topic, message: "exact"
+        any_message = lambda topic, message: "any message"
+        any_topic = lambda topic, message: "any topic"
+        anything = lambda topic, message: "anything"
+        listeners.add(exact, "broadcast", "go")
+        listeners.add(any_message, "broadcast")
+        listeners.add(any_topic, message="go")
+        listeners.add(anything)
+
+        self.assertEqual((exact, any_message, any_topic, anything), listeners.get_listeners("broadcast", "go"))
+        self.assertEqual((any_message, anything), listeners.get_listeners("broadcast", "stop"))
+        self.assertEqual((any_topic, anything), listeners.get_listeners("keyboard", "go"))
+        self.assertEqual((anything,), listeners.get_listeners("variable", "change"))
+        self.assertEqual(4, len(listeners))
+
+    def test_clear(self):
+        listeners = EventListeners()
+        listeners.add(lambda topic, message: None, "broadcast", "go")
+        listeners.clear()
+        self.assertEqual((), listeners.get_listeners("broadcast", "go"))
+        self.assertEqual(0, len(listeners))
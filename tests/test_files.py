@@ -0,0 +1,98 @@
+import os
+import tempfile
+import unittest
+
+from engine.blocks.default import default_blocks
+from engine.blocks.registry import BlockRegistry
+from engine.executor.executor import Executor
+from engine.executor.variable_reference import VariableRef
+from engine.plugins.io import FilePluginContext, io_blocks
+
+block_registry = BlockRegistry([*default_blocks, *io_blocks])
+lines_field = '<field name="LIST" id="lines" variabletype="list">lines</field>'
+count_field = '<field name="VARIABLE" id="count" variabletype="">count</field>'
+line_field = '<field name="VARIABLE" id="line" variabletype="">line</field>'
+
+
+def add_to_lines(item: str) -> str:
+    return f'<block type="data_addtolist">{lines_field}<value name="ITEM">{item}</value></block>'
+
+
+def create_program(body: str) -> str:
+    return f"""
+    <xml>
+        <variables>
+            <variable type="list" id="lines">lines</variable>
+            <variable type="" id="count">count</variable>
+            <variable type="" id="line">line</variable>
+        </variables>
+        <block type="event_whenflagclicked" id="hat"><next>{body}</next></block>
+    </xml>
+    """
+
+
+class FileTests(unittest.TestCase):
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.path = os.path.join(directory.name, "lines.txt")
+        self.write("first\nsecond\r\n\nlast")
+        self.path_value = f'<shadow type="text"><field name="TEXT">{self.path}</field></shadow>'
+
+    def write(self, content: str):
+        with open(self.path, "w", newline="") as file:
+            file.write(content)
+
+    def run_program(self, body: str) -> Executor:
+        executor = Executor(block_registry=block_registry)
+        executor.add_plugin_context(FilePluginContext)
+        self.addCleanup(executor.close)
+        executor.load_program(create_program(body))
+        executor.start(is_eager=True)
+        executor.task_stack.wait_until_complete()
+        return executor
+
+    def test_for_each_line(self):
+        line = f'<block type="data_variable">{line_field}</block>'
+        executor = self.run_program(
+            f'<block type="io_foreachline">{line_field}<value name="PATH">{self.path_value}</value>'
+            f'<statement name="SUBSTACK">{add_to_lines(line)}</statement></block>'
+        )
+        self.assertEqual(["first", "second", "", "last"], executor.get_variable(VariableRef("list", "lines")))
+
+    def test_read_next_line(self):
+        path = f'<value name="PATH">{self.path_value}</value>'
+        read_line = add_to_lines(f'<block type="io_readline">{path}</block>')
+        executor = self.run_program(
+            f'<block type="io_openfile">{path}<next>'
+            f'<block type="control_repeat_until"><value name="CONDITION"><block type="operator_not">'
+            f'<value name="OPERAND"><block type="io_endoffile">{path}</block></value></block></value>'
+            f'<statement name="SUBSTACK">{read_line}</statement></block>'
+            f'</next></block>'
+        )
+        self.assertEqual(["first", "second", "", "last"], executor.get_variable(VariableRef("list", "lines")))
+        file_context = executor.get_plugin_context(FilePluginContext.__name__)
+        self.assertTrue(file_context.readers[self.path].is_at_end())
+        self.assertEqual("", file_context.readers[self.path].read_line())
+        executor.stop()
+        self.assertEqual({}, file_context.readers)
+
+    def test_line_count(self):
+        set_count = f'<block type="data_setvariableto">{count_field}<value name="VALUE">' \
+                    f'<block type="io_linecount"><value name="PATH">{self.path_value}</value></block></value></block>'
+        for content, expected in [("first\nsecond\r\n\nlast", 4), ("a\nb\n", 2), ("", 0)]:
+            self.write(content)
+            executor = self.run_program(set_count)
+            self.assertEqual(expected, executor.get_variable(VariableRef("", "count")))
+
+    def test_read_file(self):
+        self.write("first\nsecond\n")
+        executor = self.run_program(
+            f'<block type="data_setvariableto">{line_field}<value name="VALUE">'
+            f'<block type="io_readfile"><value name="PATH">{self.path_value}</value></block></value></block>'
+        )
+        self.assertEqual("first\nsecond\n", executor.get_variable(VariableRef("", "line")))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,24 @@
+import unittest
+
+from benchmarks.generator import ProgramShape, generate_program
+from engine.executor.executor import Executor
+
+
+class GeneratorTests(unittest.TestCase):
+    def test_generated_program_runs(self):
+        shape = ProgramShape(scripts=2, chain_length=4, loop_depth=2, loop_iterations=3, list_size=5, broadcast_hats=1)
+        executor = Executor()
+        executor.load_program(generate_program(shape))
+        self.assertEqual(shape.scripts + shape.broadcast_hats, len(executor.compiled_program.starting_blocks))
+        executor.start(is_eager=True)
+        executor.task_stack.wait_until_complete()
+        executor.stop()
+        variables = {variable["name"]: variable["value"] for variable in executor.get_variables()}
+        # Half of each chain increments the counter, once per iteration of every loop
+        self.assertEqual(2 * 3 ** 2, float(variables["counter-0"]))
+        self.assertEqual(5, len(variables["list-1"]))
+        self.assertEqual(2, float(variables["received-0"]))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,159 @@
+import itertools
+import queue
+import select
+import threading
+import tkinter
+import unittest
+
+from engine.executor.executor import Executor
+from engine.plugins.gui import GuiPluginContext
+
+
+class ManualRoot:
+    """
+    Stands in for tk.Tk, running `after` callbacks and handlers of readable files when the test advances the clock
+    """
+
+    def __init__(self):
+        self.now = 0
+        self.timers = {}
+        self.timer_ids = itertools.count()
+        self.file_handlers = {}
+
+    @property
+    def tk(self):
+        return self
+
+    def createfilehandler(self, file: int, mask: int, callback):
+        self.file_handlers[file] = callback
+
+    def deletefilehandler(self, file: int):
+        del self.file_handlers[file]
+
+    def run_file_handlers(self):
+        if len(self.file_handlers) == 0:
+            return
+        readable, _, _ = select.select(list(self.file_handlers), [], [], 0)
+        for file in readable:
+            self.file_handlers[file](file, tkinter.READABLE)
+
+    def after(self, delay_ms: int, callback) -> str:
+        timer = f"after#{next(self.timer_ids)}"
+        self.timers[timer] = (self.now + delay_ms, callback)
+        return timer
+
+    def after_cancel(self, timer: str):
+        del self.timers[timer]
+
+    def advance(self, duration_ms: int):
+        end = self.now + duration_ms
+        self.run_file_handlers()
+        while True:
+            due = [(at, timer) for timer, (at, _) in self.timers.items() if at <= end]
+            if len(due) == 0:
+                break
+            at, timer = min(due)
+            self.now = at
+            _, callback = self.timers.pop(timer)
+            callback()
+            self.run_file_handlers()
+        self.now = end
+
+
+class WidgetValue:
+    pass
+
+
+class GuiQueueTests(unittest.TestCase):
+    def setUp(self):
+        self.gui_context = GuiPluginContext(Executor())
+        self.gui_context.in_queue = queue.Queue()
+        self.gui_context.pending_variable_updates = {}
+        self.gui_context.variable_update_timers = {}
+        self.gui_context.root = self.root = ManualRoot()
+        self.gui_context.open_wake()
+
+    def tearDown(self):
+        self.gui_context.close_wake()
+
+    def test_queued_commands_run_once_woken(self):
+        calls = []
+        for i in range(50):
+            self.gui_context.post(lambda i=i: calls.append(i))
+        self.root.advance(0)
+        self.assertEqual(list(range(50)), calls)
+        # Nothing polls the queue while it is empty
+        self.assertEqual({}, self.root.timers)
+
+    def test_queue_is_not_polled(self):
+        calls = []
+        self.gui_context.in_queue.put(lambda: calls.append("queued"))
+        self.root.advance(10_000)
+        self.assertEqual([], calls)
+        self.gui_context.wake()
+        self.root.advance(0)
+        self.assertEqual(["queued"], calls)
+
+    def test_failed_command_does_not_stop_the_queue(self):
+        calls = []
+        self.gui_context.post(lambda: 1 / 0)
+        self.gui_context.post(lambda: calls.append("after"))
+        with self.assertLogs(GuiPluginContext.logger, "ERROR"):
+            self.root.advance(0)
+        self.assertEqual(["after"], calls)
+
+    def test_closed_wake_stops_watching_the_pipe(self):
+        self.gui_context.close_wake()
+        self.assertEqual({}, self.root.file_handlers)
+        # Commands queued after the window has closed are dropped
+        self.gui_context.post(lambda: None)
+
+    def test_tcl_event_loop_is_woken(self):
+        done = threading.Event()
+        started = threading.Event()
+        gui_context = GuiPluginContext(Executor())
+        gui_context.in_queue = queue.Queue()
+
+        def run_tcl():
+            gui_context.root = tkinter.Tcl()
+            gui_context.open_wake()
+            started.set()
+            while not done.is_set():
+                gui_context.root.tk.dooneevent()
+            gui_context.close_wake()
+            # Tcl must delete the interpreter on the thread that created it
+            gui_context.root = None
+
+        thread = threading.Thread(target=run_tcl)
+        thread.start()
+        started.wait()
+        gui_context.post(done.set)
+        thread.join(5)
+        self.assertFalse(thread.is_alive())
+
+    def test_widget_changes_are_coalesced(self):
+        updates = []
+        widget_value = WidgetValue()
+        for value in ["a", "ab", "abc"]:
+            self.gui_context.update_variable(widget_value, updates.append, value)
+            self.root.advance(GuiPluginContext.variable_update_delay_ms - 1)
+        self.assertEqual([], updates)
+        self.root.advance(1)
+        self.assertEqual(["abc"], updates)
+
+    def test_widgets_are_debounced_separately(self):
+        updates = []
+        typed, clicked = WidgetValue(), WidgetValue()
+        self.gui_context.update_variable(clicked, lambda value: updates.append(("clicked", value)), "true")
+        # Typing in one textfield does not hold back the checkbox
+        for i in range(10):
+            self.gui_context.update_variable(typed, lambda value: updates.append(("typed", value)), "a" * i)
+            self.root.advance(50)
+        self.assertEqual([("clicked", "true")], updates)
+        self.root.advance(GuiPluginContext.variable_update_delay_ms)
+        self.assertEqual([("clicked", "true"), ("typed", "a" * 9)], updates)
+        self.assertEqual({}, self.gui_context.variable_update_timers)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,161 @@
+import io
+import json
+import os
+import random
+import tempfile
+import unittest
+
+from engine.blocks.default import default_blocks
+from engine.blocks.registry import BlockRegistry
+from engine.executor.executor import Executor
+from engine.executor.session import ExecutorSession
+from engine.executor.variable_reference import VariableRef
+from engine.plugins import json as json_plugin
+from engine.plugins.json import DocumentCache, JsonItemReader, compile_path
+
+
+class DocumentCacheTests(unittest.TestCase):
+    def test_documents_are_parsed_once(self):
+        cache = DocumentCache()
+        first = cache.parse('{"a": [1, 2]}')
+        self.assertIs(first, cache.parse('{"a": [1, 2]}'))
+        self.assertEqual((1, 1), (cache.hits, cache.misses))
+        self.assertEqual({"size": 1, "maxSize": 16, "length": 13, "maxLength": 64 * 1024 * 1024, "hits": 1,
+                          "misses": 1, "hitRate": 0.5}, cache.get_stats())
+
+    def test_stats_message_reports_hit_rate(self):
+        cache = DocumentCache()
+        executor = Executor()
+        executor.add_cache("document", cache)
+        session = ExecutorSession(executor)
+        self.addCleanup(session.close)
+        for _ in range(3):
+            cache.parse("[1]")
+        self.assertEqual(2 / 3, session.handle({"type": "stats"})["caches"]["document"]["hitRate"])
+
+    def test_least_recently_used_documents_are_evicted(self):
+        cache = DocumentCache(max_documents=2)
+        cache.parse("1")
+        cache.parse("2")
+        cache.parse("1")
+        cache.parse("3")
+        self.assertEqual(["1", "3"], list(cache.documents))
+
+    def test_documents_are_evicted_by_length(self):
+        cache = DocumentCache(max_length=10)
+        cache.parse('"abcd"')
+        cache.parse('"efgh"')
+        self.assertEqual(['"efgh"'], list(cache.documents))
+        self.assertEqual(6, cache.length)
+        cache.parse('"longer than ten"')
+        self.assertEqual(['"efgh"'], list(cache.documents))
+
+
+class PathTests(unittest.TestCase):
+    def test_compile_path(self):
+        self.assertEqual(("a", "b", 3, "c"), compile_path("a.b[3].c"))
+        self.assertEqual((0, "a.b", -1), compile_path('[0]["a.b"][-1]'))
+        for path in ["a..b", "a[b]", "a[1]b", '"a"']:
+            with self.assertRaises(ValueError):
+                compile_path(path)
+
+    def test_path_block(self):
+        document = '{"a": {"b": [{"c": "first"}, {"c": "second"}]}}'.replace('"', "&quot;")
+        program = f"""
+        <xml>
+            <variables><variable type="" id="result">result</variable></variables>
+            <block type="event_whenflagclicked" id="hat"><next>
+                <block type="data_setvariableto">
+                    <field name="VARIABLE" id="result" variabletype="">result</field>
+                    <value name="VALUE"><block type="json_path">
+                        <value name="PATH"><shadow type="text"><field name="TEXT">a.b[1].c</field></shadow></value>
+                        <value name="OBJ"><shadow type="text"><field name="TEXT">{document}</field></shadow></value>
+                    </block></value>
+                </block>
+            </next></block>
+        </xml>
+        """
+        executor = Executor(block_registry=BlockRegistry([*default_blocks, *json_plugin.json_blocks]))
+        executor.load_program(program)
+        executor.start(is_eager=True)
+        executor.task_stack.wait_until_complete()
+        executor.stop()
+        self.assertEqual("second", executor.get_variable(VariableRef("", "result")))
+
+
+class JsonItemReaderTests(unittest.TestCase):
+    def read(self, text: str, chunk_size: int) -> list:
+        return list(JsonItemReader(io.StringIO(text), chunk_size))
+
+    def test_items_are_read_across_chunks(self):
+        for chunk_size in [1, 2, 7, 1024]:
+            self.assertEqual([1, 23456, {"a": [3]}, "x,]"], self.read(' [1, 23456 , {"a": [3]},"x,]"] ', chunk_size))
+            self.assertEqual([1, {"b": True}, None], self.read('1\n{"b": true}\nnull\n', chunk_size))
+            self.assertEqual([], self.read(" [ ] ", chunk_size))
+            self.assertEqual([], self.read("", chunk_size))
+
+    def test_numbers_are_read_across_chunks(self):
+        randomiser = random.Random(0)
+        items = [-1.5, [], 12.25, -0.0, 3e-05, -2.5e+30, 1e100, 0, -7, [1.5, {"a": -2e-3}], {"b": [-4.0, 6e7]}, True]
+        items += [round(randomiser.uniform(-1000, 1000), randomiser.randrange(4)) for _ in range(20)]
+        ndjson = "\n".join(json.dumps(item) for item in items)
+        for chunk_size in range(1, 9):
+            self.assertEqual(json.loads(json.dumps(items)), self.read(json.dumps(items), chunk_size))
+            self.assertEqual(json.loads(json.dumps(items)), self.read(json.dumps(items, indent=1), chunk_size))
+            self.assertEqual([json.loads(line) for line in ndjson.splitlines()], self.read(ndjson, chunk_size))
+
+    def test_invalid_arrays(self):
+        for text in ["[1 2]", "[1,", "[1,]", "[tru]"]:
+            with self.assertRaises(json.JSONDecodeError):
+                self.read(text, 2)
+
+    def test_for_each_item_blocks(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        path = os.path.join(directory.name, "items.json")
+        with open(path, "w") as file:
+            file.write('[{"a": 1}, {"a": 2}, {"a": 3}]')
+        add_item = """
+            <block type="data_addtolist">
+                <field name="LIST" id="items" variabletype="list">items</field>
+                <value name="ITEM"><block type="json_value">
+                    <value name="KEY"><shadow type="text"><field name="TEXT">a</field></shadow></value>
+                    <value name="OBJ"><block type="data_variable">
+                        <field name="VARIABLE" id="item" variabletype="">item</field>
+                    </block></value>
+                </block></value>
+            </block>
+        """
+        def text(value: str) -> str:
+            return f'<shadow type="text"><field name="TEXT">{value}</field></shadow>'
+
+        parsed = f'<block type="json_parse"><value name="STRING">{text("[{&quot;a&quot;: 4}, {&quot;a&quot;: 5}]")}' \
+                 '</value></block>'
+        for block_type, name, value, expected in [("json_foreachfileitem", "PATH", text(path), [1, 2, 3]),
+                                                  ("json_foreachitem", "VALUE", text('{"a": 1}\n{"a": 2}'), [1, 2]),
+                                                  ("json_foreachitem", "VALUE", parsed, [4, 5])]:
+            program = f"""
+            <xml>
+                <variables>
+                    <variable type="list" id="items">items</variable>
+                    <variable type="" id="item">item</variable>
+                </variables>
+                <block type="event_whenflagclicked" id="hat"><next>
+                    <block type="{block_type}">
+                        <field name="VARIABLE" id="item" variabletype="">item</field>
+                        <value name="{name}">{value}</value>
+                        <statement name="SUBSTACK">{add_item}</statement>
+                    </block>
+                </next></block>
+            </xml>
+            """
+            executor = Executor(block_registry=BlockRegistry([*default_blocks, *json_plugin.json_blocks]))
+            executor.load_program(program)
+            executor.start(is_eager=True)
+            executor.task_stack.wait_until_complete()
+            executor.stop()
+            self.assertEqual(expected, executor.get_variable(VariableRef("list", "items")))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,137 @@
+import random
+import unittest
+
+from engine.executor.executor import Executor
+from engine.executor.variable_reference import VariableRef
+from engine.executor.variables.list_index import delete_item, replace_item
+
+
+def list_block(block_type: str, next_block: str = "", **values) -> str:
+    inputs = "".join(f'<value name="{name}"><shadow type="text"><field name="TEXT">{value}</field></shadow></value>'
+                     for name, value in values.items())
+    next_element = f"<next>{next_block}</next>" if next_block else ""
+    return f'<block type="{block_type}"><field name="LIST" id="items" variabletype="list">items</field>' \
+           f'{inputs}{next_element}</block>'
+
+
+def create_program(*statements: tuple[str, dict]) -> str:
+    chain = ""
+    for block_type, values in reversed(statements):
+        chain = list_block(block_type, chain, **values)
+    return f"""
+    <xml>
+        <variables><variable type="list" id="items">items</variable></variables>
+        <block type="event_whenflagclicked" id="hat"><next>{chain}</next></block>
+    </xml>
+    """
+
+
+items_ref = VariableRef("list", "items")
+
+
+class ListTests(unittest.TestCase):
+    def run_program(self, *statements: tuple[str, dict]) -> Executor:
+        executor = Executor()
+        executor.load_program(create_program(*statements))
+        executor.start(is_eager=True)
+        executor.task_stack.wait_until_complete()
+        executor.stop()
+        return executor
+
+    def test_list_blocks(self):
+        executor = self.run_program(
+            ("data_addtolist", {"ITEM": "a"}),
+            ("data_addtolist", {"ITEM": "b"}),
+            ("data_addtolist", {"ITEM": "c"}),
+            ("data_insertatlist", {"ITEM": "x", "INDEX": 1}),
+            ("data_replaceitemoflist", {"INDEX": 0, "ITEM": "z"}),
+            ("data_replaceitemoflist", {"INDEX": 10, "ITEM": "end"}),
+            ("data_deleteoflist", {"INDEX": 2}),
+            ("data_deleteoflist", {"INDEX": 99})
+        )
+        self.assertEqual(["z", "x", "c", "end"], executor.get_variable(items_ref))
+
+    def test_snapshots_do_not_change(self):
+        executor = self.run_program(("data_addtolist", {"ITEM": "a"}))
+        snapshot = executor.get_variables()[0]["value"]
+        executor.change_list(items_ref, list.append, "b")
+        self.assertEqual(["a"], snapshot)
+        self.assertEqual(["a", "b"], executor.get_variable(items_ref))
+
+        changed, _ = executor.get_variable_changes(0)
+        executor.change_list(items_ref, list.append, "c")
+        self.assertEqual(["a", "b"], changed[0]["value"])
+
+    def test_assigned_lists_are_not_changed(self):
+        executor = self.run_program()
+        assigned = ["a"]
+        executor.set_variable(items_ref, assigned)
+        executor.change_list(items_ref, list.append, "b")
+        self.assertEqual(["a"], assigned)
+        self.assertEqual(["a", "b"], executor.get_variable(items_ref))
+
+    def test_changes_are_versioned(self):
+        executor = self.run_program()
+        version = executor.variable_store.checkpoint()
+        executor.change_list(items_ref, list.append, "a")
+        changed, _ = executor.get_variable_changes(version)
+        self.assertEqual([["a"]], [variable["value"] for variable in changed])
+
+    def test_search_blocks(self):
+        executor = self.run_program(
+            ("data_addtolist", {"ITEM": "a"}),
+            ("data_addtolist", {"ITEM": "b"}),
+            ("data_addtolist", {"ITEM": "b"})
+        )
+        store = executor.variable_store
+        self.assertEqual(1, store.find_item(items_ref, "b"))
+        self.assertEqual(-1, store.find_item(items_ref, "c"))
+
+    def test_index_follows_changes(self):
+        executor = self.run_program()
+        store = executor.variable_store
+        randomiser = random.Random(0)
+        for _ in range(2000):
+            operation, args = randomiser.choice([
+                (list.append, (randomiser.randrange(20),)),
+                (list.append, (randomiser.randrange(20),)),
+                (list.insert, (randomiser.randrange(-5, 40), randomiser.randrange(20))),
+                (delete_item, (randomiser.randrange(-5, 40),)),
+                (replace_item, (randomiser.randrange(-5, 40), randomiser.randrange(20)))
+            ])
+            if randomiser.random() < 0.01:
+                operation, args = list.clear, ()
+            store.change_list(items_ref, operation, *args)
+            if randomiser.random() < 0.5:
+                item = randomiser.randrange(20)
+                items = store.get(items_ref)
+                self.assertEqual(items.index(item) if item in items else -1, store.find_item(items_ref, item))
+        self.assertIn(0, store.list_indices)
+
+    def test_deleting_from_empty_indexed_list(self):
+        executor = self.run_program()
+        store = executor.variable_store
+        self.assertEqual(-1, store.find_item(items_ref, "a"))
+        executor.change_list(items_ref, delete_item, -1)
+        executor.change_list(items_ref, delete_item, 0)
+        self.assertEqual([], executor.get_variable(items_ref))
+        executor.change_list(items_ref, list.append, "a")
+        self.assertEqual(0, store.find_item(items_ref, "a"))
+
+    def test_index_is_built_on_first_search(self):
+        executor = self.run_program(("data_addtolist", {"ITEM": "a"}))
+        store = executor.variable_store
+        self.assertEqual({}, store.list_indices)
+        self.assertEqual(0, store.find_item(items_ref, "a"))
+        executor.set_variable(items_ref, ["b", "a"])
+        self.assertEqual(1, store.find_item(items_ref, "a"))
+
+    def test_unhashable_items_are_searched(self):
+        executor = self.run_program()
+        executor.set_variable(items_ref, [["a"], "b"])
+        self.assertEqual(0, executor.variable_store.find_item(items_ref, ["a"]))
+        self.assertEqual(1, executor.variable_store.find_item(items_ref, "b"))
+
+
+if __name__ == '__main__':
+    unittest.main()
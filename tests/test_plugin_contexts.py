@@ -0,0 +1,92 @@
+import unittest
+
+from benchmarks.throughput import counter_program
+from engine.executor.executor import Executor
+
+key_program = """
+<xml>
+    <block type="event_whenkeypressed" id="hat">
+        <field name="KEY_OPTION">space</field>
+    </block>
+</xml>
+"""
+
+
+class RecordingContext:
+    events: list[str]
+
+    def __init__(self, executor: Executor):
+        self.executor = executor
+
+    def __enter__(self):
+        self.events.append("enter")
+
+    def reset(self):
+        self.events.append("reset")
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.events.append("exit")
+
+
+class KeyContext(RecordingContext):
+    block_types = ("event_whenkeypressed",)
+    events = []
+
+
+class DataContext(RecordingContext):
+    block_categories = ("data",)
+    events = []
+
+
+class UndeclaredContext(RecordingContext):
+    events = []
+
+
+class PluginContextTests(unittest.TestCase):
+    def setUp(self):
+        for context in [KeyContext, DataContext, UndeclaredContext]:
+            context.events.clear()
+        self.executor = Executor()
+        for context in [KeyContext, DataContext, UndeclaredContext]:
+            self.executor.add_plugin_context(context)
+
+    def run_program(self):
+        self.executor.start(is_eager=True)
+        self.executor.task_stack.wait_until_complete()
+        self.executor.stop()
+
+    def test_only_contexts_used_by_the_program_are_activated(self):
+        self.executor.load_program(counter_program.replace("{iterations}", "2"))
+        self.assertEqual(["DataContext", "UndeclaredContext"], self.executor.required_contexts)
+        self.run_program()
+        self.assertEqual([], KeyContext.events)
+        self.assertEqual(["enter", "reset"], DataContext.events)
+
+    def test_contexts_stay_active_between_runs(self):
+        self.executor.load_program(counter_program.replace("{iterations}", "2"))
+        self.run_program()
+        context = self.executor.get_plugin_context("DataContext")
+        self.run_program()
+        self.assertIs(context, self.executor.get_plugin_context("DataContext"))
+        self.assertEqual(1, DataContext.events.count("enter"))
+        self.assertNotIn("exit", DataContext.events)
+        self.executor.close()
+        self.assertEqual("exit", DataContext.events[-1])
+
+    def test_contexts_are_activated_on_first_use(self):
+        self.executor.load_program(counter_program.replace("{iterations}", "2"))
+        self.run_program()
+        self.assertEqual([], KeyContext.events)
+        self.assertIsInstance(self.executor.get_plugin_context("KeyContext"), KeyContext)
+        self.assertEqual(["enter"], KeyContext.events)
+
+    def test_contexts_that_are_no_longer_used_are_closed(self):
+        self.executor.load_program(counter_program.replace("{iterations}", "2"))
+        self.run_program()
+        self.executor.load_program(key_program)
+        self.assertEqual(["KeyContext", "UndeclaredContext"], self.executor.required_contexts)
+        self.assertEqual("exit", DataContext.events[-1])
+
+
+if __name__ == '__main__':
+    unittest.main()
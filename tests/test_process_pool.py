@@ -0,0 +1,117 @@
+import asyncio
+import functools
+import multiprocessing
+import time
+import unittest
+
+from engine.executor.exceptions import ExecutionException
+from engine.executor.executor import Executor
+from engine.executor.process_pool import ExecutorProcessPool
+from tests.test_sessions import create_session_program
+
+
+# ElementTree skips comments, so this is an empty program
+gated_program = "<xml><!-- gate --></xml>"
+
+
+def create_executor() -> Executor:
+    return Executor()
+
+
+class GatedExecutor(Executor):
+    """
+    Holds up loading the gated program until the test opens the gate
+    """
+
+    def __init__(self, loading: multiprocessing.Event, gate: multiprocessing.Event):
+        super().__init__()
+        self.loading = loading
+        self.gate = gate
+
+    def load_program(self, xml_string: str):
+        if xml_string == gated_program:
+            self.loading.set()
+            self.gate.wait(30)
+        super().load_program(xml_string)
+
+
+def create_gated_executor(loading: multiprocessing.Event, gate: multiprocessing.Event) -> Executor:
+    return GatedExecutor(loading, gate)
+
+
+def get_variables(status: dict) -> dict:
+    return {variable["id"]: variable["value"] for variable in status["variables"]}
+
+
+class ProcessPoolTests(unittest.IsolatedAsyncioTestCase):
+    async def asyncSetUp(self):
+        self.pool = ExecutorProcessPool(create_executor, size=2, max_sessions_per_worker=2)
+
+    async def asyncTearDown(self):
+        self.pool.shutdown()
+
+    async def run_session(self, session, i: int) -> dict:
+        await session.handle({"type": "program", "value": create_session_program(i, 10)})
+        await session.handle({"type": "start", "isEager": True})
+        return await self.wait_for_counter(session, 10)
+
+    @staticmethod
+    async def wait_for_counter(session, count: int) -> dict:
+        status = await session.handle({"type": "status"})
+        deadline = time.time() + 10
+        while get_variables(status)["counter"] < count and time.time() < deadline:
+            status = await session.handle({"type": "status"})
+        return status
+
+    async def test_sessions_run_in_workers(self):
+        sessions = [await self.pool.open_session() for _ in range(2)]
+        self.assertEqual(2, len(self.pool))
+        self.assertNotEqual(sessions[0].worker, sessions[1].worker)
+        for i, session in enumerate(sessions):
+            status = await self.run_session(session, i)
+            self.assertEqual({"session": str(i), "counter": 10.0, "message": f"message-{i}"}, get_variables(status))
+            await session.close()
+
+    async def test_errors_are_raised_in_server(self):
+        session = await self.pool.open_session()
+        with self.assertRaises(ExecutionException):
+            await session.handle({"type": "program"})
+        await session.close()
+
+    async def test_workers_are_recycled(self):
+        first = await self.pool.open_session()
+        second = await self.pool.open_session()
+        third = await self.pool.open_session()
+        worker = third.worker
+        self.assertIs(first.worker, worker)
+        self.assertTrue(worker.is_retiring)
+        await first.close()
+        self.assertIn(worker, self.pool.workers)
+        await third.close()
+        self.assertNotIn(worker, self.pool.workers)
+        worker.process.join(timeout=5)
+        self.assertFalse(worker.process.is_alive())
+        await second.close()
+
+    async def test_sessions_on_one_worker_overlap(self):
+        context = multiprocessing.get_context("spawn")
+        loading, gate = context.Event(), context.Event()
+        pool = ExecutorProcessPool(functools.partial(create_gated_executor, loading, gate), size=1)
+        self.addCleanup(pool.shutdown)
+        self.addCleanup(gate.set)
+        busy = await pool.open_session()
+        responsive = await pool.open_session()
+        self.assertIs(busy.worker, responsive.worker)
+        busy_load = asyncio.create_task(busy.handle({"type": "program", "value": gated_program}))
+        self.assertTrue(await asyncio.to_thread(loading.wait, 30))
+
+        await responsive.handle({"type": "program", "value": create_session_program(1, 10)})
+        await responsive.handle({"type": "start", "isEager": True})
+        status = await self.wait_for_counter(responsive, 10)
+        self.assertEqual(10, get_variables(status)["counter"])
+        self.assertFalse(busy_load.done())
+
+        gate.set()
+        await asyncio.wait_for(busy_load, timeout=30)
+        await busy.close()
+        await responsive.close()
@@ -0,0 +1,95 @@
+import unittest
+
+from benchmarks.throughput import counter_program
+from engine.executor.executor import Executor
+from engine.executor.profiler import BlockProfiler
+from engine.executor.session import ExecutorSession
+
+
+class ProfilerTests(unittest.TestCase):
+    iterations = 20
+
+    def run_counter_program(self, executor: Executor):
+        executor.load_program(counter_program.replace("{iterations}", str(self.iterations)))
+        executor.start(is_eager=False)
+        executor.complete()
+        executor.task_stack.wait_until_complete()
+        executor.stop()
+
+    def test_records_calls_and_times_per_block(self):
+        executor = Executor(profiler=BlockProfiler())
+        self.run_counter_program(executor)
+        blocks = {stats["id"]: stats for stats in executor.profiler.get_block_stats()}
+        self.assertEqual(1, blocks["loop"]["calls"])
+        self.assertEqual(self.iterations, blocks["increment"]["calls"])
+        self.assertEqual(self.iterations, blocks["read-counter"]["calls"])
+        for stats in blocks.values():
+            self.assertLessEqual(stats["selfTime"], stats["cumulativeTime"] + 1e-9)
+        # The loop awaits its substack, which awaits the next block and the reporters
+        self.assertGreater(blocks["loop"]["cumulativeTime"], blocks["increment"]["cumulativeTime"])
+        self.assertGreater(blocks["increment"]["cumulativeTime"], blocks["sum"]["cumulativeTime"])
+        self.assertGreater(blocks["sum"]["cumulativeTime"], blocks["add"]["cumulativeTime"])
+        types = {stats["type"]: stats for stats in executor.profiler.get_type_stats()}
+        self.assertEqual(2 * self.iterations, types["data_variable"]["calls"])
+
+    def test_folded_stacks_follow_awaited_blocks(self):
+        executor = Executor(profiler=BlockProfiler())
+        self.run_counter_program(executor)
+        stacks = [line.rsplit(" ", 1)[0] for line in executor.profiler.get_folded_stacks().splitlines()]
+        self.assertIn("control_repeat[loop];data_changevariableby[increment];data_setvariableto[sum];"
+                      "operator_add[add];operator_multiply[multiply];data_variable[read-counter]", stacks)
+
+    def test_cumulative_time_includes_next_blocks(self):
+        executor = Executor(profiler=BlockProfiler())
+        self.run_counter_program(executor)
+        blocks = {stats["id"]: stats for stats in executor.profiler.get_block_stats()}
+        # The increment hands on to the sum, and the sum awaits the add
+        self.assertAlmostEqual(blocks["increment"]["selfTime"] + blocks["sum"]["cumulativeTime"],
+                               blocks["increment"]["cumulativeTime"], delta=1e-6)
+        self.assertAlmostEqual(blocks["sum"]["selfTime"] + blocks["add"]["cumulativeTime"],
+                               blocks["sum"]["cumulativeTime"], delta=1e-6)
+        self.assertIsNone(executor.profiler.current)
+
+    def test_scripts_started_by_hats_include_next_blocks(self):
+        def set_block(block_id: str, next_block: str = "") -> str:
+            next_element = f"<next>{next_block}</next>" if next_block else ""
+            return f'''<block type="data_setvariableto" id="{block_id}">
+                <field name="VARIABLE" id="total" variabletype="">total</field>
+                <value name="VALUE"><shadow type="text"><field name="TEXT">{block_id}</field></shadow></value>
+                {next_element}</block>'''
+
+        executor = Executor(profiler=BlockProfiler())
+        executor.load_program(f"""
+        <xml>
+            <variables><variable type="" id="total">total</variable></variables>
+            <block type="event_whenflagclicked" id="hat">
+                <next>{set_block("first", set_block("second", set_block("third")))}</next>
+            </block>
+        </xml>
+        """)
+        executor.start(is_eager=True)
+        executor.task_stack.wait_until_complete()
+        executor.stop()
+        blocks = {stats["id"]: stats for stats in executor.profiler.get_block_stats()}
+        self.assertAlmostEqual(blocks["first"]["selfTime"] + blocks["second"]["cumulativeTime"],
+                               blocks["first"]["cumulativeTime"], delta=1e-6)
+        self.assertAlmostEqual(blocks["second"]["selfTime"] + blocks["third"]["cumulativeTime"],
+                               blocks["second"]["cumulativeTime"], delta=1e-6)
+        self.assertGreater(blocks["first"]["cumulativeTime"], blocks["third"]["cumulativeTime"])
+        stacks = [line.rsplit(" ", 1)[0] for line in executor.profiler.get_folded_stacks().splitlines()]
+        self.assertIn("data_setvariableto[first];data_setvariableto[second];data_setvariableto[third]", stacks)
+        self.assertIsNone(executor.profiler.current)
+
+    def test_profiling_is_toggled_by_message(self):
+        session = ExecutorSession(Executor())
+        session.handle({"type": "program", "value": counter_program.replace("{iterations}", "1")})
+        self.assertFalse(session.handle({"type": "profile"})["isEnabled"])
+        # Without a profiler the runners use their unwrapped methods
+        self.assertNotIn("evaluate", next(iter(session.executor.runners.values())).__dict__)
+        self.assertTrue(session.handle({"type": "profile", "isEnabled": True})["isEnabled"])
+        self.assertIn("evaluate", next(iter(session.executor.runners.values())).__dict__)
+        session.handle({"type": "start", "isEager": True})
+        session.executor.task_stack.wait_until_complete()
+        self.assertEqual(1, len([b for b in session.handle({"type": "profile"})["blocks"] if b["id"] == "loop"]))
+        self.assertFalse(session.handle({"type": "profile", "isEnabled": False})["isEnabled"])
+        session.close()
@@ -0,0 +1,99 @@
+import unittest
+
+from engine.blocks.default import default_blocks
+from engine.blocks.registry import BlockRegistry
+from engine.executor.exceptions import ExecutionException
+from engine.executor.executor import Executor, default_block_registry
+from engine.executor.program_cache import ProgramCache
+from engine.executor.session import ExecutorSession
+from engine.executor.variable_reference import VariableRef
+from tests.test_sessions import create_session_program
+
+
+def run_to_completion(executor: Executor):
+    executor.start(is_eager=True)
+    executor.task_stack.wait_until_complete()
+    executor.stop()
+
+
+class ProgramCacheTests(unittest.TestCase):
+    def setUp(self):
+        self.cache = ProgramCache(max_programs=2)
+
+    def test_loading_a_program_again_is_a_hit(self):
+        program, compiled_program = self.cache.load(create_session_program(1, 5), default_block_registry)
+        self.assertEqual((0, 1), (self.cache.hits, self.cache.misses))
+        self.assertEqual((program, compiled_program), self.cache.load(create_session_program(1, 5),
+                                                                      default_block_registry))
+        self.assertEqual((1, 1), (self.cache.hits, self.cache.misses))
+        self.assertEqual(0.5, self.cache.hit_rate)
+        self.assertEqual({"size": 1, "maxSize": 2, "hits": 1, "misses": 1, "hitRate": 0.5}, self.cache.get_stats())
+
+    def test_least_recently_used_program_is_evicted(self):
+        first = self.cache.load(create_session_program(1, 5), default_block_registry)
+        self.cache.load(create_session_program(2, 5), default_block_registry)
+        self.cache.load(create_session_program(1, 5), default_block_registry)
+        self.cache.load(create_session_program(3, 5), default_block_registry)
+        self.assertEqual(2, len(self.cache.programs))
+        self.assertIs(first, self.cache.load(create_session_program(1, 5), default_block_registry))
+        self.assertIsNot(first, self.cache.load(create_session_program(2, 5), default_block_registry))
+        self.assertEqual((2, 4), (self.cache.hits, self.cache.misses))
+
+    def test_programs_are_cached_per_block_registry(self):
+        _, compiled_program = self.cache.load(create_session_program(1, 5), default_block_registry)
+        _, other_program = self.cache.load(create_session_program(1, 5), BlockRegistry(default_blocks))
+        self.assertIsNot(compiled_program, other_program)
+        self.assertEqual(0, self.cache.hits)
+
+    def test_failed_compilation_is_not_cached(self):
+        program = create_session_program(1, 5).replace("data_changevariableby", "unknown_block")
+        with self.assertRaises(ExecutionException):
+            self.cache.load(program, default_block_registry)
+        self.assertEqual(0, len(self.cache.programs))
+
+
+class ExecutorProgramCacheTests(unittest.TestCase):
+    def setUp(self):
+        self.cache = ProgramCache()
+
+    def test_executors_share_compiled_program(self):
+        executors = [Executor(program_cache=self.cache) for _ in range(2)]
+        for executor, iterations in zip(executors, [3, 4]):
+            executor.load_program(create_session_program(1, 5))
+            run_to_completion(executor)
+            executor.set_variable(VariableRef("", "counter"), iterations)
+        self.assertIs(executors[0].compiled_program, executors[1].compiled_program)
+        self.assertIsNot(executors[0].runners, executors[1].runners)
+        self.assertEqual([3, 4], [executor.get_variable(VariableRef("", "counter")) for executor in executors])
+
+    def test_reloading_the_same_program_keeps_runners_and_resets_variables(self):
+        executor = Executor(program_cache=self.cache)
+        executor.load_program(create_session_program(1, 5))
+        run_to_completion(executor)
+        runners = executor.runners
+        executor.load_program(create_session_program(1, 5))
+        self.assertIs(runners, executor.runners)
+        self.assertEqual([], executor.get_variables())
+        run_to_completion(executor)
+        self.assertEqual(5, executor.get_variable(VariableRef("", "counter")))
+
+    def test_loading_another_program_relinks(self):
+        executor = Executor(program_cache=self.cache)
+        executor.load_program(create_session_program(1, 5))
+        runners = executor.runners
+        executor.load_program(create_session_program(2, 5))
+        self.assertIsNot(runners, executor.runners)
+        executor.load_program(create_session_program(1, 5))
+        self.assertEqual(1, self.cache.hits)
+        run_to_completion(executor)
+        self.assertEqual("1", executor.get_variable(VariableRef("", "session")))
+
+    def test_stats_message_reports_hit_rate(self):
+        session = ExecutorSession(Executor(program_cache=self.cache))
+        self.addCleanup(session.close)
+        for _ in range(4):
+            session.handle({"type": "program", "value": create_session_program(1, 5)})
+        stats = session.handle({"type": "stats"})
+        self.assertEqual("stats", stats["type"])
+        self.assertEqual({"size": 1, "maxSize": 32, "hits": 3, "misses": 1, "hitRate": 0.75},
+                         stats["caches"]["program"])
@@ -0,0 +1,155 @@
+import gc
+import threading
+import tracemalloc
+import unittest
+
+from engine.executor.executor import Executor, default_block_registry
+from engine.executor.session import ExecutorSession
+
+
+def create_session_program(session: int, iterations: int):
+    return f"""
+    <xml>
+        <variables>
+            <variable type="" id="session">session</variable>
+            <variable type="" id="counter">counter</variable>
+            <variable type="broadcast_msg" id="message">message-{session}</variable>
+        </variables>
+        <block type="event_whenflagclicked" id="hat">
+            <next>
+                <block type="data_setvariableto" id="set">
+                    <field name="VARIABLE" id="session" variabletype="">session</field>
+                    <value name="VALUE"><shadow type="text"><field name="TEXT">{session}</field></shadow></value>
+                    <next>
+                        <block type="control_repeat" id="loop">
+                            <value name="TIMES"><shadow type="math_whole_number"><field name="NUM">{iterations}</field></shadow></value>
+                            <statement name="SUBSTACK">
+                                <block type="data_changevariableby" id="increment">
+                                    <field name="VARIABLE" id="counter" variabletype="">counter</field>
+                                    <value name="VALUE"><shadow type="math_number"><field name="NUM">1</field></shadow></value>
+                                </block>
+                            </statement>
+                            <next>
+                                <block type="event_broadcast" id="broadcast">
+                                    <value name="BROADCAST_INPUT">
+                                        <shadow type="event_broadcast_menu">
+                                            <field name="BROADCAST_OPTION" id="message" variabletype="broadcast_msg">message-{session}</field>
+                                        </shadow>
+                                    </value>
+                                </block>
+                            </next>
+                        </block>
+                    </next>
+                </block>
+            </next>
+        </block>
+    </xml>
+    """
+
+
+class Session:
+    def __init__(self, session: int, iterations: int):
+        self.session = session
+        self.iterations = iterations
+        self.broadcasts = []
+        self.executor = Executor(block_registry=default_block_registry)
+        self.executor.add_global_broadcast_listener(lambda topic, message: self.broadcasts.append((topic, message)))
+        self.executor.load_program(create_session_program(session, iterations))
+
+    def run(self):
+        self.executor.start(is_eager=True)
+        self.executor.task_stack.wait_until_complete()
+
+    def get_variables(self):
+        return {variable["id"]: variable["value"] for variable in self.executor.get_variables()}
+
+
+class SessionIsolationTests(unittest.TestCase):
+    session_count = 50
+    iterations = 200
+
+    def test_parallel_sessions_are_isolated(self):
+        gc.collect()
+        tracemalloc.start()
+        before = tracemalloc.get_traced_memory()[0]
+        sessions = [Session(i, self.iterations + i) for i in range(self.session_count)]
+        threads = [threading.Thread(target=session.run) for session in sessions]
+        try:
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join(timeout=30)
+            gc.collect()
+            memory_per_session = (tracemalloc.get_traced_memory()[0] - before) / self.session_count
+        finally:
+            tracemalloc.stop()
+            for session in sessions:
+                session.executor.stop()
+
+        for session in sessions:
+            self.assertEqual({
+                "session": str(session.session),
+                "counter": float(session.iterations),
+                "message": f"message-{session.session}"
+            }, session.get_variables())
+            self.assertEqual(1, len(session.executor.global_event_listeners))
+            self.assertIn(("broadcast", f"message-{session.session}"), session.broadcasts)
+            self.assertEqual([], [b for b in session.broadcasts if b[0] == "broadcast" and
+                                  b[1] != f"message-{session.session}"])
+            self.assertIs(default_block_registry, session.executor.block_registry)
+        self.assertLess(memory_per_session, 256 * 1024)
+
+    def test_loading_blocks_does_not_change_shared_registry(self):
+        executor = Executor()
+        block_count = len(default_block_registry)
+        executor.load_blocks([{**default_block_registry.block_definitions["control_stop"], "type": "session_only"}])
+        self.assertIn("session_only", executor.block_definitions)
+        self.assertNotIn("session_only", default_block_registry.block_definitions)
+        self.assertEqual(block_count, len(default_block_registry))
+
+
+class SessionStatusTests(unittest.TestCase):
+    def setUp(self):
+        self.session = ExecutorSession(Executor())
+        self.session.handle({"type": "program", "value": create_session_program(1, 5)})
+
+    def tearDown(self):
+        self.session.close()
+
+    def test_status_without_acknowledgement_is_full(self):
+        status = self.session.handle({"type": "status"})
+        self.assertFalse(status["isDelta"])
+        self.assertEqual([], status["variables"])
+        self.assertEqual([], status["highlights"])
+        self.assertEqual(1, status["version"])
+
+    def test_status_contains_changes_since_acknowledged_version(self):
+        executor = self.session.executor
+        executor.load_variables()
+        version = self.session.handle({"type": "status"})["version"]
+        status = self.session.handle({"type": "status", "ackVersion": version})
+        self.assertTrue(status["isDelta"])
+        self.assertEqual(version, status["baseVersion"])
+        self.assertEqual([], status["variables"])
+
+        counter = executor.compiled_program.variables.slots[1]
+        executor.set_variable(counter, 3)
+        status = self.session.handle({"type": "status", "ackVersion": status["version"]})
+        self.assertEqual([{"value": 3, "type": "", "id": "counter", "name": "counter"}], status["variables"])
+        self.assertEqual([], status["removedVariables"])
+        self.assertEqual(["variable", "change"], status["broadcasts"][0])
+
+    def test_unknown_version_and_new_program_send_full_status(self):
+        self.session.executor.load_variables()
+        version = self.session.handle({"type": "status"})["version"]
+        self.assertFalse(self.session.handle({"type": "status", "ackVersion": version + 10})["isDelta"])
+        self.assertFalse(self.session.handle({"type": "snapshot"})["isDelta"])
+        self.session.handle({"type": "program", "value": create_session_program(2, 5)})
+        status = self.session.handle({"type": "status", "ackVersion": version})
+        self.assertFalse(status["isDelta"])
+
+    def test_reloading_the_same_program_sends_full_status(self):
+        self.session.executor.load_variables()
+        version = self.session.handle({"type": "status"})["version"]
+        self.session.handle({"type": "program", "value": create_session_program(1, 5)})
+        self.assertFalse(self.session.handle({"type": "status", "ackVersion": version})["isDelta"])
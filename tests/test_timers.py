@@ -0,0 +1,77 @@
+import asyncio
+import time
+import unittest
+
+from engine.executor.async_task_loop import AsyncioExecutorTaskStack
+from engine.executor.executor import Executor
+
+
+def create_program(scripts: int, duration: float):
+    script = """
+    <block type="event_whenflagclicked" id="hat-{index}">
+        <next>
+            <block type="control_wait" id="wait-{index}">
+                <value name="DURATION"><shadow type="math_positive_number"><field name="NUM">{duration}</field></shadow></value>
+                <next>
+                    <block type="data_changevariableby" id="increment-{index}">
+                        <field name="VARIABLE" id="counter" variabletype="">counter</field>
+                        <value name="VALUE"><shadow type="math_number"><field name="NUM">1</field></shadow></value>
+                    </block>
+                </next>
+            </block>
+        </next>
+    </block>
+    """
+    return f"""
+    <xml>
+        <variables><variable type="" id="counter">counter</variable></variables>
+        {"".join(script.format(index=index, duration=duration) for index in range(scripts))}
+    </xml>
+    """
+
+
+def get_counter(executor: Executor):
+    return float(executor.get_variables()[0]["value"])
+
+
+class TimerTests(unittest.TestCase):
+    def test_waiting_scripts_run_concurrently(self):
+        executor = Executor()
+        executor.load_program(create_program(1000, 0.5))
+        start = time.perf_counter()
+        executor.start(is_eager=True)
+        executor.task_stack.wait_until_complete()
+        duration = time.perf_counter() - start
+        executor.stop()
+        self.assertEqual(1000, get_counter(executor))
+        self.assertLess(duration, 2)
+
+    def test_stop_does_not_wait_for_timers(self):
+        executor = Executor()
+        executor.load_program(create_program(2, 10))
+        executor.start(is_eager=True)
+        self.assertEqual(2, executor.get_task_count())
+        start = time.perf_counter()
+        executor.stop()
+        self.assertLess(time.perf_counter() - start, 1)
+        self.assertEqual(0, executor.get_task_count())
+        self.assertEqual(0, get_counter(executor))
+
+
+class AsyncioTimerTests(unittest.IsolatedAsyncioTestCase):
+    async def test_waiting_scripts_run_concurrently(self):
+        executor = Executor(task_stack_type=AsyncioExecutorTaskStack)
+        executor.load_program(create_program(100, 0.5))
+        self.addCleanup(executor.stop)
+        executor.start(is_eager=True)
+        await asyncio.sleep(0.1)
+        self.assertEqual(0, get_counter(executor))
+        for _ in range(200):
+            if executor.get_task_count() == 0:
+                break
+            await asyncio.sleep(0.01)
+        self.assertEqual(100, get_counter(executor))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,36 @@
+import unittest
+
+from benchmarks.throughput import counter_program
+from engine.executor.executor import Executor
+from engine.executor.session import ExecutorSession
+from engine.executor.tracer import ExecutionTracer
+
+
+class TracerTests(unittest.TestCase):
+    def run_counter_program(self, executor: Executor, iterations: int):
+        executor.load_program(counter_program.replace("{iterations}", str(iterations)))
+        executor.start(is_eager=True)
+        executor.task_stack.wait_until_complete()
+        executor.stop()
+
+    def test_records_block_executions(self):
+        executor = Executor(tracer=ExecutionTracer(1000))
+        self.run_counter_program(executor, 2)
+        records = executor.tracer.dump()
+        self.assertEqual({"hat", "loop", "increment", "sum", "add", "read-total", "multiply", "read-counter"},
+                         set(record["id"] for record in records))
+        self.assertEqual(2, len([record for record in records if record["type"] == "operator_add"]))
+        self.assertTrue(all(record["duration"] >= 0 for record in records))
+
+    def test_keeps_most_recent_records(self):
+        executor = Executor(tracer=ExecutionTracer(10))
+        self.run_counter_program(executor, 50)
+        self.assertEqual(10, len(executor.tracer))
+        records = executor.tracer.dump()
+        self.assertEqual(sorted(records, key=lambda record: record["timestamp"] + record["duration"]), records)
+
+    def test_trace_message(self):
+        session = ExecutorSession(Executor())
+        self.assertEqual({"type": "trace", "isEnabled": False, "value": []}, session.handle({"type": "trace"}))
+        session = ExecutorSession(Executor(tracer=ExecutionTracer(10)))
+        self.assertTrue(session.handle({"type": "trace"})["isEnabled"])